@@ -0,0 +1,531 @@
+"""
+Approval Executor - Carries out approved actions as soon as they land in Approved/
+Part of the AI Employee Silver Tier implementation
+
+A watchdog observer on Approved/ feeds the same debounced IngestPipeline the
+Inbox watcher uses. Once a file has settled, the ``type`` in its frontmatter
+picks a handler, and each handler runs on its own thread pool, so a slow
+LinkedIn post never holds up email:
+
+- email: queued in the durable outbox (scripts/outbox.py) and sent at once
+  via the Gmail API or SMTP (EXECUTOR_EMAIL_VIA); transient failures are
+  retried from the outbox on later polls, and its idempotency keys mean a
+  restart never sends the same approval twice
+- linkedin_post: published from the shared browser (on the browser thread)
+  and recorded as a linkedin_post event, so posted_today() sees it
+- file_move: moves ``source`` to ``destination`` (both inside the vault)
+
+Executed approvals move to Done/. Failures stay in Approved/ and are tried
+again when the file changes or the executor restarts. Expired approvals
+(see approval_expiry.py) are left for the expiry sweeper, and other types
+(e.g. payment) are left for a human. With DRY_RUN=true nothing is executed.
+"""
+
+import os
+import sys
+import time
+import shutil
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+
+from base_watcher import BaseWatcher
+from ingest_pipeline import IngestPipeline
+from metrics import REGISTRY, QUEUE_DEPTH
+from vault_index import VaultIndex, parse_frontmatter
+from vault_layout import partition_dir
+from dashboard import LINKEDIN_POST_EVENT
+from approval_expiry import is_expired
+
+# Configuration
+VAULT_PATH = Path(__file__).parent
+SCRIPTS_PATH = VAULT_PATH.parent / 'scripts'
+WATCHERS_PATH = VAULT_PATH / 'watchers'
+CHECK_INTERVAL = 30  # seconds between rescans of Approved/ and outbox retry passes
+SETTLE_TIME = 0.5  # seconds; approvals are moved in whole, so only a short debounce is needed
+EMAIL_VIA = os.getenv('EXECUTOR_EMAIL_VIA', 'gmail')  # 'gmail' or 'smtp'
+HANDLER_CONCURRENCY = {
+    'email': int(os.getenv('OUTBOX_WORKERS', '4')),
+    'linkedin_post': 1,  # One browser thread anyway
+    'file_move': 4,
+}
+DRY_RUN = os.getenv('DRY_RUN', 'false').lower() == 'true'
+
+sys.path.insert(0, str(SCRIPTS_PATH))
+
+EXECUTION_SECONDS = REGISTRY.histogram('approval_execution_seconds', 'Time to carry out one approved action',
+                                       ['handler', 'outcome'])
+APPROVAL_LATENCY = REGISTRY.histogram('approval_latency_seconds',
+                                      'Time from a file landing in Approved/ to its action finishing',
+                                      ['handler'])
+
+
+class ExecutionError(Exception):
+    """An approved action could not be carried out"""
+
+
+class ActionHandler:
+    """Executes one kind of approval; ``execute`` returns an activity summary"""
+
+    name = ''
+    types: Set[str] = set()
+    event = 'action_executed'  # Activity kind recorded on success
+
+    def __init__(self, executor: "ApprovalExecutor"):
+        self.executor = executor
+        self.vault_path = executor.vault_path
+
+    def execute(self, path: Path, fields: Dict[str, str]) -> Optional[str]:
+        """Carry out the approval; None means it is pending (will finish later)"""
+        raise NotImplementedError
+
+    def poll(self) -> int:
+        """Periodic work such as retries; returns actions completed"""
+        return 0
+
+    def close(self):
+        pass
+
+
+class EmailHandler(ActionHandler):
+    """Sends approved emails through the durable outbox"""
+
+    name = 'email'
+    event = 'email_sent'
+
+    def __init__(self, executor: "ApprovalExecutor"):
+        super().__init__(executor)
+        from approved_messages import EMAIL_TYPES
+        from outbox import Outbox
+        self.types = set(EMAIL_TYPES)
+        self.via = EMAIL_VIA
+        self.outbox = Outbox(Path(os.getenv('OUTBOX_DB') or self.vault_path / 'Logs' / 'outbox.sqlite3'))
+        self._make_sender = None
+        self._senders: List = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _factory(self):
+        with self._lock:
+            if self._make_sender is None:
+                from outbox import sender_factory
+                try:
+                    self._make_sender = sender_factory(self.via, HANDLER_CONCURRENCY['email'])
+                except SystemExit:  # gmail_api exits when the Google libraries are missing
+                    raise ExecutionError("Gmail API libraries not installed")
+                except Exception as e:
+                    raise ExecutionError(f"Cannot send email via {self.via}: {e}") from e
+            return self._make_sender
+
+    def _sender(self):
+        """This thread's sender (one SMTP connection per thread; Gmail is shared)"""
+        sender = getattr(self._local, 'sender', None)
+        if sender is None:
+            sender = self._local.sender = self._factory()()
+            with self._lock:
+                self._senders.append(sender)
+        return sender
+
+    def _drop_sender(self):
+        """Close and forget this thread's sender, so the next send logs in afresh"""
+        sender, self._local.sender = getattr(self._local, 'sender', None), None
+        if sender is None:
+            return
+        with self._lock:
+            self._senders = [other for other in self._senders if other is not sender]
+        try:
+            sender.close()
+        except Exception:
+            pass
+
+    def execute(self, path: Path, fields: Dict[str, str]) -> Optional[str]:
+        from approved_messages import parse_approval_file
+        from outbox import SENT, QUEUED, DEAD, move_to_done
+        email = parse_approval_file(path)
+        done_dir = partition_dir(self.vault_path, 'Done')
+        added, existing = self.outbox.enqueue([email])
+        key = (added or existing)[0].key
+        item = self.outbox.claim(threading.current_thread().name, key)
+        if item is None:
+            row = existing[0] if existing else None
+            if row is not None and row.status == SENT:
+                move_to_done(email, done_dir)  # Sent before a crash, never moved
+                return f"Email to {email.to} was already sent: {email.subject}"
+            if row is not None and row.status == DEAD:
+                raise ExecutionError(f"Dead-lettered in the outbox: {row.error}")
+            return None  # Waiting for a retry, or another worker has it
+
+        item = self.outbox.deliver(item, self._sender(), done_dir)
+        if item is None:
+            self._drop_sender()  # Login failed; try a fresh sender next time
+            raise ExecutionError("SMTP login failed")
+        if item.status == SENT:
+            return f"Email sent to {email.to}: {email.subject}"
+        if item.status == QUEUED:
+            return None
+        raise ExecutionError(item.error or 'Send failed')
+
+    def poll(self) -> int:
+        """Send outbox rows whose retry time has come"""
+        from outbox import SENT
+        due = self.outbox.next_due()
+        if due is None or due > time.time():
+            return 0
+        try:
+            make_sender = self._factory()
+        except ExecutionError as e:
+            self.executor.logger.error(f"Outbox retries skipped: {e}")
+            return 0
+
+        def on_result(item):
+            if item.status == SENT:
+                self.executor.finish(Path(item.email.source or item.email.id), self,
+                                     f"Email sent to {item.email.to}: {item.email.subject}")
+
+        stats = self.outbox.drain(make_sender, HANDLER_CONCURRENCY['email'],
+                                  partition_dir(self.vault_path, 'Done'), on_result=on_result)
+        return stats.get(SENT, 0)
+
+    def close(self):
+        with self._lock:
+            senders, self._senders = self._senders, []
+        for sender in {id(sender): sender for sender in senders}.values():  # Gmail's is shared
+            try:
+                sender.close()
+            except Exception:
+                pass
+        self.outbox.close()
+
+
+class LinkedInPostHandler(ActionHandler):
+    """Publishes approved LinkedIn posts from the shared browser"""
+
+    name = 'linkedin_post'
+    types = {'linkedin_post'}
+    event = LINKEDIN_POST_EVENT
+    POST_SECTIONS = ('post', 'post content', 'content', 'draft', 'body')
+
+    def execute(self, path: Path, fields: Dict[str, str]) -> Optional[str]:
+        from approved_messages import split_frontmatter, extract_body
+        _, markdown = split_frontmatter(path.read_text(encoding='utf-8'))
+        text = extract_body(markdown, self.POST_SECTIONS)
+        if not text:
+            raise ExecutionError("Approved LinkedIn post has no text")
+        self.executor.run_in_browser(_publish_linkedin_post, text)
+        return f"Posted on LinkedIn: {path.stem}"
+
+
+def _publish_linkedin_post(pool, text: str):
+    try:
+        from linkedin_watcher import publish_post
+    except SystemExit:  # The watcher module exits when Playwright is missing
+        raise ExecutionError("Playwright not installed")
+    publish_post(pool, text)
+
+
+class FileMoveHandler(ActionHandler):
+    """Moves a file within the vault"""
+
+    name = 'file_move'
+    types = {'file_move', 'move_file'}
+    event = 'file_moved'
+
+    def _inside_vault(self, value: Optional[str], field: str) -> Path:
+        if not value:
+            raise ExecutionError(f"file_move approval has no '{field}'")
+        root = self.vault_path.resolve()
+        path = (root / value).resolve()
+        if path != root and root not in path.parents:
+            raise ExecutionError(f"{field} {value} is outside the vault")
+        return path
+
+    def execute(self, path: Path, fields: Dict[str, str]) -> Optional[str]:
+        source = self._inside_vault(fields.get('source'), 'source')
+        destination = self._inside_vault(fields.get('destination'), 'destination')
+        if not source.exists():
+            raise ExecutionError(f"source {fields['source']} does not exist")
+        if destination.is_dir() or fields['destination'].endswith(('/', '\\')):
+            destination = destination / source.name
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(source), str(destination))
+        return f"Moved {fields['source']} to {destination.relative_to(self.vault_path.resolve())}"
+
+
+HANDLERS = [EmailHandler, LinkedInPostHandler, FileMoveHandler]
+
+
+class ApprovedFileHandler(FileSystemEventHandler):
+    """Queues approval files as they are created in or moved into Approved/"""
+
+    def __init__(self, executor: "ApprovalExecutor"):
+        self.executor = executor
+
+    def _submit(self, path: Path, refresh_only: bool = False):
+        if path.parent == self.executor.approved and path.suffix == '.md' and not path.name.startswith('.'):
+            self.executor.pipeline.submit(path, refresh_only=refresh_only)
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._submit(Path(event.src_path))
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._submit(Path(event.src_path), refresh_only=True)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._submit(Path(event.dest_path))
+
+
+class ApprovalExecutor(BaseWatcher):
+    """Watches Approved/ and dispatches each approval to its handler's worker pool"""
+
+    quiet_hours_exempt = True  # Its polls send due outbox mail; approved actions should not wait
+
+    def __init__(self, vault_path: str, check_interval: int = CHECK_INTERVAL,
+                 index: Optional[VaultIndex] = None, dashboard=None, browser_pool=None,
+                 browser_executor: Optional[ThreadPoolExecutor] = None, dry_run: bool = DRY_RUN):
+        super().__init__(vault_path, check_interval)
+        self.approved = self.vault_path / 'Approved'
+        self.approved.mkdir(exist_ok=True)
+        self.dry_run = dry_run
+        self._owns_index = index is None and dashboard is None
+        self.index = index or (dashboard.index if dashboard is not None else None)
+        self.dashboard = dashboard
+        self.pipeline = IngestPipeline(self.dispatch, settle_time=SETTLE_TIME, logger=self.logger)
+        self.observer = None
+
+        # Browser work runs on the supervisor's browser thread when given one
+        self._browser_pool = browser_pool
+        self._owns_browser = browser_executor is None
+        self._own_pool = None
+        self.browser_executor = browser_executor
+
+        self.handlers: Dict[str, ActionHandler] = {}
+        self.pools: Dict[str, ThreadPoolExecutor] = {}
+        self._by_type: Dict[str, ActionHandler] = {}
+        self._lock = threading.Lock()
+        self._active: Set[Path] = set()
+        self._parked: Dict[Path, Tuple[int, int]] = {}  # Failed/skipped files, until they change
+        self._warned_types: Set[str] = set()
+        self.executed = 0
+        self._executed_seen = 0
+
+    # --- Handlers ---
+
+    def _load_handlers(self):
+        for handler_class in HANDLERS:
+            try:
+                handler = handler_class(self)
+            except Exception as e:
+                self.logger.error(f"{handler_class.name} approvals disabled: {e}")
+                continue
+            self.handlers[handler.name] = handler
+            self.pools[handler.name] = ThreadPoolExecutor(
+                max_workers=HANDLER_CONCURRENCY.get(handler.name, 1),
+                thread_name_prefix=f"execute-{handler.name}")
+            for kind in handler.types:
+                self._by_type[kind] = handler
+
+    def run_in_browser(self, func, *args):
+        """Run ``func(pool, *args)`` on the browser thread and wait for it"""
+        with self._lock:
+            if self.browser_executor is None:
+                self.browser_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="browser")
+
+        def call():
+            pool = self._browser_pool() if callable(self._browser_pool) else self._browser_pool
+            if pool is None:
+                sys.path.insert(0, str(WATCHERS_PATH))
+                from browser_pool import BrowserPool
+                pool = self._browser_pool = self._own_pool = BrowserPool()
+            return func(pool, *args)
+
+        return self.browser_executor.submit(call).result()
+
+    def record(self, kind: str, message: str):
+        """Activity entry on the dashboard (and in the index's events table)"""
+        if self.dashboard is not None:
+            self.dashboard.record(kind, message)
+        elif self.index is not None:
+            self.index.add_event(kind, message)
+
+    # --- Dispatch ---
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _park(self, path: Path):
+        """Skip ``path`` on rescans until it is edited"""
+        signature = self._signature(path)
+        with self._lock:
+            if signature is not None:
+                self._parked[path] = signature
+
+    def dispatch(self, path: Path):
+        """Pipeline worker: pick the handler and queue the approval on its pool"""
+        signature = self._signature(path)
+        if signature is None:
+            return
+        with self._lock:
+            if path in self._active or self._parked.get(path) == signature:
+                return
+            self._parked.pop(path, None)
+
+        fields = parse_frontmatter(path)
+        kind = fields.get('type', '').lower()
+        handler = self._by_type.get(kind)
+        if handler is None:
+            if kind not in self._warned_types:
+                self._warned_types.add(kind)
+                self.logger.info(f"No handler for approved type {kind or '(none)'!r}; "
+                                 f"leaving {path.name} in Approved")
+            self._park(path)
+            return
+        if is_expired(fields, signature[1] / 1e9):
+            self.logger.warning(f"{path.name} has expired; not executing")
+            self._park(path)
+            return
+        if self.dry_run:
+            self.logger.info(f"DRY_RUN: would execute {kind} approval {path.name}")
+            self._park(path)
+            return
+
+        with self._lock:
+            self._active.add(path)
+        self.pools[handler.name].submit(self._execute, handler, path, fields)
+
+    def _execute(self, handler: ActionHandler, path: Path, fields: Dict[str, str]):
+        started = time.perf_counter()
+        outcome = 'failed'
+        try:
+            summary = handler.execute(path, fields)
+            if summary is None:
+                outcome = 'pending'
+                self.logger.info(f"{path.name}: queued for retry")
+                self._park(path)  # Retries come from the handler's poll, not rescans
+            else:
+                outcome = 'done'
+                self.finish(path, handler, summary)
+        except Exception as e:
+            self.logger.error(f"Could not execute {path.name}: {e}")
+            self.record('execution_failed', f"Could not execute {path.stem}: {e}")
+            self._park(path)
+        finally:
+            EXECUTION_SECONDS.observe(time.perf_counter() - started, handler=handler.name, outcome=outcome)
+            with self._lock:
+                self._active.discard(path)
+
+    def finish(self, path: Path, handler: ActionHandler, summary: str):
+        """Move an executed approval to Done/ (unless the handler already did) and record it"""
+        done = partition_dir(self.vault_path, 'Done') / path.name
+        try:
+            APPROVAL_LATENCY.observe(max(0.0, time.time() - path.stat().st_ctime), handler=handler.name)
+        except OSError:
+            pass  # Already moved by the outbox
+        if path.exists():
+            shutil.move(str(path), str(done))
+        if done.exists():
+            os.utime(done)  # "Completed Today" counts Done/ files by mtime
+        with self._lock:
+            self.executed += 1
+            self._parked.pop(path, None)
+        self.record(handler.event, summary)
+        self.logger.info(f"Executed {path.name}: {summary}")
+
+    # --- Watcher interface ---
+
+    def check_for_updates(self) -> list:
+        """Approval files that are neither running nor parked"""
+        with self._lock:
+            active = set(self._active)
+            parked = dict(self._parked)
+        files = []
+        for path in sorted(self.approved.glob('*.md')):
+            if path.name.startswith('.') or path in active:
+                continue
+            if parked.get(path) != self._signature(path):
+                files.append(path)
+        return files
+
+    def create_action_file(self, item) -> Path:
+        """Executing an approval creates no action file; queue it instead"""
+        self.pipeline.submit(item)
+        return item
+
+    def setup(self):
+        """Start the handlers and observer, then queue what is already approved"""
+        if self.index is None:
+            self.index = VaultIndex(self.vault_path)
+        self._load_handlers()
+        self.pipeline.start()
+        self.observer = Observer()
+        self.observer.schedule(ApprovedFileHandler(self), str(self.approved), recursive=False)
+        self.observer.start()
+
+        existing = self.check_for_updates()
+        if existing:
+            self.logger.info(f'Queueing {len(existing)} approval(s) already in Approved')
+            for path in existing:
+                self.pipeline.submit(path)
+
+    def poll_once(self) -> int:
+        """Catch missed events, run handler retries and report how many actions finished"""
+        for path in self.check_for_updates():
+            self.pipeline.submit(path)
+        for handler in self.handlers.values():
+            try:
+                handler.poll()
+            except Exception as e:
+                self.logger.error(f"{handler.name} retry pass failed: {e}")
+
+        metrics = self.pipeline.metrics()
+        with self._lock:
+            active = len(self._active)
+            executed = self.executed - self._executed_seen
+            self._executed_seen = self.executed
+        QUEUE_DEPTH.set(metrics['pending'] + metrics['in_flight'] + active, watcher='executor')
+        return executed
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until nothing is settling, queued or executing (for tests and benchmarks)"""
+        deadline = time.monotonic() + (timeout if timeout is not None else float('inf'))
+        while time.monotonic() < deadline:
+            if self.pipeline.wait_idle(0.05):
+                with self._lock:
+                    if not self._active:
+                        return True
+            time.sleep(0.01)
+        return False
+
+    def teardown(self):
+        """Stop watching, let running actions finish and close the handlers"""
+        if self.observer:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+        self.pipeline.stop(drain=True)
+        for pool in self.pools.values():
+            pool.shutdown(wait=True)
+        for handler in self.handlers.values():
+            handler.close()
+        if self._own_pool is not None:
+            self.browser_executor.submit(self._own_pool.close).result()
+            self._own_pool = None
+        if self._owns_browser and self.browser_executor is not None:
+            self.browser_executor.shutdown(wait=True)
+        if self._owns_index and self.index is not None:
+            self.index.close()
+            self.index = None
+
+
+if __name__ == '__main__':
+    ApprovalExecutor(str(VAULT_PATH)).run()
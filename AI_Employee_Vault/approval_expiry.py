@@ -0,0 +1,342 @@
+"""
+Approval Expiry - Moves approval requests to Rejected/ once they expire
+Part of the AI Employee Silver Tier implementation
+
+An approval's deadline is its ``expires`` frontmatter field. Without one, it
+is ``created`` plus APPROVAL_TTL (24 hours), or the file's mtime plus
+APPROVAL_TTL when there is no ``created`` either. Deadlines are read once and
+kept in a TimerWheel, so a sweep costs O(approvals expiring), not
+O(approvals pending). A watchdog observer on Pending_Approval/ keeps the
+wheel current as files are added, edited, moved and deleted. Approved/ is
+left alone: once approved, a file belongs to the executor and the outbox,
+which may still be retrying its send.
+
+Deadlines are also persisted in Logs/approval_deadlines.sqlite3 with the
+size and mtime each file had when it was read. On restart, only new or
+changed files are parsed again. Expired files are renamed into Rejected/ in
+batches, fsyncing each directory once per batch, and each batch is logged on
+the dashboard.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+
+from base_watcher import BaseWatcher
+from metrics import REGISTRY, QUEUE_DEPTH
+from timer_wheel import TimerWheel
+from vault_index import VaultIndex, parse_frontmatter
+from vault_io import fsync_dir
+from vault_layout import _free_name
+
+# Configuration
+VAULT_PATH = Path(__file__).parent
+CHECK_INTERVAL = 10  # seconds between sweeps
+MAX_INTERVAL = 60  # Idle backoff never delays an expiry by more than this
+APPROVAL_TTL = int(os.getenv('APPROVAL_TTL', str(24 * 3600)))  # seconds, when there is no 'expires'
+EXPIRY_BATCH_SIZE = 500  # Renames per batch
+SWEPT_FOLDERS = ('Pending_Approval',)
+EXPIRED_FOLDER = 'Rejected'
+EXPIRED_EVENT = 'approval_expired'
+
+EXPIRED_TOTAL = REGISTRY.counter('approvals_expired_total', 'Approval requests moved to Rejected/ on expiry')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS deadlines (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    deadline REAL NOT NULL
+);
+"""
+
+Entry = Tuple[int, int, float]  # size, mtime_ns, deadline
+
+
+def parse_time(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds for an ISO 8601 frontmatter time (naive times are local), or None"""
+    if not value:
+        return None
+    try:
+        when = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if when.tzinfo is None:
+        when = when.astimezone()
+    return when.timestamp()
+
+
+def deadline_of(fields: Dict[str, str], mtime: float, ttl: float = APPROVAL_TTL) -> float:
+    """When an approval with these frontmatter fields expires"""
+    expires = parse_time(fields.get('expires'))
+    if expires is not None:
+        return expires
+    created = parse_time(fields.get('created'))
+    return (created if created is not None else mtime) + ttl
+
+
+def is_expired(fields: Dict[str, str], mtime: float, now: Optional[float] = None) -> bool:
+    return deadline_of(fields, mtime) <= (now if now is not None else time.time())
+
+
+class DeadlineStore:
+    """SQLite copy of every tracked deadline, keyed by path, for restarts"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()  # Observer and sweep threads share the connection
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+
+    def load(self) -> Dict[str, Entry]:
+        with self._lock:
+            rows = self._conn.execute('SELECT path, size, mtime_ns, deadline FROM deadlines')
+            return {path: (size, mtime_ns, deadline) for path, size, mtime_ns, deadline in rows}
+
+    def put_many(self, entries: Iterable[Tuple[str, Entry]]):
+        with self._lock, self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO deadlines VALUES (?, ?, ?, ?)',
+                                   ((path,) + entry for path, entry in entries))
+
+    def delete_many(self, paths: Iterable[str]):
+        with self._lock, self._conn:
+            self._conn.executemany('DELETE FROM deadlines WHERE path = ?', ((path,) for path in paths))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ApprovalFileHandler(FileSystemEventHandler):
+    """Keeps deadlines current as approval files come, change and go"""
+
+    def __init__(self, expiry: "ApprovalExpiry"):
+        self.expiry = expiry
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.expiry.track(Path(event.src_path))
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.expiry.track(Path(event.src_path))
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.expiry.forget(Path(event.src_path))
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.expiry.forget(Path(event.src_path))
+            self.expiry.track(Path(event.dest_path))
+
+
+class ApprovalExpiry(BaseWatcher):
+    """Sweeps expired approvals from Pending_Approval/ into Rejected/"""
+
+    max_interval = MAX_INTERVAL
+    quiet_hours_exempt = True  # Expiries are due at their deadline, night or day
+
+    def __init__(self, vault_path: str, check_interval: int = CHECK_INTERVAL,
+                 index: Optional[VaultIndex] = None, dashboard=None, ttl: float = APPROVAL_TTL,
+                 batch_size: int = EXPIRY_BATCH_SIZE, db_path: Optional[Path] = None):
+        super().__init__(vault_path, check_interval)
+        self.folders = [self.vault_path / name for name in SWEPT_FOLDERS]
+        self.rejected = self.vault_path / EXPIRED_FOLDER
+        for folder in self.folders + [self.rejected]:
+            folder.mkdir(exist_ok=True)
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.db_path = Path(db_path) if db_path else self.vault_path / 'Logs' / 'approval_deadlines.sqlite3'
+        self._owns_index = index is None and dashboard is None
+        self.index = index or (dashboard.index if dashboard is not None else None)
+        self.dashboard = dashboard
+        self.store: Optional[DeadlineStore] = None
+        self.wheel = TimerWheel(time.time())
+        self.known: Dict[str, Entry] = {}
+        self._lock = threading.Lock()
+        self.observer = None
+
+    def _tracked(self, path: Path) -> bool:
+        return path.parent in self.folders and path.suffix == '.md' and not path.name.startswith('.')
+
+    def _entry(self, path: Path, stat: os.stat_result) -> Entry:
+        deadline = deadline_of(parse_frontmatter(path), stat.st_mtime, self.ttl)
+        return (stat.st_size, stat.st_mtime_ns, deadline)
+
+    # --- Deadlines ---
+
+    def load(self) -> Dict[str, int]:
+        """Schedule every approval, reusing persisted deadlines for unchanged files"""
+        stored = self.store.load()
+        entries: Dict[str, Entry] = {}
+        changed: List[Tuple[str, Entry]] = []
+        for folder in self.folders:
+            with os.scandir(folder) as scan:
+                for item in scan:
+                    if item.name.startswith('.') or not item.name.endswith('.md') or not item.is_file():
+                        continue
+                    stat = item.stat()
+                    entry = stored.get(item.path)
+                    if entry is None or entry[:2] != (stat.st_size, stat.st_mtime_ns):
+                        try:
+                            entry = self._entry(Path(item.path), stat)
+                        except OSError:
+                            continue  # Moved away mid-scan
+                        changed.append((item.path, entry))
+                    entries[item.path] = entry
+
+        with self._lock:
+            # Merge: the observer runs during the scan, and what track() recorded is newer
+            for path, entry in entries.items():
+                if path not in self.known:
+                    self.known[path] = entry
+                    self.wheel.schedule(path, entry[2])
+            changed = [(path, entry) for path, entry in changed if self.known.get(path) is entry]
+            gone = [path for path in stored if path not in self.known]
+            tracked = len(self.known)
+        self.store.put_many(changed)
+        self.store.delete_many(gone)
+        return {'tracked': tracked, 'parsed': len(changed), 'removed': len(gone)}
+
+    def track(self, path: Path):
+        """(Re)schedule one approval after a file event; a no-op if it is unchanged"""
+        if not self._tracked(path):
+            return
+        key = str(path)
+        try:
+            stat = path.stat()
+            with self._lock:
+                known = self.known.get(key)
+            if known is not None and known[:2] == (stat.st_size, stat.st_mtime_ns):
+                return
+            entry = self._entry(path, stat)
+        except OSError:
+            self.forget(path)
+            return
+        with self._lock:
+            self.known[key] = entry
+            self.wheel.schedule(key, entry[2])
+        self.store.put_many([(key, entry)])
+
+    def forget(self, path: Path):
+        """Stop tracking an approval that was moved away or deleted"""
+        key = str(path)
+        with self._lock:
+            if self.known.pop(key, None) is None:
+                return
+            self.wheel.cancel(key)
+        self.store.delete_many([key])
+
+    # --- Sweeping ---
+
+    def _move_batch(self, batch: List[Path]) -> List[Path]:
+        """Rename one batch into Rejected/, fsyncing each touched directory once"""
+        moved, taken = [], set()
+        for path in batch:
+            try:
+                os.rename(path, _free_name(self.rejected, path.name, taken))
+            except OSError as e:
+                if path.exists():
+                    self.logger.error(f"Could not expire {path.name}: {e}")
+                continue
+            moved.append(path)
+        for directory in {path.parent for path in moved} | ({self.rejected} if moved else set()):
+            fsync_dir(directory)
+        return moved
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Move every approval whose deadline has passed to Rejected/; returns how many moved"""
+        now = now if now is not None else time.time()
+        with self._lock:
+            due = self.wheel.advance(now)
+            popped = ((key, self.known.pop(key, None)) for key in due)
+            entries = {key: entry for key, entry in popped if entry is not None}
+
+        expired, stale = [], []
+        for key, entry in entries.items():
+            path = Path(key)
+            try:
+                stat = path.stat()
+            except OSError:
+                stale.append(key)  # Gone without an event
+                continue
+            if entry[:2] != (stat.st_size, stat.st_mtime_ns):
+                self.track(path)  # Edited without an event: read the deadline again
+            else:
+                expired.append(path)
+
+        moved = 0
+        for start in range(0, len(expired), self.batch_size):
+            batch = self._move_batch(expired[start:start + self.batch_size])
+            stale += [str(path) for path in batch]
+            moved += len(batch)
+            if batch:
+                names = ', '.join(path.stem for path in batch[:3]) + (', ...' if len(batch) > 3 else '')
+                self.logger.info(f"Expired {len(batch)} approval(s) to {EXPIRED_FOLDER}: {names}")
+                self.record(f"Expired {len(batch)} approval request(s): {names}")
+        if stale:
+            self.store.delete_many(stale)
+        EXPIRED_TOTAL.inc(moved)
+        return moved
+
+    def record(self, message: str):
+        if self.dashboard is not None:
+            self.dashboard.record(EXPIRED_EVENT, message)
+        elif self.index is not None:
+            self.index.add_event(EXPIRED_EVENT, message)
+
+    # --- Watcher interface ---
+
+    def check_for_updates(self) -> list:
+        """Deadlines are pushed by file events; there is nothing to scan for"""
+        return []
+
+    def create_action_file(self, item) -> Path:
+        """Expiry creates no action files"""
+        return item
+
+    def setup(self):
+        """Load deadlines, then follow file events"""
+        if self.index is None:
+            self.index = VaultIndex(self.vault_path)
+        self.store = DeadlineStore(self.db_path)
+        self.observer = Observer()
+        handler = ApprovalFileHandler(self)
+        for folder in self.folders:
+            self.observer.schedule(handler, str(folder), recursive=False)
+        self.observer.start()  # Before the scan, so nothing added during it is missed
+        started = time.monotonic()
+        stats = self.load()
+        self.logger.info(f"Tracking {stats['tracked']} approval(s); read {stats['parsed']} new or "
+                         f"changed file(s) in {time.monotonic() - started:.2f}s")
+
+    def poll_once(self) -> int:
+        moved = self.sweep()
+        QUEUE_DEPTH.set(len(self.wheel), watcher='expiry')
+        return moved
+
+    def teardown(self):
+        if self.observer:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+        if self._owns_index and self.index is not None:
+            self.index.close()
+            self.index = None
+
+
+if __name__ == '__main__':
+    ApprovalExpiry(str(VAULT_PATH)).run()
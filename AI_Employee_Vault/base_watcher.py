@@ -7,7 +7,9 @@ import time
 import logging
 from pathlib import Path
 from abc import ABC, abstractmethod
-from datetime import datetime
+from logging_setup import setup_logging, log_cycle
+from metrics import SNAPSHOT_INTERVAL, record_cycle, write_snapshot
+from scheduler import schedule_for
 
 
 class BaseWatcher(ABC):
@@ -20,32 +22,9 @@ class BaseWatcher(ABC):
         self.logger = self._setup_logger()
 
     def _setup_logger(self):
-        """Configure logging for this watcher"""
-        logger = logging.getLogger(self.__class__.__name__)
-        logger.setLevel(logging.INFO)
-
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-
-        # File handler
-        log_dir = self.vault_path / 'Logs'
-        log_dir.mkdir(exist_ok=True)
-        log_file = log_dir / f'{self.__class__.__name__}_{datetime.now().strftime("%Y-%m-%d")}.log'
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.DEBUG)
-
-        # Formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        console_handler.setFormatter(formatter)
-        file_handler.setFormatter(formatter)
-
-        logger.addHandler(console_handler)
-        logger.addHandler(file_handler)
-
-        return logger
+        """Logger for this watcher; handlers live on the shared queue (added once per process)"""
+        setup_logging(self.__class__.__name__, self.vault_path)
+        return logging.getLogger(self.__class__.__name__)
 
     @abstractmethod
     def check_for_updates(self) -> list:
@@ -63,27 +42,54 @@ class BaseWatcher(ABC):
         """
         pass
 
+    def setup(self):
+        """Prepare resources before the first poll (override as needed)"""
+        pass
+
+    def teardown(self):
+        """Release resources after the last poll (override as needed)"""
+        pass
+
+    def poll_once(self) -> int:
+        """
+        Run a single check cycle
+        Returns: number of items processed
+        """
+        items = self.check_for_updates()
+        if items:
+            self.logger.info(f'Found {len(items)} new item(s) to process')
+            for item in items:
+                file_path = self.create_action_file(item)
+                self.logger.info(f'Created action file: {file_path.name}')
+        else:
+            self.logger.debug('No new items found')
+        return len(items)
+
     def run(self):
         """Main loop - continuously check for updates"""
         self.logger.info(f'Starting {self.__class__.__name__}')
         self.logger.info(f'Monitoring vault at: {self.vault_path}')
         self.logger.info(f'Check interval: {self.check_interval} seconds')
 
+        self.setup()
+        name = self.__class__.__name__
+        schedule = schedule_for(self, name, self.vault_path)
         while True:
+            started = time.monotonic()
             try:
-                items = self.check_for_updates()
-                if items:
-                    self.logger.info(f'Found {len(items)} new item(s) to process')
-                    for item in items:
-                        file_path = self.create_action_file(item)
-                        self.logger.info(f'Created action file: {file_path.name}')
-                else:
-                    self.logger.debug('No new items found')
+                items = self.poll_once()
+                record_cycle(name, items, time.monotonic() - started)
+                log_cycle(self.logger, name, items, started)
+                delay = schedule.next_delay(items)
 
             except KeyboardInterrupt:
                 self.logger.info('Watcher stopped by user')
                 break
             except Exception as e:
-                self.logger.error(f'Error in watcher loop: {e}', exc_info=True)
+                record_cycle(name, 0, time.monotonic() - started, error=True)
+                log_cycle(self.logger, name, 0, started, error=e)
+                delay = schedule.next_delay(error=e)
+            write_snapshot(self.vault_path / 'Logs' / f'metrics_{name}.prom', SNAPSHOT_INTERVAL)
 
-            time.sleep(self.check_interval)
+            time.sleep(delay)
+        self.teardown()
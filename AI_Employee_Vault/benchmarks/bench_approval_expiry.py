@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: approval expiry with a large Pending_Approval/
+Compares a sweep that rescans every approval's frontmatter on each tick with
+ApprovalExpiry, which reads deadlines once into a TimerWheel. Covers startup
+(cold, and warm from the persisted deadlines), the cost of an idle tick, and
+an hour's worth of expiries moved to Rejected/ in batches.
+
+Usage: python benchmarks/bench_approval_expiry.py [approval_count]
+"""
+
+import sys
+import time
+import logging
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from approval_expiry import ApprovalExpiry, deadline_of
+from vault_index import parse_frontmatter
+
+APPROVAL_COUNT = 50_000
+HORIZON = 24 * 3600  # Deadlines are spread evenly over the next day
+TICKS = 20
+
+
+def drop_approvals(folder: Path, count: int, now: float):
+    for i in range(count):
+        expires = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(now + 60 + i * HORIZON / count))
+        (folder / f'APPROVAL_{i:06d}.md').write_text(
+            f"---\ntype: email\nstatus: pending\nexpires: {expires}\n---\n\n"
+            f"## Action Details\nSend the report to client {i}.\n\n"
+            "## To Approve\nMove this file to /Approved folder.\n", encoding='utf-8')
+
+
+def rescan(folders, now: float) -> list:
+    """The naive sweep: read every approval's deadline on every tick"""
+    due = []
+    for folder in folders:
+        for path in folder.glob('*.md'):
+            if deadline_of(parse_frontmatter(path), path.stat().st_mtime) <= now:
+                due.append(path)
+    return due
+
+
+def timed(label: str, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed * 1000:10.1f} ms")
+    return result, elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else APPROVAL_COUNT
+    logging.disable(logging.INFO)  # One line per batch otherwise
+    with tempfile.TemporaryDirectory() as tmp:
+        vault = Path(tmp)
+        (vault / 'Pending_Approval').mkdir()
+        now = time.time()
+        print(f"Writing {count} pending approvals...")
+        drop_approvals(vault / 'Pending_Approval', count, now)
+
+        expiry = ApprovalExpiry(str(vault))
+        _, cold = timed("startup, cold (parse every file)", expiry.setup)
+
+        _, naive = timed("rescan sweep, one tick", rescan, expiry.folders, now)
+        start = time.perf_counter()
+        for tick in range(1, TICKS + 1):
+            expiry.sweep(now + tick)
+        wheel = (time.perf_counter() - start) / TICKS
+        print(f"{'timer wheel sweep, one idle tick':<40} {wheel * 1000:10.3f} ms"
+              f"   ({naive / wheel:,.0f}x faster)")
+
+        before = len(expiry.wheel)
+        moved, elapsed = timed("sweep one hour later (batched moves)", expiry.sweep, now + 3600)
+        print(f"  {moved} expired ({elapsed / max(moved, 1) * 1e6:.0f} us each), "
+              f"{len(list((vault / 'Rejected').iterdir()))} in Rejected/, "
+              f"{before - len(expiry.wheel)} left the wheel")
+        expiry.teardown()
+
+        restarted = ApprovalExpiry(str(vault))
+        _, warm = timed("startup, warm (persisted deadlines)", restarted.setup)
+        print(f"  {len(restarted.wheel)} tracked; {cold / warm:.1f}x faster than cold")
+        restarted.teardown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compiled trie-regex classifier vs the legacy keyword scan
+Classifies a synthetic message corpus with keyword lists of growing size.
+
+Usage: python benchmarks/bench_classifier.py
+"""
+
+import re
+import sys
+import time
+import random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from classifier import PriorityClassifier
+
+CORPUS_SIZE = 20_000
+KEYWORD_COUNTS = [7, 100, 500, 1000]
+PER_WORD_MAX = 100  # One-regex-per-keyword gets too slow to sample beyond this
+WORDS_PER_MESSAGE = 30
+
+
+def synthetic_keywords(count: int, rng: random.Random) -> list:
+    base = ['urgent', 'asap', 'emergency', 'help', 'invoice', 'payment', 'important']
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    extra = {''.join(rng.choice(letters) for _ in range(rng.randint(4, 10)))
+             for _ in range(count * 2)}
+    return (base + sorted(extra))[:count]
+
+
+def synthetic_corpus(keywords: list, rng: random.Random) -> list:
+    vocabulary = ['the', 'meeting', 'tomorrow', 'please', 'review', 'project', 'thanks',
+                  'helpful', 'update', 'client', 'report', 'schedule', 'call', 'notes']
+    corpus = []
+    for _ in range(CORPUS_SIZE):
+        words = rng.choices(vocabulary, k=WORDS_PER_MESSAGE)
+        if rng.random() < 0.1:
+            words[rng.randrange(WORDS_PER_MESSAGE)] = rng.choice(keywords)
+        corpus.append(' '.join(words))
+    return corpus
+
+
+def time_it(func, corpus: list) -> float:
+    start = time.perf_counter()
+    for text in corpus:
+        func(text)
+    return time.perf_counter() - start
+
+
+def main():
+    rng = random.Random(42)
+
+    print("=" * 72)
+    print(f"CLASSIFIER BENCHMARK ({CORPUS_SIZE:,} messages, {WORDS_PER_MESSAGE} words each)")
+    print("=" * 72)
+    print(f"{'keywords':>9} | {'substring any()':>16} | {'regex per word':>15} | {'compiled trie':>14}")
+    print("-" * 72)
+
+    for count in KEYWORD_COUNTS:
+        keywords = synthetic_keywords(count, rng)
+        corpus = synthetic_corpus(keywords, rng)
+
+        # Legacy WhatsApp check (also matches inside words)
+        legacy = time_it(lambda text: any(k in text.lower() for k in keywords), corpus)
+
+        # Naive word-boundary fix: one regex per keyword
+        if count <= PER_WORD_MAX:
+            patterns = [re.compile(rf'\b{re.escape(k)}\b', re.IGNORECASE) for k in keywords]
+            per_word = f"{time_it(lambda text: [p for p in patterns if p.search(text)], corpus):>13.2f} s"
+        else:
+            per_word = "skipped"
+
+        classifier = PriorityClassifier({'high': keywords})
+        compiled = time_it(classifier.classify, corpus)
+
+        print(f"{count:>9} | {legacy:>14.2f} s | {per_word:>15} | {compiled:>12.2f} s")
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
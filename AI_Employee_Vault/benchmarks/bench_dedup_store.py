@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: DedupStore.add vs the legacy whole-set JSON rewrite
+Shows that the cost of recording one more ID stays flat as history grows.
+
+Usage: python benchmarks/bench_dedup_store.py
+"""
+
+import sys
+import json
+import time
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dedup_store import DedupStore
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+LEGACY_MAX_SIZE = 100_000  # The JSON rewrite gets too slow to sample beyond this
+SAMPLES = 1_000
+CYCLE_SIZE = 100  # Items per poll cycle when group-committing
+
+
+def legacy_save_cost(workdir: Path, size: int) -> float:
+    """Average seconds per save of the old processed_ids JSON state"""
+    state_file = workdir / f"legacy_{size}.json"
+    processed = {f"msg-{i:08d}" for i in range(size)}
+    samples = max(1, min(SAMPLES, 2_000_000 // size))
+
+    start = time.perf_counter()
+    for i in range(samples):
+        processed.add(f"new-{i:08d}")
+        with open(state_file, 'w') as f:
+            json.dump({'processed_ids': list(processed)}, f, indent=2)
+    return (time.perf_counter() - start) / samples
+
+
+def store_add_cost(workdir: Path, size: int):
+    """Average seconds per add (per-item fsync and group commit) plus cold load time"""
+    log_path = workdir / f"store_{size}.log"
+    store = DedupStore(log_path, max_entries=size + SAMPLES, ttl_days=None)
+    store.update(f"msg-{i:08d}" for i in range(size))
+    store.close()
+
+    start = time.perf_counter()
+    store = DedupStore(log_path, max_entries=size + SAMPLES, ttl_days=None)
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(SAMPLES):
+        store.add(f"new-{i:08d}")
+    add_time = (time.perf_counter() - start) / SAMPLES
+
+    store.autocommit = False
+    start = time.perf_counter()
+    for i in range(SAMPLES):
+        store.add(f"grp-{i:08d}")
+        if i % CYCLE_SIZE == CYCLE_SIZE - 1:
+            store.commit()
+    group_time = (time.perf_counter() - start) / SAMPLES
+    store.close()
+    return add_time, group_time, load_time
+
+
+def main():
+    print("=" * 66)
+    print("DEDUP STORE BENCHMARK")
+    print("=" * 66)
+    print(f"{'IDs':>10} | {'legacy save':>12} | {'store add':>10} | {'group add':>10} | {'store load':>10}")
+    print("-" * 66)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        for size in SIZES:
+            add_time, group_time, load_time = store_add_cost(workdir, size)
+            if size <= LEGACY_MAX_SIZE:
+                legacy = f"{legacy_save_cost(workdir, size) * 1e3:9.2f} ms"
+            else:
+                legacy = "skipped"
+            print(f"{size:>10,} | {legacy:>12} | {add_time * 1e6:7.1f} us | "
+                  f"{group_time * 1e6:7.1f} us | {load_time:8.2f} s")
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sending approved emails through the Gmail API (scripts/gmail_api.py)
+Runs a local fake Gmail endpoint that serves the real Gmail discovery
+document and answers messages.send after SEND_LATENCY. Compares the old
+flow (fetch the discovery document and build a client for every email,
+then send) with a long-lived GmailSender at different concurrency levels.
+
+Requires google-api-python-client and google-auth-httplib2.
+Usage: python benchmarks/bench_gmail_send.py [message_count]
+"""
+
+import sys
+import json
+import time
+import tempfile
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / 'scripts'))
+from approved_messages import OutgoingEmail
+from gmail_api import GmailSender, create_message
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+import googleapiclient.discovery_cache
+
+MESSAGE_COUNT = 100
+SEND_LATENCY = 0.03  # seconds per messages.send on the fake endpoint
+DOCUMENT = Path(googleapiclient.discovery_cache.__file__).parent / 'documents' / 'gmail.v1.json'
+
+
+class FakeGmail(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real endpoint
+    disable_nagle_algorithm = True  # Otherwise delayed ACKs add 40 ms to every reused connection
+    document = b''
+    sent = 0
+    lock = threading.Lock()
+
+    def _reply(self, body: bytes):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._reply(self.document)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        time.sleep(SEND_LATENCY)
+        with self.lock:
+            FakeGmail.sent += 1
+            message_id = f'fake{FakeGmail.sent}'
+        self._reply(json.dumps({'id': message_id, 'labelIds': ['SENT']}).encode())
+
+    def log_message(self, format, *args):
+        pass
+
+
+def credentials() -> Credentials:
+    expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
+    return Credentials(token='fake-token', expiry=expiry)
+
+
+def batch(count: int):
+    return [OutgoingEmail(f'msg_{i}', 'bench@example.com', f'user{i}@example.com',
+                          f'Benchmark message {i}', 'Hello from the benchmark.\n' * 20)
+            for i in range(count)]
+
+
+def per_email(emails, discovery_url: str):
+    """The old script: a fresh client (discovery fetch + build) for every email"""
+    for email in emails:
+        service = build('gmail', 'v1', credentials=credentials(), discoveryServiceUrl=discovery_url,
+                        static_discovery=False, cache_discovery=False)
+        body = create_message(email.sender, email.to, email.subject, email.body)
+        service.users().messages().send(userId='me', body=body).execute()
+
+
+def report(label: str, count: int, elapsed: float):
+    print(f"{label:<28} {elapsed:7.2f}s  {elapsed / count * 1000:7.1f} ms/email")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else MESSAGE_COUNT
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGmail)
+    server.daemon_threads = True
+    root = f'http://127.0.0.1:{server.server_address[1]}/'
+    document = json.loads(DOCUMENT.read_text(encoding='utf-8'))
+    document['rootUrl'] = root
+    document['baseUrl'] = root + document['servicePath']
+    FakeGmail.document = json.dumps(document).encode()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    discovery_url = root + 'discovery'
+    emails = batch(count)
+
+    print(f"Sending {count} emails ({SEND_LATENCY * 1000:.0f} ms per messages.send, "
+          f"{len(FakeGmail.document) // 1024} KB discovery document)\n")
+
+    start = time.perf_counter()
+    per_email(emails, discovery_url)
+    report('client per email', count, time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = Path(tmp) / 'gmail_discovery.json'
+        for concurrency in (1, 4, 8):
+            with GmailSender(credentials(), concurrency, discovery_url, cache) as gmail:
+                start = time.perf_counter()
+                results = gmail.send_many(emails)
+                elapsed = time.perf_counter() - start
+            failed = [result for result in results if not result.ok]
+            report(f'GmailSender concurrency={concurrency}', count, elapsed)
+            if failed:
+                print(f"  {len(failed)} failed, e.g. {failed[0].error}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: dropping thousands of files into Inbox
+Compares the old inline handling (copy on the observer thread, one file at a
+time) with the debounced IngestPipeline. Events are fed the way watchdog
+would: one created event plus a few modified events per file.
+
+Usage: python benchmarks/bench_inbox_pipeline.py [file_count]
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ingest_pipeline import IngestPipeline
+from vault_io import atomic_copy, atomic_write_text
+
+FILE_COUNT = 2_000
+FILE_SIZE = 64 * 1024
+MODIFY_EVENTS = 3  # Writers usually emit several modify events per file
+SETTLE_TIME = 0.2
+
+
+def make_processor(needs_action: Path):
+    """Same I/O as FilesystemWatcher.process_file: copy plus a metadata file"""
+    def process(source: Path):
+        atomic_copy(source, needs_action / f'FILE_{source.name}')
+        atomic_write_text(needs_action / f'FILE_{source.stem}.md', f'original_name: {source.name}\n')
+    return process
+
+
+def drop_files(inbox: Path, count: int) -> list:
+    payload = b'x' * FILE_SIZE
+    paths = []
+    for i in range(count):
+        path = inbox / f'scan_{i:06d}.pdf'
+        path.write_bytes(payload)
+        paths.append(path)
+    return paths
+
+
+def bench_inline(workdir: Path, count: int):
+    inbox, needs_action = workdir / 'inline_inbox', workdir / 'inline_na'
+    inbox.mkdir()
+    needs_action.mkdir()
+    paths = drop_files(inbox, count)
+    process = make_processor(needs_action)
+
+    start = time.perf_counter()
+    for path in paths:
+        process(path)  # Observer thread blocked for every copy
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+def bench_pipeline(workdir: Path, count: int):
+    inbox, needs_action = workdir / 'pipe_inbox', workdir / 'pipe_na'
+    inbox.mkdir()
+    needs_action.mkdir()
+    paths = drop_files(inbox, count)
+    pipeline = IngestPipeline(make_processor(needs_action), settle_time=SETTLE_TIME)
+    pipeline.start()
+
+    start = time.perf_counter()
+    for path in paths:
+        pipeline.submit(path)
+        for _ in range(MODIFY_EVENTS):
+            pipeline.submit(path, refresh_only=True)
+    accepted = time.perf_counter() - start
+
+    pipeline.wait_idle()
+    drained = time.perf_counter() - start
+    pipeline.stop()
+    return accepted, drained, pipeline.metrics()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else FILE_COUNT
+
+    print("=" * 60)
+    print(f"INBOX PIPELINE BENCHMARK ({count:,} files x {FILE_SIZE // 1024} KB)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        blocked, total = bench_inline(workdir, count)
+        print(f"Inline   : observer blocked {blocked:7.2f} s, all done in {total:7.2f} s")
+
+        accepted, drained, metrics = bench_pipeline(workdir, count)
+        print(f"Pipeline : events accepted {accepted:7.2f} s, all done in {drained:7.2f} s "
+              f"(includes {SETTLE_TIME}s settle)")
+        print(f"           max depth {metrics['max_depth']}, coalesced {metrics['coalesced']}, "
+              f"processed {metrics['processed']}, dropped {metrics['dropped']}, "
+              f"avg latency {metrics['avg_latency']:.2f} s")
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: FilesystemWatcher startup scan over a large Inbox
+Compares hashing every file on restart with the IngestIndex stat check,
+which only hashes files whose size/mtime/inode changed since ingestion.
+
+Usage: python benchmarks/bench_ingest_index.py [file_count]
+"""
+
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from file_ingest import hash_file
+from ingest_index import IngestIndex
+
+FILE_COUNT = 100_000
+FILE_SIZE = 4 * 1024
+CHANGED = 100  # Files touched between restarts
+
+
+def drop_files(inbox: Path, count: int):
+    for i in range(count):
+        (inbox / f'scan_{i:06d}.txt').write_bytes(i.to_bytes(8, 'big') * (FILE_SIZE // 8))
+
+
+def scan(inbox: Path, index: IngestIndex):
+    """Same check as FilesystemWatcher.check_for_updates"""
+    known = index.stat_map()
+    pending = []
+    with os.scandir(inbox) as entries:
+        for entry in entries:
+            stat = entry.stat()
+            if known.get(entry.path) != (stat.st_size, stat.st_mtime_ns, stat.st_ino):
+                pending.append(Path(entry.path))
+    return pending
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else FILE_COUNT
+
+    print("=" * 60)
+    print(f"INGEST INDEX STARTUP BENCHMARK ({count:,} files x {FILE_SIZE // 1024} KB)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inbox = Path(tmp) / 'Inbox'
+        inbox.mkdir()
+        drop_files(inbox, count)
+
+        index = IngestIndex(Path(tmp) / 'Logs' / 'inbox_index.sqlite3')
+        start = time.perf_counter()
+        for path in inbox.iterdir():
+            stat = path.stat()
+            index.record(path, stat, hash_file(path), Path('Needs_Action') / path.name)
+        print(f"First run (hash + record all)  : {time.perf_counter() - start:7.2f} s")
+        index.close()
+
+        # Restart: a fresh process opens the index from disk
+        start = time.perf_counter()
+        hashes = {hash_file(path) for path in inbox.iterdir()}
+        print(f"Restart, hash every file       : {time.perf_counter() - start:7.2f} s "
+              f"({len(hashes):,} hashes)")
+
+        for i in range(CHANGED):
+            os.utime(inbox / f'scan_{i:06d}.txt', ns=(0, i + 1))
+
+        start = time.perf_counter()
+        index = IngestIndex(Path(tmp) / 'Logs' / 'inbox_index.sqlite3')
+        pending = scan(inbox, index)
+        stat_time = time.perf_counter() - start
+        duplicates = sum(1 for path in pending if index.find_hash(hash_file(path)))
+        total = time.perf_counter() - start
+        index.close()
+
+        print(f"Restart, stat check via index  : {stat_time:7.2f} s "
+              f"({stat_time / count * 1e6:.1f} us/file)")
+        print(f"  + hash the {len(pending)} changed file(s) : {total:7.2f} s total, "
+              f"{duplicates} recognised as already ingested")
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: draining the durable outbox (scripts/outbox.py) over SMTP
+Runs a local aiosmtpd server with an artificial per-reply delay and compares
+the in-process batch sender (one pooled connection, no persistence) with
+Outbox.drain at several worker counts, each worker holding its own pooled
+SMTPSender. It then enqueues the same batch again, as a restart after a
+crash would, and checks that nothing is sent twice.
+
+Requires aiosmtpd (pip install aiosmtpd).
+Usage: python benchmarks/bench_outbox.py [message_count]
+"""
+
+import sys
+import time
+import socket
+import asyncio
+import tempfile
+import contextlib
+from io import StringIO
+from pathlib import Path
+from collections import Counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / 'scripts'))
+from approved_messages import OutgoingEmail
+from send_smtp import SMTPSender
+from outbox import Outbox
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:
+    print("aiosmtpd is required: pip install aiosmtpd")
+    sys.exit(1)
+
+MESSAGE_COUNT = 400
+ROUND_TRIP = 0.002  # seconds added to every SMTP reply
+
+
+class CountingHandler:
+    """Accepts everything after a delay and counts deliveries per subject"""
+
+    def __init__(self):
+        self.delivered = Counter()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        await asyncio.sleep(ROUND_TRIP)
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(ROUND_TRIP)
+        subject = next((line for line in envelope.content.decode(errors='replace').splitlines()
+                        if line.startswith('Subject:')), '')
+        self.delivered[subject] += 1
+        return '250 Message accepted'
+
+
+def batch(count: int):
+    return [OutgoingEmail(f'msg_{i}', 'bench@example.com', f'user{i}@example.com',
+                          f'Benchmark message {i}', 'Hello from the benchmark.\n' * 20)
+            for i in range(count)]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def report(label: str, count: int, elapsed: float, handler: CountingHandler):
+    duplicates = sum(n - 1 for n in handler.delivered.values() if n > 1)
+    print(f"{label:<24} {elapsed:7.2f}s  {elapsed / count * 1000:6.1f} ms/msg  "
+          f"{sum(handler.delivered.values())}/{count} delivered  {duplicates} duplicates")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else MESSAGE_COUNT
+    emails = batch(count)
+    print(f"Sending {count} messages ({ROUND_TRIP * 1000:.0f} ms per SMTP reply)\n")
+
+    for workers in (0, 1, 4, 8):
+        handler = CountingHandler()
+        port = free_port()
+        controller = Controller(handler, hostname='127.0.0.1', port=port)
+        controller.start()
+        make_sender = lambda: SMTPSender('127.0.0.1', port, None, starttls=False, rate_limit=0)
+        try:
+            if workers == 0:
+                start = time.perf_counter()
+                with make_sender() as smtp:
+                    smtp.send_many(emails)
+                report('pooled send_batch', count, time.perf_counter() - start, handler)
+                continue
+
+            with tempfile.TemporaryDirectory() as tmp, Outbox(Path(tmp) / 'outbox.sqlite3') as outbox:
+                start = time.perf_counter()
+                outbox.enqueue(emails)
+                enqueued = time.perf_counter() - start
+                with contextlib.redirect_stdout(StringIO()):  # One line per message otherwise
+                    outbox.drain(make_sender, workers)
+                report(f'outbox, {workers} worker(s)', count, time.perf_counter() - start, handler)
+
+                # Restart after a crash: the same approvals are enqueued again
+                added, _ = outbox.enqueue(emails)
+                with contextlib.redirect_stdout(StringIO()):
+                    outbox.drain(make_sender, workers)
+                print(f"  enqueue {enqueued * 1000:.0f} ms; after re-enqueue: {len(added)} new, "
+                      f"{sum(handler.delivered.values()) - count} re-sent")
+        finally:
+            controller.stop()
+
+
+if __name__ == "__main__":
+    main()
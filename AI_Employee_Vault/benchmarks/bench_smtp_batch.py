@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sending a batch of approved emails via scripts/send_smtp.py
+Runs a local aiosmtpd server (with an artificial per-command delay standing
+in for network round trips and a server that greylists some messages with a
+451) and compares one connection per message, as the old script did, with
+one pooled SMTPSender for the whole batch.
+
+Requires aiosmtpd (pip install aiosmtpd).
+Usage: python benchmarks/bench_smtp_batch.py [message_count]
+"""
+
+import sys
+import time
+import socket
+import asyncio
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / 'scripts'))
+from approved_messages import OutgoingEmail
+from send_smtp import SMTPSender
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:
+    print("aiosmtpd is required: pip install aiosmtpd")
+    sys.exit(1)
+
+MESSAGE_COUNT = 200
+ROUND_TRIP = 0.002  # seconds added to every SMTP reply
+GREYLIST_EVERY = 25  # Every Nth message is refused once with 451
+
+
+class StandInHandler:
+    """Accepts everything after a delay; greylists every GREYLIST_EVERY-th subject once"""
+
+    def __init__(self):
+        self.connections = 0
+        self.delivered = 0
+        self.greylisted = set()
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        await asyncio.sleep(ROUND_TRIP)
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        await asyncio.sleep(ROUND_TRIP)
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(ROUND_TRIP)
+        subject = next((line for line in envelope.content.decode(errors='replace').splitlines()
+                        if line.startswith('Subject:')), '')
+        number = int(subject.rsplit(' ', 1)[-1]) if subject else 0
+        if number % GREYLIST_EVERY == 0 and number not in self.greylisted:
+            self.greylisted.add(number)
+            return '451 4.7.1 Greylisted, try again later'
+        self.delivered += 1
+        return '250 Message accepted'
+
+
+def batch(count: int):
+    return [OutgoingEmail(f'msg_{i}', 'bench@example.com', f'user{i}@example.com',
+                          f'Benchmark message {i}', 'Hello from the benchmark.\n' * 20)
+            for i in range(count)]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def run(label: str, count: int, pooled: bool):
+    handler = StandInHandler()
+    port = free_port()
+    controller = Controller(handler, hostname='127.0.0.1', port=port)
+    controller.start()
+    options = dict(server='127.0.0.1', port=port, username=None, starttls=False,
+                   rate_limit=0, retry_delay=0.01)
+    try:
+        start = time.perf_counter()
+        if pooled:
+            with SMTPSender(**options) as smtp:
+                results = smtp.send_many(batch(count))
+        else:
+            results = []
+            for email in batch(count):
+                with SMTPSender(**options) as smtp:
+                    results.append(smtp.send(email))
+        elapsed = time.perf_counter() - start
+    finally:
+        controller.stop()
+
+    ok = sum(1 for result in results if result.ok)
+    retried = sum(1 for result in results if result.attempts > 1)
+    print(f"{label:<24} {elapsed:7.2f}s  {elapsed / count * 1000:6.1f} ms/msg  "
+          f"{handler.connections:4d} connections  {ok}/{count} sent  {retried} retried")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else MESSAGE_COUNT
+    print(f"Sending {count} messages ({ROUND_TRIP * 1000:.0f} ms per SMTP reply, "
+          f"1 in {GREYLIST_EVERY} greylisted once)\n")
+    run('connection per message', count, pooled=False)
+    run('pooled SMTPSender', count, pooled=True)
+
+
+if __name__ == "__main__":
+    main()
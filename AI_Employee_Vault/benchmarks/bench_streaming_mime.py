@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak memory when sending a large attachment
+Sends one email with a large attachment through a local aiosmtpd sink and a
+fake Gmail endpoint (which supports resumable uploads), once with the old
+in-memory MIME construction and once with the streaming builder
+(scripts/streaming_mime.py). Every send runs in its own child process and
+reports that process's peak RSS (Linux, from /proc), so the numbers include the interpreter
+baseline (shown as "baseline").
+
+Requires aiosmtpd, google-api-python-client and google-auth-httplib2.
+Usage: python benchmarks/bench_streaming_mime.py [attachment_mb]
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import socket
+import smtplib
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from email import encoders
+from email.mime.base import MIMEBase
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / 'scripts'))
+
+ATTACHMENT_MB = 20  # Gmail rejects uploads over 35 MB, i.e. attachments over ~25 MB
+MODES = ['baseline', 'smtp-legacy', 'smtp-streaming', 'gmail-legacy', 'gmail-streaming']
+
+
+# --- Old behaviour (what send_smtp.py / gmail_api.py did before) ---
+
+def legacy_message(attachment: Path) -> MIMEMultipart:
+    message = MIMEMultipart()
+    message['From'] = 'bench@example.com'
+    message['To'] = 'user@example.com'
+    message['Subject'] = 'Invoice bundle'
+    message.attach(MIMEText('Please find the bundle attached.', 'plain'))
+    with open(attachment, 'rb') as f:
+        part = MIMEBase('application', 'octet-stream')
+        part.set_payload(f.read())
+        encoders.encode_base64(part)
+        part.add_header('Content-Disposition', f'attachment; filename={attachment.name}')
+        message.attach(part)
+    return message
+
+
+# --- Child process: one send, then report peak RSS ---
+
+def gmail_credentials():
+    from google.oauth2.credentials import Credentials
+    expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
+    return Credentials(token='fake-token', expiry=expiry)
+
+
+def child(mode: str, smtp_port: int, gmail_root: str, attachment: Path):
+    import send_smtp
+    import gmail_api
+    from approved_messages import OutgoingEmail
+
+    email = OutgoingEmail('bench', 'bench@example.com', 'user@example.com', 'Invoice bundle',
+                          'Please find the bundle attached.', attachments=(str(attachment),))
+    if mode == 'smtp-legacy':
+        with smtplib.SMTP('127.0.0.1', smtp_port) as server:
+            server.sendmail(email.sender, [email.to], legacy_message(attachment).as_string())
+    elif mode == 'smtp-streaming':
+        with send_smtp.SMTPSender('127.0.0.1', smtp_port, None, starttls=False, rate_limit=0) as smtp:
+            result = smtp.send(email)
+            assert result.ok, result.error
+    elif mode == 'gmail-legacy':
+        message = legacy_message(attachment)
+        body = {'raw': base64.urlsafe_b64encode(message.as_bytes()).decode()}
+        with tempfile.TemporaryDirectory() as tmp:
+            gmail = gmail_api.GmailSender(gmail_credentials(), 1, gmail_root + 'discovery',
+                                          Path(tmp) / 'discovery.json')
+            gmail.service.users().messages().send(userId='me', body=body).execute()
+    elif mode == 'gmail-streaming':
+        with tempfile.TemporaryDirectory() as tmp:
+            gmail = gmail_api.GmailSender(gmail_credentials(), 1, gmail_root + 'discovery',
+                                          Path(tmp) / 'discovery.json')
+            result = gmail.send(email)
+            assert result.ok, result.error
+    print(peak_rss_kb())
+
+
+def peak_rss_kb() -> int:
+    # VmHWM rather than ru_maxrss: the latter survives exec and would include the parent's peak
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+
+
+# --- Parent process: servers and reporting ---
+
+class FakeGmail(BaseHTTPRequestHandler):
+    """messages.send inline, plus the resumable upload protocol googleapiclient uses"""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    document = b''
+    received = {}
+
+    def _reply(self, status: int, body: bytes = b'', headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _drain(self) -> int:
+        remaining = int(self.headers.get('Content-Length') or 0)
+        total = remaining
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 1 << 20)))
+        return total
+
+    def do_GET(self):
+        self._reply(200, self.document)
+
+    def do_POST(self):
+        size = self._drain()
+        if 'uploadType=resumable' in self.path:
+            location = f'http://127.0.0.1:{self.server.server_address[1]}/upload/session'
+            self._reply(200, headers=[('Location', location)])
+        else:
+            FakeGmail.received['inline'] = size
+            self._reply(200, b'{"id": "inline"}')
+
+    def do_PUT(self):
+        self._drain()
+        # Content-Range: bytes first-last/total
+        first_last, total = self.headers['Content-Range'].split(' ')[1].split('/')
+        last = int(first_last.split('-')[1])
+        if total != '*' and last + 1 >= int(total):
+            FakeGmail.received['upload'] = int(total)
+            self._reply(200, b'{"id": "uploaded"}')
+        else:
+            self._reply(308, headers=[('Range', f'bytes=0-{last}')])
+
+    def log_message(self, format, *args):
+        pass
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(sys.argv[2], int(sys.argv[3]), sys.argv[4], Path(sys.argv[5]))
+        return
+
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.handlers import Sink
+    import googleapiclient.discovery_cache
+
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else ATTACHMENT_MB
+    smtp_port = free_port()
+    controller = Controller(Sink(), hostname='127.0.0.1', port=smtp_port, data_size_limit=None)
+    controller.start()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGmail)
+    server.daemon_threads = True
+    gmail_root = f'http://127.0.0.1:{server.server_address[1]}/'
+    document_path = Path(googleapiclient.discovery_cache.__file__).parent / 'documents' / 'gmail.v1.json'
+    document = json.loads(document_path.read_text(encoding='utf-8'))
+    document['rootUrl'] = gmail_root
+    document['baseUrl'] = gmail_root + document['servicePath']
+    FakeGmail.document = json.dumps(document).encode()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        attachment = Path(tmp) / 'invoice_bundle.pdf'
+        with open(attachment, 'wb') as f:
+            for _ in range(size_mb):
+                f.write(os.urandom(1 << 20))
+
+        print(f"One email with a {size_mb} MB attachment\n")
+        for mode in MODES:
+            start = time.perf_counter()
+            output = subprocess.run([sys.executable, __file__, '--child', mode, str(smtp_port),
+                                     gmail_root, str(attachment)],
+                                    capture_output=True, text=True)
+            elapsed = time.perf_counter() - start
+            if output.returncode != 0:
+                print(f"{mode:<16} failed: {output.stderr.strip().splitlines()[-1]}")
+                continue
+            peak_mb = int(output.stdout.strip().splitlines()[-1]) / 1024
+            print(f"{mode:<16} peak RSS {peak_mb:7.1f} MB  ({peak_mb / size_mb:4.1f}x attachment)  "
+                  f"{elapsed:6.2f}s")
+
+    controller.stop()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
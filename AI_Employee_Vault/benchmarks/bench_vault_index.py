@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: "pending high-priority items" over a large vault
+Compares globbing and parsing every action file with a VaultIndex query,
+and shows the cost of the startup sync when nothing changed.
+
+Usage: python benchmarks/bench_vault_index.py [file_count]
+"""
+
+import sys
+import time
+import random
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from vault_index import VaultIndex, parse_frontmatter
+
+FILE_COUNT = 100_000
+FOLDERS = ['Needs_Action', 'Done', 'Plans']
+QUERIES = 100
+
+
+def make_vault(root: Path, count: int, rng: random.Random):
+    for folder in FOLDERS:
+        (root / folder).mkdir()
+    for i in range(count):
+        folder = rng.choice(FOLDERS)
+        status = 'pending' if folder == 'Needs_Action' else 'done'
+        priority = rng.choice(['low', 'normal', 'normal', 'high', 'urgent'])
+        (root / folder / f'EMAIL_{i:06d}.md').write_text(
+            f"---\ntype: email\nfrom: sender{i}@example.com\nsubject: Message {i}\n"
+            f"received: 2026-01-01T00:00:{i % 60:02d}\ngmail_id: {i:016x}\n"
+            f"priority: {priority}\nstatus: {status}\n---\n\n## Email Content\n{'lorem ipsum ' * 40}\n")
+
+
+def full_scan(root: Path) -> list:
+    """What callers did before: glob and parse every markdown file"""
+    matches = []
+    for path in root.glob('*/*.md'):
+        fields = parse_frontmatter(path)
+        if fields.get('status') == 'pending' and fields.get('priority') == 'high':
+            matches.append(path)
+    return matches
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else FILE_COUNT
+
+    print("=" * 60)
+    print(f"VAULT INDEX BENCHMARK ({count:,} action files)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_vault(root, count, random.Random(42))
+
+        start = time.perf_counter()
+        scanned = full_scan(root)
+        print(f"Full rescan (glob + parse)     : {time.perf_counter() - start:8.2f} s "
+              f"({len(scanned):,} matches)")
+
+        index = VaultIndex(root)
+        start = time.perf_counter()
+        index.sync()
+        print(f"Initial index build            : {time.perf_counter() - start:8.2f} s")
+
+        start = time.perf_counter()
+        index.sync()
+        print(f"Startup sync, nothing changed  : {time.perf_counter() - start:8.2f} s")
+
+        start = time.perf_counter()
+        for _ in range(QUERIES):
+            items = index.query(status='pending', priority='high')
+        per_query = (time.perf_counter() - start) / QUERIES
+        print(f"Index query                    : {per_query * 1000:8.2f} ms ({len(items):,} matches)")
+
+        start = time.perf_counter()
+        for _ in range(QUERIES):
+            counts = index.count('priority', status='pending')
+        print(f"Index count by priority        : "
+              f"{(time.perf_counter() - start) / QUERIES * 1000:8.2f} ms {counts}")
+
+        start = time.perf_counter()
+        for i in range(QUERIES):
+            index.exists('gmail_id', f'{i * 997:016x}')
+        print(f"Index lookup by gmail_id       : "
+              f"{(time.perf_counter() - start) / QUERIES * 1000:8.3f} ms")
+        index.close()
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Priority Classifier - Keyword-based urgency scoring for incoming items
+Part of the AI Employee Silver Tier implementation
+
+All keywords are compiled into one regular expression, factored as a
+character trie so matching stays a single left-to-right pass over the text
+however many keywords there are. Keywords only match on word boundaries
+("help" does not match "helpful"). Each keyword carries a priority level and
+a weight. The rules are read from the Priority Classification table in
+Company_Handbook.md:
+
+    | 🔴 Urgent | Contains keywords: "urgent", "asap", "emergency=20" | ... |
+
+A keyword may carry an explicit weight with ``=N``; otherwise it gets the
+default weight for its level (also when N is not a number, with a warning).
+"""
+
+import re
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger("Classifier")
+
+PRIORITY_LEVELS = ['low', 'normal', 'high', 'urgent']  # Ascending
+DEFAULT_WEIGHTS = {'low': 0, 'normal': 1, 'high': 5, 'urgent': 10}
+DEFAULT_RULES = {
+    'urgent': ['urgent', 'asap', 'emergency'],
+    'high': ['help', 'invoice', 'payment', 'important'],
+}
+
+_TABLE_ROW = re.compile(r'^\|\s*(?P<label>[^|]+?)\s*\|\s*(?P<criteria>[^|]*)\|', re.MULTILINE)
+_QUOTED = re.compile(r'"([^"]+)"')
+
+
+class Classification(NamedTuple):
+    priority: str
+    score: int
+    matches: Tuple[str, ...]
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Build a prefix-factored alternation, e.g. ['pay', 'payment'] -> pay(?:ment)?"""
+    trie: Dict = {}
+    for word in keywords:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True  # End-of-word marker
+
+    def emit(node: Dict) -> str:
+        optional = '' in node
+        branches = []
+        for char in sorted(c for c in node if c):
+            atom = r'\s+' if char == ' ' else re.escape(char)
+            branches.append(atom + emit(node[char]))
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if optional:
+            if len(branches) == 1:
+                body = '(?:' + body + ')'
+            body += '?'
+        return body
+
+    return emit(trie)
+
+
+class PriorityClassifier:
+    """Scores text against weighted keywords compiled into a single regex"""
+
+    def __init__(self, rules: Optional[Dict[str, Iterable[str]]] = None):
+        # keyword -> (level, weight)
+        self.keywords: Dict[str, Tuple[str, int]] = {}
+        self._single: Dict[str, re.Pattern] = {}  # keyword -> its own pattern, built on demand
+        for level, keywords in (rules or DEFAULT_RULES).items():
+            for keyword in keywords:
+                self.add_keyword(keyword, level)
+        self._compile()
+
+    def add_keyword(self, keyword: str, level: str, weight: Optional[int] = None):
+        """Register a keyword; ``word=N`` sets an explicit weight"""
+        if '=' in keyword and weight is None:
+            keyword, _, raw_weight = keyword.rpartition('=')
+            try:
+                weight = int(raw_weight)
+            except ValueError:
+                logger.warning(f"Ignoring non-numeric weight in keyword rule {keyword}={raw_weight}")
+        keyword = ' '.join(keyword.lower().split())
+        if level not in DEFAULT_WEIGHTS or not keyword:
+            return
+        self.keywords[keyword] = (level, DEFAULT_WEIGHTS[level] if weight is None else weight)
+
+    def _compile(self):
+        if not self.keywords:
+            self.pattern = None
+            return
+        self.pattern = re.compile(r'(?<!\w)(' + _trie_pattern(self.keywords) + r')(?!\w)',
+                                  re.IGNORECASE)
+
+    @classmethod
+    def from_handbook(cls, handbook_path: Path) -> "PriorityClassifier":
+        """Load keyword rules from the handbook, falling back to DEFAULT_RULES"""
+        rules: Dict[str, List[str]] = {}
+        try:
+            text = Path(handbook_path).read_text(encoding='utf-8')
+        except OSError as e:
+            logger.warning(f"Could not read handbook ({e}); using default keyword rules")
+            return cls()
+
+        for row in _TABLE_ROW.finditer(text):
+            criteria = row.group('criteria')
+            if 'keyword' not in criteria.lower():
+                continue
+            label = row.group('label').lower()
+            level = next((lvl for lvl in PRIORITY_LEVELS if lvl in label), None)
+            if level:
+                rules.setdefault(level, []).extend(_QUOTED.findall(criteria))
+
+        if not rules:
+            return cls()
+        logger.info(f"Loaded {sum(len(k) for k in rules.values())} keyword rules from handbook")
+        return cls(rules)
+
+    def classify(self, text: str, default: str = 'normal') -> Classification:
+        """Return the priority (never below ``default``), total weight and matched keywords"""
+        rank = PRIORITY_LEVELS.index(default)
+        score = 0
+        matches: List[str] = []
+
+        if self.pattern is not None and text:
+            found_keywords = {self._keyword_for(m) for m in self.pattern.findall(text)}
+            found_keywords.discard(None)
+            for found in found_keywords:
+                level, weight = self.keywords[found]
+                rank = max(rank, PRIORITY_LEVELS.index(level))
+                score += weight
+                matches.append(found)
+
+        return Classification(PRIORITY_LEVELS[rank], score, tuple(sorted(matches)))
+
+    def _keyword_for(self, matched: str) -> Optional[str]:
+        """
+        The keyword a match came from. Usually its lowercase form, but
+        IGNORECASE also matches characters that lowercase to something else
+        (e.g. "İnvoice" -> "i̇nvoice"); those are matched against each keyword.
+        """
+        normalized = ' '.join(matched.lower().split())
+        if normalized in self.keywords:
+            return normalized
+        for keyword in self.keywords:
+            single = self._single.get(keyword)
+            if single is None:
+                single = self._single[keyword] = re.compile(_trie_pattern([keyword]), re.IGNORECASE)
+            if single.fullmatch(matched):
+                return keyword
+        return None
+
+
+_classifiers: Dict[Path, PriorityClassifier] = {}
+
+
+def load_classifier(vault_path: Path) -> PriorityClassifier:
+    """Classifier built from the vault's Company_Handbook.md (cached per vault)"""
+    vault_path = Path(vault_path)
+    if vault_path not in _classifiers:
+        _classifiers[vault_path] = PriorityClassifier.from_handbook(vault_path / "Company_Handbook.md")
+    return _classifiers[vault_path]
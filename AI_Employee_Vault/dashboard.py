@@ -0,0 +1,202 @@
+"""
+Dashboard - Rate-limited renderer for Dashboard.md
+Part of the AI Employee Silver Tier implementation
+
+Counters come from the vault index (indexed COUNT queries instead of reading
+every file) and recent activity from a capped in-memory ring buffer that is
+also stored in the index's events table, so it survives restarts. Updates
+only mark the dashboard dirty; it is rendered at most once per
+RENDER_INTERVAL, so a burst of new items costs one write. Rendering replaces
+just the generated parts (Last Updated line, status table rows, Recent
+Activity list) and leaves the rest of the file as the user or Claude wrote it.
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+from pathlib import Path
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional
+
+from vault_io import (atomic_write_text, add_write_listener, remove_write_listener,
+                      add_create_listener, remove_create_listener)
+from vault_index import VaultIndex
+
+logger = logging.getLogger("Dashboard")
+
+RENDER_INTERVAL = float(os.getenv('DASHBOARD_RENDER_INTERVAL', '10'))  # seconds between writes
+MAX_ACTIVITY = 20  # Entries shown under Recent Activity
+EVENT_RETENTION_DAYS = 90
+LINKEDIN_POST_EVENT = 'linkedin_post'
+
+TEMPLATE = """# AI Employee Dashboard
+
+**Last Updated:** {updated}
+
+---
+
+## 📊 Status Overview
+
+| Metric | Status |
+|--------|--------|
+| System Status | 🟢 Active |
+| Pending Tasks | 0 |
+| Completed Today | 0 |
+| Requires Approval | 0 |
+
+---
+
+## 🔔 Recent Activity
+
+---
+
+*Dashboard auto-updated by AI Employee*
+"""
+
+_ACTIVITY_SECTION = re.compile(r'(## 🔔 Recent Activity\n).*?(?=\n---|\Z)', re.DOTALL)
+
+
+def _midnight() -> float:
+    return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+
+class Dashboard:
+    """Keeps Dashboard.md current from index counters and an activity ring buffer"""
+
+    def __init__(self, vault_path: Path, index: Optional[VaultIndex] = None,
+                 render_interval: float = RENDER_INTERVAL, max_activity: int = MAX_ACTIVITY):
+        self.vault_path = Path(vault_path)
+        self.path = self.vault_path / "Dashboard.md"
+        self._owns_index = index is None
+        self.index = index or VaultIndex(self.vault_path)
+        self.render_interval = render_interval
+        self.activity = deque(self.index.recent_events(max_activity), maxlen=max_activity)
+        self.counters: Dict[str, int] = {}
+
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        self._last_render = 0.0
+        self.renders = 0
+
+    # --- Events ---
+
+    def record(self, kind: str, message: str):
+        """Add an activity entry and schedule a render"""
+        now = time.time()
+        self.index.add_event(kind, message, now)
+        with self._lock:
+            self.activity.append((now, kind, message))
+        self.request_render()
+
+    def _on_create(self, path: Path):
+        """vault_io create listener: new action items appear in Recent Activity"""
+        path = Path(path)
+        if path.suffix == '.md' and 'Needs_Action' in path.parts:
+            self.record('action_created', f"New action item: {path.stem}")
+
+    def _on_write(self, path: Path):
+        """vault_io write listener: approvals and completed items change the counters"""
+        path = Path(path)
+        if path.suffix == '.md' and {'Pending_Approval', 'Done'} & set(path.parts):
+            self.request_render()
+
+    def posted_today(self, kind: str = LINKEDIN_POST_EVENT) -> bool:
+        """Whether an event of ``kind`` (by default a LinkedIn post) happened today"""
+        return posted_today(self.index, kind)
+
+    # --- Rendering ---
+
+    def request_render(self):
+        """Mark dirty; renders now if the last render is old enough, otherwise once the interval passes"""
+        with self._lock:
+            self._dirty = True
+            if self._timer is not None:
+                return  # A render is already scheduled; this update joins it
+            delay = max(0.0, self._last_render + self.render_interval - time.monotonic())
+            self._timer = threading.Timer(delay, self._render_scheduled)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _render_scheduled(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.render()
+        except Exception as e:
+            logger.error(f"Error rendering dashboard: {e}")
+
+    def refresh_counters(self) -> Dict[str, int]:
+        by_folder = self.index.count('folder')
+        done_today = self.index.count('folder', modified_since=_midnight(), folder='Done')
+        self.counters = {
+            'Pending Tasks': by_folder.get('Needs_Action', 0),
+            'Completed Today': done_today.get('Done', 0),
+            'Requires Approval': by_folder.get('Pending_Approval', 0),
+        }
+        return self.counters
+
+    def render(self):
+        """Rewrite the generated parts of Dashboard.md if anything changed"""
+        with self._lock:
+            self._dirty = False
+            self._last_render = time.monotonic()
+            activity = list(self.activity)
+
+        counters = self.refresh_counters()
+        try:
+            text = self.path.read_text(encoding='utf-8')
+        except FileNotFoundError:
+            text = TEMPLATE.format(updated='')
+
+        original = text
+        for label, value in counters.items():
+            text = re.sub(rf'^(\|\s*{re.escape(label)}\s*\|)[^|\n]*(\|)',
+                          lambda m: f"{m.group(1)} {value} {m.group(2)}", text, count=1, flags=re.MULTILINE)
+
+        lines = ''.join(f"- **[{datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M')}]** {message}\n"
+                        for ts, _, message in reversed(activity))
+        if activity:
+            text = _ACTIVITY_SECTION.sub(lambda m: m.group(1) + '\n' + lines, text, count=1)
+
+        if text == original:
+            return  # Nothing changed; skip the write (and the Last Updated bump)
+        updated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        text = re.sub(r'^\*\*Last Updated:\*\*.*$', f'**Last Updated:** {updated}', text,
+                      count=1, flags=re.MULTILINE)
+        atomic_write_text(self.path, text, fsync=False)
+        self.renders += 1
+
+    # --- Lifecycle ---
+
+    def start(self):
+        self.index.prune_events(time.time() - EVENT_RETENTION_DAYS * 86400)
+        add_write_listener(self._on_write)
+        add_create_listener(self._on_create)
+        self.request_render()
+
+    def close(self):
+        """Stop listening and flush a pending render"""
+        remove_write_listener(self._on_write)
+        remove_create_listener(self._on_create)
+        with self._lock:
+            timer, self._timer = self._timer, None
+            dirty = self._dirty
+        if timer is not None:
+            timer.cancel()
+        if dirty:
+            self.render()
+        if self._owns_index:
+            self.index.close()
+
+
+def posted_today(index: VaultIndex, kind: str = LINKEDIN_POST_EVENT) -> bool:
+    """Structured check: an event of ``kind`` today, or a matching item completed today"""
+    midnight = _midnight()
+    last = index.last_event_time(kind)
+    if last is not None and last >= midnight:
+        return True
+    return bool(index.count('folder', modified_since=midnight, folder='Done', type=kind))
@@ -0,0 +1,168 @@
+"""
+Dedup Store - Bounded, append-only record of already processed item IDs
+Part of the AI Employee Silver Tier implementation
+
+Replaces the per-watcher ``processed_*`` JSON sets. Each new ID costs one
+appended log line instead of a rewrite of the whole history, and entries are
+evicted by age (TTL) and by count so memory and load time stay bounded.
+The log is compacted once it holds too many stale lines.
+
+With ``autocommit=False`` appends are buffered until ``commit()`` so a
+watcher can fsync once per poll cycle instead of once per item.
+"""
+
+import os
+import json
+import time
+import logging
+from pathlib import Path
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+from vault_io import atomic_write_json, fsync_dir
+
+logger = logging.getLogger("DedupStore")
+
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_TTL_DAYS = 90
+COMPACT_RATIO = 2  # Compact once the log has this many lines per live entry
+MIN_COMPACT_LINES = 10_000
+# Group-commit state once per poll cycle instead of once per item
+GROUP_COMMIT = os.getenv('STATE_GROUP_COMMIT', 'false').lower() == 'true'
+
+
+class DedupStore:
+    """Set-like store of seen IDs with TTL/size eviction and append-only persistence"""
+
+    def __init__(self, log_path: Path, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl_days: Optional[float] = DEFAULT_TTL_DAYS,
+                 autocommit: bool = not GROUP_COMMIT):
+        self.log_path = Path(log_path)
+        self.max_entries = max_entries
+        self.ttl = ttl_days * 86400 if ttl_days else None
+        self.autocommit = autocommit
+        self.entries: "OrderedDict[str, float]" = OrderedDict()  # id -> first seen
+        self._pending: List[str] = []
+        self._log_lines = 0
+        self._log = None
+
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Replay the log, dropping expired and overflowing entries"""
+        if self.log_path.exists():
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        seen_at, item_id = json.loads(line)
+                    except ValueError:
+                        # Torn final line from a crash mid-append
+                        continue
+                    self._log_lines += 1
+                    if item_id not in self.entries:
+                        self.entries[item_id] = seen_at
+            self._evict()
+            logger.info(f"Loaded {len(self.entries)} IDs from {self.log_path.name}")
+
+        self._log = open(self.log_path, 'a', encoding='utf-8')
+
+    def _evict(self):
+        """Drop entries past the TTL, then the oldest ones past max_entries"""
+        if self.ttl is not None:
+            cutoff = time.time() - self.ttl
+            while self.entries:
+                _, seen_at = next(iter(self.entries.items()))
+                if seen_at >= cutoff:
+                    break
+                self.entries.popitem(last=False)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def __contains__(self, item_id: str) -> bool:
+        seen_at = self.entries.get(item_id)
+        if seen_at is None:
+            return False
+        return self.ttl is None or seen_at >= time.time() - self.ttl
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, item_id: str):
+        """Record an ID, appending a single line to the log"""
+        if item_id in self.entries:
+            return
+        self.update([item_id])
+
+    def update(self, item_ids: Iterable[str]):
+        """Record many IDs with one write"""
+        now = time.time()
+        for item_id in item_ids:
+            if item_id in self.entries:
+                continue
+            self.entries[item_id] = now
+            self._pending.append(json.dumps([now, item_id]) + '\n')
+
+        self._evict()
+        if self.autocommit:
+            self.commit()
+
+    def commit(self):
+        """Append and fsync all buffered IDs in a single write"""
+        if not self._pending:
+            return
+
+        self._log.write(''.join(self._pending))
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._log_lines += len(self._pending)
+        self._pending.clear()
+
+        if self._log_lines > max(MIN_COMPACT_LINES, COMPACT_RATIO * len(self.entries)):
+            self.compact()
+
+    def compact(self):
+        """Rewrite the log with only the live entries"""
+        self._pending.clear()  # Everything buffered is in self.entries
+        tmp_path = self.log_path.with_name(f".{self.log_path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for item_id, seen_at in self.entries.items():
+                f.write(json.dumps([seen_at, item_id]) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._log.close()
+        os.replace(tmp_path, self.log_path)
+        fsync_dir(self.log_path.parent)
+        self._log = open(self.log_path, 'a', encoding='utf-8')
+        self._log_lines = len(self.entries)
+        logger.debug(f"Compacted {self.log_path.name} to {self._log_lines} entries")
+
+    def migrate_from_json(self, state_file: Path, key: str):
+        """Import IDs from a legacy ``*_state.json`` set and drop it from the file"""
+        state_file = Path(state_file)
+        if not state_file.exists():
+            return
+
+        try:
+            with open(state_file, 'r') as f:
+                state = json.load(f)
+        except Exception as e:
+            logger.error(f"Error reading legacy state {state_file.name}: {e}")
+            return
+
+        legacy_ids = state.pop(key, None)
+        if legacy_ids is None:
+            return
+
+        self.update(legacy_ids)
+        self.commit()
+        atomic_write_json(state_file, state)
+        logger.info(f"Migrated {len(legacy_ids)} IDs from {state_file.name}")
+
+    def close(self):
+        """Commit pending IDs and close the underlying log file"""
+        if self._log and not self._log.closed:
+            self.commit()
+            self._log.close()
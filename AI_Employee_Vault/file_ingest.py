@@ -0,0 +1,182 @@
+"""
+File Ingest - Cheapest-available transfer of Inbox drops into Needs_Action
+Part of the AI Employee Bronze Tier Implementation
+
+Strategies (INBOX_INGEST_STRATEGY):
+    auto      reflink, then copy - an independent copy either way
+    reflink   copy-on-write clone (FICLONE: btrfs, XFS, bcachefs...)
+    hardlink  second directory entry for the same inode (Inbox and
+              Needs_Action then share one copy; edits show up in both),
+              so only used when asked for explicitly
+    move      rename out of Inbox (the original no longer stays in Inbox)
+    copy      streaming byte copy
+
+The SHA-256 of the content is computed in the same pass that moves the
+bytes: during a copy it is updated chunk by chunk, and for the zero-copy
+strategies the single hashing read is the only read. A file whose hash was
+already ingested (in this run, or in the persistent IngestIndex when one
+is given) is reported as a duplicate and nothing is written. An existing
+destination is never replaced.
+"""
+
+import os
+import errno
+import shutil
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+from vault_io import fsync_dir
+
+logger = logging.getLogger("FileIngest")
+
+INGEST_STRATEGY = os.getenv('INBOX_INGEST_STRATEGY', 'auto')
+STRATEGIES = ('auto', 'reflink', 'hardlink', 'move', 'copy')
+CHUNK_SIZE = 1024 * 1024
+FICLONE = 0x40049409  # linux/fs.h _IOW(0x94, 9, int)
+
+# Errors meaning "this filesystem can't do that", as opposed to real failures
+_UNSUPPORTED = {errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP, errno.ENOTTY,
+                errno.EINVAL, errno.ENOSYS, errno.EMLINK}
+
+
+class IngestResult(NamedTuple):
+    method: str
+    sha256: str
+    size: int
+    dest: Path
+    duplicate_of: Optional[Path] = None
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileIngestor:
+    """Transfers files with the cheapest working strategy and detects duplicate content"""
+
+    def __init__(self, strategy: str = INGEST_STRATEGY, index=None):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown ingest strategy {strategy!r}; expected one of {STRATEGIES}")
+        self.strategy = strategy
+        self.unsupported = set()  # Methods that failed with an "unsupported" error
+        self.known_hashes: Dict[str, Path] = {}  # sha256 -> first ingested destination
+        self.index = index  # Optional IngestIndex for hashes from earlier runs
+        self._lock = threading.Lock()
+
+    def _candidates(self):
+        if self.strategy == 'auto':
+            order = ['reflink', 'copy']
+        elif self.strategy == 'copy':
+            order = ['copy']
+        else:
+            order = [self.strategy, 'copy']  # Always able to fall back to a copy
+        return [m for m in order if m not in self.unsupported]
+
+    def _claim(self, sha256: str, dest: Path) -> Optional[Path]:
+        """Register a hash; returns the earlier destination if it was already known"""
+        with self._lock:
+            existing = self.known_hashes.get(sha256)
+            if existing is None and self.index is not None:
+                existing = self.index.find_hash(sha256)
+            if existing is not None:
+                return existing
+            self.known_hashes[sha256] = dest
+            return None
+
+    def ingest(self, source: Path, dest: Path) -> IngestResult:
+        """Place ``source`` at ``dest`` (unless its content was already ingested)"""
+        source, dest = Path(source), Path(dest)
+        if dest.exists():
+            raise FileExistsError(errno.EEXIST, "Ingest destination already exists", str(dest))
+        for method in self._candidates():
+            try:
+                if method == 'copy':
+                    return self._copy(source, dest)
+                return self._zero_copy(method, source, dest)
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED or method == 'copy':
+                    raise
+                logger.info(f"{method} not supported here ({e.strerror}); falling back")
+                self.unsupported.add(method)
+        raise OSError(f"No ingest strategy available for {source}")
+
+    def _zero_copy(self, method: str, source: Path, dest: Path) -> IngestResult:
+        """Hash with one read, then link/clone/rename without copying bytes"""
+        size = source.stat().st_size
+        sha256 = hash_file(source)
+        duplicate = self._claim(sha256, dest)
+        if duplicate is not None:
+            return IngestResult(method, sha256, size, dest, duplicate)
+
+        try:
+            if method == 'hardlink':
+                os.link(source, dest)
+            elif method == 'move':
+                os.rename(source, dest)
+            else:
+                self._reflink(source, dest)
+        except OSError:
+            with self._lock:
+                self.known_hashes.pop(sha256, None)
+            raise
+
+        fsync_dir(dest.parent)
+        return IngestResult(method, sha256, size, dest)
+
+    @staticmethod
+    def _reflink(source: Path, dest: Path):
+        """Copy-on-write clone via the FICLONE ioctl (Linux only)"""
+        try:
+            import fcntl
+        except ImportError:
+            raise OSError(errno.EOPNOTSUPP, "reflink requires Linux")
+
+        tmp_path = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+        try:
+            with open(source, 'rb') as src, open(tmp_path, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                os.fsync(dst.fileno())
+            shutil.copystat(source, tmp_path)
+            os.replace(tmp_path, dest)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def _copy(self, source: Path, dest: Path) -> IngestResult:
+        """Streaming copy that hashes each chunk as it is written"""
+        digest = hashlib.sha256()
+        size = 0
+        tmp_path = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+        try:
+            with open(source, 'rb') as src, open(tmp_path, 'wb') as dst:
+                for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    dst.write(chunk)
+                    size += len(chunk)
+                dst.flush()
+                os.fsync(dst.fileno())
+
+            sha256 = digest.hexdigest()
+            duplicate = self._claim(sha256, dest)
+            if duplicate is not None:
+                tmp_path.unlink()
+                return IngestResult('copy', sha256, size, dest, duplicate)
+
+            shutil.copystat(source, tmp_path)
+            os.replace(tmp_path, dest)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        fsync_dir(dest.parent)
+        if self.strategy == 'move':
+            source.unlink()  # Cross-device move: copy then remove the original
+        return IngestResult('copy', sha256, size, dest)
@@ -3,33 +3,73 @@ Filesystem Watcher - Monitors Inbox folder for new files
 Part of the AI Employee Bronze Tier Implementation
 """
 
+import os
+import re
+import time
 from pathlib import Path
+from typing import Optional
 from datetime import datetime
-import shutil
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from base_watcher import BaseWatcher
+from logging_setup import log_cycle
+from metrics import (WRITE_SECONDS, DEDUP_ENTRIES, QUEUE_DEPTH, SNAPSHOT_INTERVAL,
+                     record_cycle, write_snapshot)
+from vault_io import atomic_write_text
+from scheduler import schedule_for
+from classifier import load_classifier
+from ingest_pipeline import IngestPipeline
+from file_ingest import FileIngestor, IngestResult
+from ingest_index import IngestIndex
+from vault_layout import partition_dir, _free_name
 
 
 class InboxFileHandler(FileSystemEventHandler):
-    """Handles file system events in the Inbox folder"""
+    """Handles file system events in the Inbox folder
+
+    Events are only queued here; the watcher's ingest pipeline waits for each
+    file to finish being written and processes it on a worker thread, so the
+    observer thread never blocks on a copy.
+    """
 
     def __init__(self, watcher):
         self.watcher = watcher
 
+    @staticmethod
+    def _ignored(source: Path) -> bool:
+        # Ignore temporary files and hidden files
+        return source.name.startswith('.') or source.name.startswith('~')
+
     def on_created(self, event):
         """Called when a file is created in the Inbox"""
         if event.is_directory:
             return
 
         source = Path(event.src_path)
-
-        # Ignore temporary files and hidden files
-        if source.name.startswith('.') or source.name.startswith('~'):
+        if self._ignored(source):
             return
 
         self.watcher.logger.info(f'New file detected: {source.name}')
-        self.watcher.process_file(source)
+        self.watcher.pipeline.submit(source)
+
+    def on_modified(self, event):
+        """Called while a file is being written; delays processing until it settles"""
+        if event.is_directory:
+            return
+
+        source = Path(event.src_path)
+        if not self._ignored(source):
+            self.watcher.pipeline.submit(source, refresh_only=True)
+
+    def on_moved(self, event):
+        """Called when a file is renamed into (or within) the Inbox"""
+        if event.is_directory:
+            return
+
+        dest = Path(event.dest_path)
+        if dest.parent == self.watcher.inbox and not self._ignored(dest):
+            self.watcher.logger.info(f'File moved into Inbox: {dest.name}')
+            self.watcher.pipeline.submit(dest)
 
 
 class FilesystemWatcher(BaseWatcher):
@@ -40,21 +80,34 @@ class FilesystemWatcher(BaseWatcher):
         self.inbox = self.vault_path / 'Inbox'
         self.inbox.mkdir(exist_ok=True)
         self.observer = None
+        self.classifier = load_classifier(self.vault_path)
+        self.pipeline = IngestPipeline(self.process_file, logger=self.logger)
+        # Persistent record of ingested files so restarts don't re-copy them
+        self.index = IngestIndex(self.vault_path / 'Logs' / 'inbox_index.sqlite3')
+        self.ingestor = FileIngestor(index=self.index)
+        self._dropped_seen = 0
+        self._processed_seen = 0
 
     def process_file(self, source: Path):
         """Process a new file dropped in Inbox"""
         try:
             # Generate unique filename
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            dest_name = f'FILE_{timestamp}_{source.name}'
-            dest = self.needs_action / dest_name
-
-            # Copy file to Needs_Action
-            shutil.copy2(source, dest)
-            self.logger.info(f'Copied file to: {dest.name}')
+            dest = _free_name(partition_dir(self.vault_path, 'Needs_Action'),
+                              f'FILE_{timestamp}_{source.name}', set())
+
+            # Link, clone or copy into Needs_Action (hashing in the same pass)
+            stat = source.stat()
+            result = self.ingestor.ingest(source, dest)
+            self.index.record(source, stat, result.sha256, result.duplicate_of or dest)
+            if result.duplicate_of is not None:
+                self.logger.info(f'{source.name} has the same content as '
+                                 f'{result.duplicate_of.name}, skipping')
+                return
+            self.logger.info(f'Ingested file to: {dest.name} ({result.method})')
 
             # Create metadata file
-            self.create_action_file(source)
+            self.create_action_file(source, result)
 
             # Optionally remove from Inbox (or move to archive)
             # source.unlink()  # Uncomment to delete from Inbox after processing
@@ -63,30 +116,48 @@ class FilesystemWatcher(BaseWatcher):
             self.logger.error(f'Error processing file {source.name}: {e}')
 
     def check_for_updates(self) -> list:
-        """Check Inbox for existing files (initial scan)"""
+        """Check Inbox for files not yet ingested (stat match against the index, no hashing)"""
+        known = self.index.stat_map()
         files = []
-        for file_path in self.inbox.iterdir():
-            if file_path.is_file() and not file_path.name.startswith('.'):
-                files.append(file_path)
+        with os.scandir(self.inbox) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                if known.get(entry.path) != (stat.st_size, stat.st_mtime_ns, stat.st_ino):
+                    files.append(Path(entry.path))
         return files
 
-    def create_action_file(self, source: Path) -> Path:
+    def create_action_file(self, source: Path, ingest: Optional[IngestResult] = None) -> Path:
         """Create metadata file for the dropped file"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        meta_path = self.needs_action / f'FILE_{timestamp}_{source.stem}.md'
+        # Named after the full file name plus .md, so it can never be the ingested
+        # file itself (dropping notes.md gives FILE_..._notes.md and FILE_..._notes.md.md)
+        if ingest:
+            directory, name = ingest.dest.parent, f'{ingest.dest.name}.md'
+        else:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            directory, name = partition_dir(self.vault_path, 'Needs_Action'), f'FILE_{timestamp}_{source.name}.md'
+        meta_path = _free_name(directory, name, set())
 
-        # Get file stats
-        stats = source.stat()
-        file_size = stats.st_size
+        # Read from the ingested copy: with the move strategy the source is gone
+        content_path = ingest.dest if ingest else source
+        file_size = ingest.size if ingest else source.stat().st_size
         file_size_str = self._format_file_size(file_size)
+        if ingest is None:
+            location = 'Inbox'
+        else:
+            location = ingest.dest.relative_to(self.vault_path).as_posix()
+            if ingest.method != 'move':
+                location += ' (original still in Inbox)'
+        hash_line = f"sha256: {ingest.sha256}\n" if ingest else ""
 
         content = f"""---
 type: file_drop
 original_name: {source.name}
 size: {file_size_str}
 size_bytes: {file_size}
-received: {datetime.now().isoformat()}
-priority: normal
+{hash_line}received: {datetime.now().isoformat()}
+priority: {self._classify(source, content_path)}
 status: pending
 ---
 
@@ -94,7 +165,7 @@ status: pending
 
 **File:** {source.name}
 **Size:** {file_size_str}
-**Location:** Inbox
+**Location:** {location}
 
 ## Suggested Actions
 - [ ] Review file contents
@@ -106,10 +177,19 @@ status: pending
 Add any relevant notes or observations here.
 """
 
-        meta_path.write_text(content, encoding='utf-8')
+        with WRITE_SECONDS.time(watcher='filesystem'):
+            atomic_write_text(meta_path, content, overwrite=False)  # Never replace a user's file
         self.logger.info(f'Created metadata file: {meta_path.name}')
         return meta_path
 
+    def _classify(self, source: Path, content_path: Optional[Path] = None) -> str:
+        """Priority from the file name and, for small text files, their contents"""
+        content_path = content_path or source
+        text = re.sub(r'[_\-.]+', ' ', source.stem)
+        if source.suffix.lower() in ('.txt', '.md') and content_path.stat().st_size <= 64 * 1024:
+            text += '\n' + content_path.read_text(encoding='utf-8', errors='ignore')
+        return self.classifier.classify(text).priority
+
     def _format_file_size(self, size_bytes: int) -> str:
         """Format file size in human-readable format"""
         for unit in ['B', 'KB', 'MB', 'GB']:
@@ -118,34 +198,74 @@ Add any relevant notes or observations here.
             size_bytes /= 1024.0
         return f"{size_bytes:.2f} TB"
 
-    def run(self):
-        """Start watching the Inbox folder"""
-        self.logger.info(f'Starting Filesystem Watcher')
-        self.logger.info(f'Watching: {self.inbox}')
+    def setup(self):
+        """Queue existing Inbox files and start the watchdog observer"""
+        self.pipeline.start()
+
+        # Start watching for new files
+        event_handler = InboxFileHandler(self)
+        self.observer = Observer()
+        self.observer.schedule(event_handler, str(self.inbox), recursive=False)
+        self.observer.start()
 
         # Process any existing files first
         existing_files = self.check_for_updates()
         if existing_files:
             self.logger.info(f'Processing {len(existing_files)} existing file(s)')
             for file_path in existing_files:
-                self.process_file(file_path)
+                self.pipeline.submit(file_path)
+
+    def poll_once(self) -> int:
+        """Report pipeline progress and rescan Inbox if events were dropped under load"""
+        metrics = self.pipeline.metrics()
+        if metrics['dropped'] > self._dropped_seen:
+            self._dropped_seen = metrics['dropped']
+            self.logger.info('Rescanning Inbox for files dropped under backpressure')
+            for file_path in self.check_for_updates():
+                self.pipeline.submit(file_path)
+
+        QUEUE_DEPTH.set(metrics['pending'] + metrics['in_flight'], watcher='filesystem')
+        DEDUP_ENTRIES.set(len(self.index), watcher='filesystem')
+
+        processed = metrics['processed'] - self._processed_seen
+        self._processed_seen = metrics['processed']
+        if metrics['pending'] or metrics['in_flight']:
+            self.logger.debug(f"Ingest queue: {metrics['pending']} pending, "
+                              f"{metrics['in_flight']} in flight")
+        return processed
+
+    def teardown(self):
+        """Stop the watchdog observer and drain the ingest pipeline"""
+        if self.observer:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+        self.pipeline.stop(drain=True)
+        self.index.close()
 
-        # Start watching for new files
-        event_handler = InboxFileHandler(self)
-        self.observer = Observer()
-        self.observer.schedule(event_handler, str(self.inbox), recursive=False)
-        self.observer.start()
+    def run(self):
+        """Start watching the Inbox folder"""
+        self.logger.info(f'Starting Filesystem Watcher')
+        self.logger.info(f'Watching: {self.inbox}')
+
+        self.setup()
 
         self.logger.info('Watcher is now active. Press Ctrl+C to stop.')
 
+        schedule = schedule_for(self, 'filesystem', self.vault_path)
+        delay = self.check_interval
         try:
             while True:
-                import time
-                time.sleep(1)
+                time.sleep(delay)
+                started = time.monotonic()
+                items = self.poll_once()
+                record_cycle('filesystem', items, time.monotonic() - started)
+                log_cycle(self.logger, 'filesystem', items, started)
+                delay = schedule.next_delay(items)
+                write_snapshot(self.vault_path / 'Logs' / 'metrics_filesystem.prom', SNAPSHOT_INTERVAL)
         except KeyboardInterrupt:
             self.logger.info('Stopping watcher...')
-            self.observer.stop()
-            self.observer.join()
+            self.teardown()
             self.logger.info('Watcher stopped')
 
 
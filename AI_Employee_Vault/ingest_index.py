@@ -0,0 +1,95 @@
+"""
+Ingest Index - Persistent, content-addressed record of ingested Inbox files
+Part of the AI Employee Bronze Tier Implementation
+
+One SQLite row per Inbox path with the size, mtime and inode it had when it
+was ingested, plus the SHA-256 of its content and where it went. On restart
+a file is skipped if its stat still matches its row (one primary-key lookup,
+no read). Only files whose stat changed, or that are new, get hashed, and a
+hash already in the index means the content was ingested before under
+another name or at another time.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger("IngestIndex")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    dest TEXT NOT NULL,
+    ingested_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_sha256 ON files (sha256);
+"""
+
+
+class IngestIndex:
+    """SQLite-backed index of ingested files keyed by path and by content hash"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()  # Shared by the ingest worker threads
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        logger.info(f"Ingest index has {len(self)} file(s)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+    def is_current(self, path: Path, stat: Optional[os.stat_result] = None) -> bool:
+        """True if ``path`` was ingested and its size, mtime and inode are unchanged"""
+        try:
+            stat = stat or Path(path).stat()
+        except OSError:
+            return False
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT size, mtime_ns, inode FROM files WHERE path = ?', (str(path),)
+            ).fetchone()
+        return row == (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+    def stat_map(self) -> Dict[str, Tuple[int, int, int]]:
+        """path -> (size, mtime_ns, inode) for every row, for bulk startup scans"""
+        with self._lock:
+            rows = self._conn.execute('SELECT path, size, mtime_ns, inode FROM files')
+            return {path: (size, mtime_ns, inode) for path, size, mtime_ns, inode in rows}
+
+    def find_hash(self, sha256: str) -> Optional[Path]:
+        """Destination of earlier content with this hash, if any"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT dest FROM files WHERE sha256 = ? LIMIT 1', (sha256,)
+            ).fetchone()
+        return Path(row[0]) if row else None
+
+    def record(self, path: Path, stat: os.stat_result, sha256: str, dest: Path):
+        """Remember that ``path`` (with this stat) was ingested to ``dest``"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (str(path), stat.st_size, stat.st_mtime_ns, stat.st_ino,
+                 sha256, str(dest), time.time()))
+
+    def forget(self, path: Path):
+        """Drop the row for ``path`` so it is ingested again"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM files WHERE path = ?', (str(path),))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,206 @@
+"""
+Ingest Pipeline - Debounced, coalescing work queue for Inbox file events
+Part of the AI Employee Bronze Tier Implementation
+
+Filesystem events are only recorded on the watchdog thread. A scheduler
+thread waits until a file's size and mtime have stopped changing (so files
+still being written are not copied half-finished) and then hands it to a
+bounded worker pool. Repeated events for the same path collapse into one
+entry. When too many files are waiting, submit() blocks for a while and then
+drops the event; the watcher picks dropped files up again on its next rescan.
+"""
+
+import time
+import heapq
+import logging
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+SETTLE_TIME = 1.0  # seconds a file must stay unchanged before processing
+WORKERS = 4
+MAX_PENDING = 1000  # files waiting or in flight before submit() applies backpressure
+SUBMIT_TIMEOUT = 5.0  # seconds submit() blocks before dropping an event
+
+
+class _Entry:
+    """A pending path and the last size/mtime seen for it"""
+
+    __slots__ = ('signature', 'due', 'enqueued')
+
+    def __init__(self, signature: Optional[Tuple[int, int]], due: float, enqueued: float):
+        self.signature = signature
+        self.due = due
+        self.enqueued = enqueued
+
+
+class IngestPipeline:
+    """Coalesces file events per path, debounces them, and processes them on a worker pool"""
+
+    def __init__(self, process: Callable[[Path], None], settle_time: float = SETTLE_TIME,
+                 workers: int = WORKERS, max_pending: int = MAX_PENDING,
+                 logger: Optional[logging.Logger] = None):
+        self.process = process
+        self.settle_time = settle_time
+        self.workers = workers
+        self.max_pending = max_pending
+        self.logger = logger or logging.getLogger("IngestPipeline")
+
+        self._cond = threading.Condition()
+        self._pending: Dict[Path, _Entry] = {}
+        self._due: List[Tuple[float, str]] = []  # heap of (due time, path)
+        self._in_flight: set = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._scheduler: Optional[threading.Thread] = None
+        self._running = False
+
+        self.stats = {
+            'submitted': 0, 'coalesced': 0, 'processed': 0, 'failed': 0,
+            'dropped': 0, 'max_depth': 0, 'total_latency': 0.0,
+        }
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def start(self):
+        """Start the scheduler thread and worker pool"""
+        self._running = True
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingest")
+        self._scheduler = threading.Thread(target=self._schedule, name="ingest-scheduler", daemon=True)
+        self._scheduler.start()
+
+    def stop(self, drain: bool = True):
+        """Stop scheduling; with drain, wait for in-flight files to finish"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._scheduler:
+            self._scheduler.join()
+        if self._executor:
+            self._executor.shutdown(wait=drain)
+
+    def depth(self) -> int:
+        """Files waiting to settle plus files being processed"""
+        return len(self._pending) + len(self._in_flight)
+
+    def submit(self, path: Path, refresh_only: bool = False) -> bool:
+        """
+        Record an event for ``path``
+        With refresh_only, only paths already pending are touched (used for
+        modify events, which should delay processing but not start it).
+        Returns False if the event was dropped because the queue stayed full.
+        """
+        path = Path(path)
+        signature = self._signature(path)
+        with self._cond:
+            now = time.monotonic()
+            entry = self._pending.get(path)
+            if entry is not None:
+                # Coalesce: the file changed again, restart its settle timer
+                self.stats['coalesced'] += 1
+                entry.signature = signature
+                entry.due = now + self.settle_time
+                heapq.heappush(self._due, (entry.due, str(path)))
+                return True
+            if refresh_only or path in self._in_flight:
+                return True
+
+            # Backpressure: wait for room, then give up and let the rescan catch it
+            deadline = now + SUBMIT_TIMEOUT
+            while self.depth() >= self.max_pending and self._running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats['dropped'] += 1
+                    self.logger.warning(f'Ingest queue full ({self.depth()}), dropped event for {path.name}')
+                    return False
+                self._cond.wait(remaining)
+
+            now = time.monotonic()
+            self._pending[path] = _Entry(signature, now + self.settle_time, now)
+            heapq.heappush(self._due, (now + self.settle_time, str(path)))
+            self.stats['submitted'] += 1
+            self.stats['max_depth'] = max(self.stats['max_depth'], self.depth())
+            self._cond.notify_all()
+            return True
+
+    def _schedule(self):
+        """Move settled files to the worker pool, keeping at most 2x workers queued there"""
+        while True:
+            ready: List[Path] = []
+            with self._cond:
+                if not self._running:
+                    return
+                now = time.monotonic()
+                while self._due and self._due[0][0] <= now and len(self._in_flight) < self.workers * 2:
+                    due, key = heapq.heappop(self._due)
+                    path = Path(key)
+                    entry = self._pending.get(path)
+                    if entry is None or entry.due != due:
+                        continue  # Superseded by a later event
+                    ready.append(path)
+
+                wait = 0.5  # Completions and new submits notify us sooner
+                if self._due and len(self._in_flight) < self.workers * 2:
+                    wait = max(0.01, min(wait, self._due[0][0] - now))
+                if not ready:
+                    self._cond.wait(wait)
+                    continue
+
+            # Stat outside the lock; unchanged files go to the workers
+            for path in ready:
+                signature = self._signature(path)
+                with self._cond:
+                    entry = self._pending.get(path)
+                    if entry is None:
+                        continue
+                    if signature is None:
+                        del self._pending[path]  # Deleted or moved away before settling
+                        self._cond.notify_all()
+                    elif signature != entry.signature:
+                        entry.signature = signature
+                        entry.due = time.monotonic() + self.settle_time
+                        heapq.heappush(self._due, (entry.due, str(path)))
+                    else:
+                        del self._pending[path]
+                        self._in_flight.add(path)
+                        self._executor.submit(self._run, path, entry.enqueued)
+
+    def _run(self, path: Path, enqueued: float):
+        try:
+            self.process(path)
+            outcome = 'processed'
+        except Exception as e:
+            self.logger.error(f'Error processing {path.name}: {e}')
+            outcome = 'failed'
+        with self._cond:
+            self._in_flight.discard(path)
+            self.stats[outcome] += 1
+            self.stats['total_latency'] += time.monotonic() - enqueued
+            self._cond.notify_all()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until nothing is pending or in flight"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.depth() == 0, timeout)
+
+    def metrics(self) -> Dict:
+        """Queue depth and throughput counters"""
+        with self._cond:
+            done = self.stats['processed'] + self.stats['failed']
+            return {
+                'pending': len(self._pending),
+                'in_flight': len(self._in_flight),
+                'max_depth': self.stats['max_depth'],
+                'submitted': self.stats['submitted'],
+                'coalesced': self.stats['coalesced'],
+                'processed': self.stats['processed'],
+                'failed': self.stats['failed'],
+                'dropped': self.stats['dropped'],
+                'avg_latency': self.stats['total_latency'] / done if done else 0.0,
+            }
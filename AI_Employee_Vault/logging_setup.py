@@ -0,0 +1,141 @@
+"""
+Logging Setup - Shared, non-blocking logging for every watcher and the supervisor
+Part of the AI Employee Silver Tier implementation
+
+setup_logging() installs a single QueueHandler on the root logger. Poll
+loops only put records on an in-memory queue; a QueueListener thread does
+the formatting and file/console I/O. Files are written as JSON lines
+(Logs/<name>.log), rotated at midnight or once they reach LOG_MAX_BYTES,
+whichever comes first. Calling setup_logging() again is a no-op, so
+constructing a watcher twice (or importing several watcher modules) never
+duplicates lines.
+
+Structured fields go in ``extra``; log_cycle() records one line per poll
+cycle with the watcher name, items found, latency and any error.
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+from pathlib import Path
+from datetime import datetime
+from typing import Optional
+
+VAULT_PATH = Path(__file__).parent
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '14'))
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RotatingJsonFileHandler(logging.handlers.TimedRotatingFileHandler):
+    """Rotates at midnight and also whenever the file grows past ``max_bytes``"""
+
+    def __init__(self, filename: Path, max_bytes: int = LOG_MAX_BYTES,
+                 backup_count: int = LOG_BACKUP_COUNT):
+        super().__init__(filename, when='midnight', backupCount=backup_count, encoding='utf-8')
+        self.max_bytes = max_bytes
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if super().shouldRollover(record):
+            return True
+        if self.max_bytes <= 0 or self.stream is None:
+            return False
+        return self.stream.tell() >= self.max_bytes
+
+    def rotation_filename(self, default_name: str) -> str:
+        # Several size rollovers can happen on one day; keep each of them
+        name, n = default_name, 0
+        while os.path.exists(name):
+            n += 1
+            name = f"{default_name}.{n}"
+        return name
+
+
+def setup_logging(name: str = 'ai_employee', vault_path: Optional[Path] = None,
+                  level: str = LOG_LEVEL, console: bool = True) -> logging.handlers.QueueListener:
+    """Route all logging through one queue to Logs/<name>.log (idempotent)"""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        log_dir = Path(vault_path or VAULT_PATH) / 'Logs'
+        log_dir.mkdir(parents=True, exist_ok=True)
+
+        file_handler = RotatingJsonFileHandler(log_dir / f'{name}.log')
+        file_handler.setFormatter(JsonFormatter())
+        handlers = [file_handler]
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+            handlers.append(console_handler)
+
+        log_queue: queue.Queue = queue.Queue(-1)
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(_queue_handler)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener = None
+        _queue_handler = None
+
+
+def log_cycle(logger: logging.Logger, watcher: str, items: int, started: float,
+              error: Optional[BaseException] = None, **fields):
+    """One structured line per poll cycle; ``started`` is a time.monotonic() value"""
+    latency_ms = round((time.monotonic() - started) * 1000, 1)
+    extra = {'event': 'cycle', 'watcher': watcher, 'items': items,
+             'latency_ms': latency_ms, 'error': repr(error) if error else None, **fields}
+    if error:
+        logger.error(f"{watcher} cycle failed after {latency_ms} ms: {error}", extra=extra, exc_info=error)
+    elif items:
+        logger.info(f"{watcher} cycle: {items} item(s) in {latency_ms} ms", extra=extra)
+    else:
+        logger.debug(f"{watcher} cycle: no new items ({latency_ms} ms)", extra=extra)
@@ -1,5 +1,357 @@
+#!/usr/bin/env python3
+"""
+AI Employee Supervisor - Runs every watcher in a single process
+Part of the AI Employee Silver Tier implementation
+
+Each watcher is an asyncio task. Its blocking setup/poll/teardown calls run on
+a dedicated worker thread (Playwright's sync API is bound to the thread that
+started it). The browser watchers share one thread and one BrowserPool, so a
+single Chromium serves both WhatsApp and LinkedIn (and the approval executor
+publishes LinkedIn posts on that same thread). The supervisor owns the
+adaptive poll schedules (see scheduler.py), the vault frontmatter index and
+Dashboard.md renderer, a health snapshot written to
+Logs/supervisor_health.json, and metrics on http://127.0.0.1:METRICS_PORT/metrics
+(also written to Logs/metrics.prom).
+"""
+
+import os
+import sys
+import time
+import signal
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from vault_io import atomic_write_json
+from logging_setup import setup_logging, log_cycle
+from metrics import record_cycle, start_http_server, write_snapshot
+from scheduler import AdaptiveSchedule, schedule_for
+from vault_layout import VAULT_LAYOUT
+
+# Configuration
+VAULT_PATH = Path(__file__).parent
+WATCHERS_PATH = VAULT_PATH / "watchers"
+HEALTH_FILE = VAULT_PATH / "Logs" / "supervisor_health.json"
+HEALTH_INTERVAL = 30  # seconds between health and metrics snapshots
+METRICS_FILE = VAULT_PATH / "Logs" / "metrics.prom"
+# Seconds between archiver runs (0 disables); on by default only for partitioned layouts,
+# so a flat vault keeps completed items in Needs_Action/ unless this is set explicitly
+ARCHIVE_INTERVAL = int(os.getenv('VAULT_ARCHIVE_INTERVAL', '0' if VAULT_LAYOUT == 'flat' else '3600'))
+DEFAULT_WATCHERS = ['filesystem', 'gmail', 'whatsapp', 'linkedin', 'executor', 'expiry']
+BROWSER_WATCHERS = {'whatsapp', 'linkedin'}  # Share one thread and one browser
+
+sys.path.insert(0, str(WATCHERS_PATH))
+
+logger = logging.getLogger("Supervisor")
+
+
+def _browser_pool(shared: Dict):
+    """The BrowserPool shared by every browser watcher (created on first use)"""
+    if 'browser_pool' not in shared:
+        from browser_pool import BrowserPool
+        shared['browser_pool'] = BrowserPool()
+    return shared['browser_pool']
+
+
+def _filesystem_watcher(vault_path: Path, shared: Dict):
+    from filesystem_watcher import FilesystemWatcher
+    return FilesystemWatcher(str(vault_path))
+
+
+def _gmail_watcher(vault_path: Path, shared: Dict):
+    import gmail_watcher
+    interval = int(os.getenv('GMAIL_CHECK_INTERVAL', gmail_watcher.CHECK_INTERVAL))
+    return gmail_watcher.GmailWatcher(vault_path, interval)
+
+
+def _whatsapp_watcher(vault_path: Path, shared: Dict):
+    import whatsapp_watcher
+    interval = int(os.getenv('WHATSAPP_CHECK_INTERVAL', whatsapp_watcher.CHECK_INTERVAL))
+    return whatsapp_watcher.WhatsAppWatcher(vault_path, whatsapp_watcher.SESSION_PATH, interval,
+                                            pool=_browser_pool(shared))
+
+
+def _linkedin_watcher(vault_path: Path, shared: Dict):
+    import linkedin_watcher
+    interval = int(os.getenv('LINKEDIN_CHECK_INTERVAL', linkedin_watcher.CHECK_INTERVAL))
+    return linkedin_watcher.LinkedInWatcher(vault_path, linkedin_watcher.SESSION_PATH, interval,
+                                            pool=_browser_pool(shared),
+                                            index=shared.get('vault_index'))
+
+
+def _approval_executor(vault_path: Path, shared: Dict):
+    from approval_executor import ApprovalExecutor
+    return ApprovalExecutor(str(vault_path), index=shared.get('vault_index'),
+                            dashboard=shared.get('dashboard'),
+                            browser_pool=lambda: _browser_pool(shared),
+                            browser_executor=shared.get('browser_executor'))
+
+
+def _approval_expiry(vault_path: Path, shared: Dict):
+    from approval_expiry import ApprovalExpiry
+    return ApprovalExpiry(str(vault_path), index=shared.get('vault_index'),
+                          dashboard=shared.get('dashboard'))
+
+
+WATCHER_FACTORIES: Dict[str, Callable] = {
+    'filesystem': _filesystem_watcher,
+    'gmail': _gmail_watcher,
+    'whatsapp': _whatsapp_watcher,
+    'linkedin': _linkedin_watcher,
+    'executor': _approval_executor,
+    'expiry': _approval_expiry,
+}
+
+
+class WatcherTask:
+    """One supervised watcher: its worker thread, schedule and health state"""
+
+    def __init__(self, name: str, watcher, schedule: AdaptiveSchedule,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.name = name
+        self.watcher = watcher
+        self.schedule = schedule
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-watcher")
+        self.health = {
+            'status': 'starting',
+            'interval': schedule.base,
+            'cycles': 0,
+            'items': 0,
+            'consecutive_errors': 0,
+            'last_success': None,
+            'last_error': None,
+            'next_run_in': None,
+        }
+
+    async def call(self, func, *args):
+        """Run a blocking watcher method on this watcher's thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    def record_error(self, error: BaseException):
+        self.health['consecutive_errors'] += 1
+        self.health['last_error'] = f"{datetime.now().isoformat()} {type(error).__name__}: {error}"
+        self.health['status'] = 'backoff'
+
+
+class Supervisor:
+    """Hosts every watcher as an asyncio task in one process"""
+
+    def __init__(self, vault_path: Path, watcher_names: List[str]):
+        self.vault_path = vault_path
+        self.watcher_names = watcher_names
+        self.tasks: Dict[str, WatcherTask] = {}
+        self.browser_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="browser")
+        self.shared: Dict = {'browser_executor': self.browser_executor}
+        self.stop_event: Optional[asyncio.Event] = None
+
+    def load_watchers(self):
+        """Instantiate the requested watchers, skipping ones that cannot load"""
+        for name in self.watcher_names:
+            factory = WATCHER_FACTORIES.get(name)
+            if factory is None:
+                logger.error(f"Unknown watcher: {name}")
+                continue
+            try:
+                watcher = factory(self.vault_path, self.shared)
+            except (Exception, SystemExit) as e:
+                # Watcher modules exit when their optional dependencies are missing
+                logger.error(f"Could not load {name} watcher: {e!r}")
+                continue
+            executor = self.browser_executor if name in BROWSER_WATCHERS else None
+            schedule = schedule_for(watcher, name, self.vault_path)
+            self.tasks[name] = WatcherTask(name, watcher, schedule, executor)
+            logger.info(f"Loaded {name} watcher (interval {watcher.check_interval}s)")
+
+    async def _sleep(self, seconds: float) -> bool:
+        """Sleep unless shutdown is requested; returns True when stopping"""
+        try:
+            await asyncio.wait_for(self.stop_event.wait(), timeout=seconds)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def supervise(self, task: WatcherTask):
+        """Set up a watcher, then poll it on its adaptive schedule"""
+        # Setup (browser launch, authentication) is retried with backoff too
+        while not self.stop_event.is_set():
+            try:
+                await task.call(task.watcher.setup)
+                task.health['consecutive_errors'] = 0
+                task.health['status'] = 'running'
+                break
+            except SystemExit as e:
+                # Missing credentials and similar - retrying will not help
+                task.record_error(e)
+                task.health['status'] = 'failed'
+                logger.error(f"{task.name} watcher failed to start; giving up")
+                return
+            except Exception as e:
+                task.record_error(e)
+                delay = task.schedule.next_delay(error=e)
+                logger.error(f"{task.name} watcher setup failed: {e}; retrying in {delay:.0f}s")
+                task.health['next_run_in'] = delay
+                if await self._sleep(delay):
+                    return
+
+        while not self.stop_event.is_set():
+            started = time.monotonic()
+            try:
+                items = await task.call(task.watcher.poll_once)
+                record_cycle(task.name, items or 0, time.monotonic() - started)
+                log_cycle(logger, task.name, items or 0, started)
+                task.health['cycles'] += 1
+                task.health['items'] += items or 0
+                task.health['consecutive_errors'] = 0
+                task.health['last_success'] = datetime.now().isoformat()
+                task.health['status'] = 'running'
+                delay = task.schedule.next_delay(items or 0)
+            except Exception as e:
+                task.record_error(e)
+                delay = task.schedule.next_delay(error=e)
+                record_cycle(task.name, 0, time.monotonic() - started, error=True)
+                log_cycle(logger, task.name, 0, started, error=e, retry_in=delay)
+
+            task.health['interval'] = round(task.schedule.interval, 1)
+            task.health['next_run_in'] = round(delay, 1)
+            if await self._sleep(delay):
+                break
+
+        try:
+            await task.call(task.watcher.teardown)
+        except Exception as e:
+            logger.error(f"Error stopping {task.name} watcher: {e}")
+        task.health['status'] = 'stopped'
+
+    def write_health(self):
+        """Persist a snapshot of every watcher's health"""
+        snapshot = {
+            'updated': datetime.now().isoformat(),
+            'pid': os.getpid(),
+            'watchers': {name: task.health for name, task in self.tasks.items()},
+        }
+        if 'browser_pool' in self.shared:
+            snapshot['browser'] = self.shared['browser_pool'].metrics()
+        if 'vault_index' in self.shared:
+            snapshot['vault'] = self.shared['vault_index'].count('folder')
+        if 'dashboard' in self.shared:
+            self.shared['dashboard'].request_render()  # Picks up moves made outside the watchers
+        try:
+            atomic_write_json(HEALTH_FILE, snapshot, fsync=False)
+        except Exception as e:
+            logger.error(f"Error writing health snapshot: {e}")
+
+    async def report_health(self):
+        while True:
+            self.write_health()
+            write_snapshot(METRICS_FILE)
+            if await self._sleep(HEALTH_INTERVAL):
+                break
+
+    async def archive_completed(self):
+        """Periodically move completed items into Done/ (and its date partitions)"""
+        from vault_layout import archive
+        loop = asyncio.get_running_loop()
+        while not await self._sleep(ARCHIVE_INTERVAL):
+            try:
+                await loop.run_in_executor(None, lambda: archive(
+                    self.vault_path, index=self.shared.get('vault_index')))
+            except Exception as e:
+                logger.error(f"Error archiving completed items: {e}")
+
+    async def start_vault_index(self):
+        """Sync the frontmatter index, keep it current, and start the dashboard renderer"""
+        loop = asyncio.get_running_loop()
+        try:
+            from vault_index import VaultIndex
+            index = VaultIndex(self.vault_path)
+            await loop.run_in_executor(None, index.start)
+            self.shared['vault_index'] = index
+        except Exception as e:
+            logger.error(f"Vault index unavailable: {e}")
+            return
+
+        from dashboard import Dashboard
+        dashboard = Dashboard(self.vault_path, index)
+        dashboard.start()
+        self.shared['dashboard'] = dashboard
+
+    def close_vault_index(self):
+        """Flush the dashboard, then stop and close the index"""
+        dashboard = self.shared.pop('dashboard', None)
+        if dashboard is not None:
+            dashboard.close()
+        index = self.shared.pop('vault_index', None)
+        if index is not None:
+            index.close()
+
+    def request_stop(self):
+        logger.info("Shutdown requested")
+        self.stop_event.set()
+
+    async def run(self):
+        self.stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.request_stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows: KeyboardInterrupt ends asyncio.run instead
+
+        await self.start_vault_index()
+        self.load_watchers()
+        if not self.tasks:
+            logger.error("No watchers could be loaded")
+            self.close_vault_index()
+            return
+
+        metrics_server = start_http_server()
+
+        health = asyncio.create_task(self.report_health())
+        archiver = asyncio.create_task(self.archive_completed()) if ARCHIVE_INTERVAL > 0 else None
+        await asyncio.gather(*(self.supervise(task) for task in self.tasks.values()))
+        await health
+        if archiver is not None:
+            await archiver
+
+        pool = self.shared.get('browser_pool')
+        if pool is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(self.browser_executor, pool.close)
+            except Exception as e:
+                logger.error(f"Error closing browser pool: {e}")
+        self.write_health()
+
+        self.close_vault_index()
+
+        for task in self.tasks.values():
+            task.executor.shutdown(wait=False)
+        self.browser_executor.shutdown(wait=False)
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        logger.info("All watchers stopped")
+
+
 def main():
-    print("Hello from ai-employee-watcher!")
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Run all AI Employee watchers in one process')
+    parser.add_argument('--watchers', default=os.getenv('WATCHERS', ','.join(DEFAULT_WATCHERS)),
+                        help='Comma-separated watchers to run (default: all)')
+    args = parser.parse_args()
+
+    setup_logging('supervisor', VAULT_PATH)
+
+    names = [name.strip() for name in args.watchers.split(',') if name.strip()]
+    supervisor = Supervisor(VAULT_PATH, names)
+    try:
+        asyncio.run(supervisor.run())
+    except KeyboardInterrupt:
+        logger.info("Supervisor stopped by user")
 
 
 if __name__ == "__main__":
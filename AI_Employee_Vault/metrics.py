@@ -0,0 +1,245 @@
+"""
+Metrics - Counters, gauges and histograms with Prometheus text exposition
+Part of the AI Employee Silver Tier implementation
+
+A small in-process registry (no prometheus_client dependency). The
+supervisor serves it on http://127.0.0.1:METRICS_PORT/metrics and every
+process writes a text snapshot to Logs/metrics*.prom, which is readable
+without a Prometheus server. Watchers record:
+
+- watcher_cycle_seconds / watcher_items_total / watcher_errors_total per poll cycle
+- watcher_last_success_timestamp_seconds (lag = now - value)
+- api_request_seconds for Gmail API calls and browser page evaluations
+- action_file_write_seconds for writing Needs_Action files
+- dedup_entries and queue_depth gauges
+"""
+
+import os
+import time
+import bisect
+import logging
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from vault_io import atomic_write_text
+
+logger = logging.getLogger("Metrics")
+
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9108'))  # 0 disables the HTTP endpoint
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+SNAPSHOT_INTERVAL = 30  # seconds between Logs/ snapshots from watcher loops
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _label_text(names: Sequence[str], values: Tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f'{self.name}{_label_text(self.label_names, key)} {value}'
+                    for key, value in sorted(self.values.items())]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        self.series: Dict[Tuple, List] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * len(self.buckets) + [0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the ``with`` block (also when it raises)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, series in sorted(self.series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    labels = _label_text(self.label_names, key, 'le="%s"' % bound)
+                    lines.append(f'{self.name}_bucket{labels} {cumulative}')
+                labels = _label_text(self.label_names, key, 'le="+Inf"')
+                lines.append(f'{self.name}_bucket{labels} {series[-1]}')
+                lines.append(f'{self.name}_sum{_label_text(self.label_names, key)} {series[-2]}')
+                lines.append(f'{self.name}_count{_label_text(self.label_names, key)} {series[-1]}')
+        return lines
+
+
+class Registry:
+    """Named metrics, created on first use and rendered in registration order"""
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help_text: str, labels: Sequence[str], **kwargs):
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, help_text, labels, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"{name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help_text, labels)
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help_text, labels, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            samples = metric.samples()
+            if samples:
+                lines.extend(metric.header() + samples)
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+CYCLE_SECONDS = REGISTRY.histogram('watcher_cycle_seconds', 'Duration of one poll cycle', ['watcher'])
+ITEMS_TOTAL = REGISTRY.counter('watcher_items_total', 'Action items created', ['watcher'])
+ERRORS_TOTAL = REGISTRY.counter('watcher_errors_total', 'Failed poll cycles', ['watcher'])
+LAST_SUCCESS = REGISTRY.gauge('watcher_last_success_timestamp_seconds',
+                              'Unix time of the last successful cycle', ['watcher'])
+API_SECONDS = REGISTRY.histogram('api_request_seconds', 'Gmail API call or browser page evaluation latency',
+                                 ['watcher', 'call'])
+WRITE_SECONDS = REGISTRY.histogram('action_file_write_seconds', 'Time to write one action file', ['watcher'],
+                                   buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1))
+DEDUP_ENTRIES = REGISTRY.gauge('dedup_entries', 'IDs held in a watcher dedup store', ['watcher'])
+QUEUE_DEPTH = REGISTRY.gauge('queue_depth', 'Items waiting to be processed', ['watcher'])
+
+
+def record_cycle(watcher: str, items: int, seconds: float, error: bool = False):
+    """Update the per-cycle metrics for one poll"""
+    CYCLE_SECONDS.observe(seconds, watcher=watcher)
+    if error:
+        ERRORS_TOTAL.inc(watcher=watcher)
+    else:
+        ITEMS_TOTAL.inc(items, watcher=watcher)
+        LAST_SUCCESS.set(time.time(), watcher=watcher)
+
+
+_last_snapshot: Dict[Path, float] = {}
+
+
+def write_snapshot(path: Path, min_interval: float = 0):
+    """Write the registry to ``path`` (skipped if written less than ``min_interval`` ago)"""
+    now = time.monotonic()
+    if min_interval and now - _last_snapshot.get(path, float('-inf')) < min_interval:
+        return
+    _last_snapshot[path] = now
+    try:
+        atomic_write_text(path, REGISTRY.render(), fsync=False)
+    except OSError as e:
+        logger.error(f"Error writing metrics snapshot: {e}")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes would otherwise print a line each
+
+
+def start_http_server(port: int = METRICS_PORT, host: str = METRICS_HOST) -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics on a daemon thread; returns None if disabled or the port is taken"""
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.error(f"Could not start metrics endpoint on {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info(f"Metrics available at http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,179 @@
+"""
+Scheduler - Adaptive polling intervals for every watcher
+Part of the AI Employee Silver Tier implementation
+
+AdaptiveSchedule.next_delay() turns the outcome of a poll cycle into the
+time to wait before the next one:
+
+- items found: the interval halves (down to min_interval) so a busy source
+  is followed closely
+- nothing found: the interval returns to the base, then grows by
+  IDLE_GROWTH per idle cycle up to max_interval
+- error: exponential backoff starting at a few seconds, capped at
+  MAX_BACKOFF; rate-limit responses (HTTP 429/503, Gmail's 403
+  rateLimitExceeded) also wait at least their Retry-After and slow the
+  regular interval
+- quiet hours (from Company_Handbook.md, off unless set there or in
+  QUIET_HOURS): idle cycles wait at least QUIET_INTERVAL, but never past the
+  end of the quiet window. Only idle backoff is stretched: a cycle that found
+  items keeps its pace, and steady schedules (min_interval == max_interval,
+  e.g. push-mode event pumps) and watchers with ``quiet_hours_exempt`` set
+  (the approval executor and expiry sweeper) ignore quiet hours entirely
+
+Every delay gets +/- JITTER so watchers sharing a process or an API quota
+do not poll in lockstep.
+"""
+
+import os
+import re
+import random
+import logging
+from pathlib import Path
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple
+
+logger = logging.getLogger("Scheduler")
+
+ADAPTIVE = os.getenv('ADAPTIVE_POLLING', 'true').lower() == 'true'
+JITTER = float(os.getenv('SCHEDULER_JITTER', '0.1'))  # +/- fraction of each delay
+IDLE_GROWTH = 1.5
+MIN_FACTOR = 0.25  # Default min_interval = base * MIN_FACTOR
+MAX_FACTOR = 8  # Default max_interval = base * MAX_FACTOR
+FIRST_RETRY = 5  # seconds before the first retry after an error
+MAX_BACKOFF = 900  # seconds (15 minutes)
+QUIET_INTERVAL = int(os.getenv('QUIET_INTERVAL', '1800'))  # seconds between polls in quiet hours
+
+_QUIET_LINE = re.compile(r'quiet hours:?\**\s*(\d{1,2}):(\d{2})\s*(?:-|–|to)\s*(\d{1,2}):(\d{2})', re.IGNORECASE)
+QuietHours = Tuple[int, int]  # (start, end) in minutes after midnight
+
+
+class RateLimited(Exception):
+    """Raised by a watcher when the source asks it to slow down"""
+
+    def __init__(self, message: str = 'rate limited', retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def retry_after_of(error: BaseException) -> Optional[float]:
+    """Seconds to wait from a RateLimited error or an HTTP 429/503 (e.g. googleapiclient HttpError)"""
+    if isinstance(error, RateLimited):
+        return error.retry_after or 0.0
+    resp = getattr(error, 'resp', None)
+    status = getattr(resp, 'status', None)
+    if status == 403 and b'ateLimitExceeded' in (getattr(error, 'content', None) or b''):
+        return 0.0  # Gmail's (user)RateLimitExceeded comes as a 403 without Retry-After
+    if status not in (429, 503):
+        return None
+    header = resp.get('retry-after') if hasattr(resp, 'get') else None
+    if header is None:
+        return 0.0
+    try:
+        return max(0.0, float(header))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(header) - datetime.now().astimezone()).total_seconds())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def load_quiet_hours(vault_path: Path) -> Optional[QuietHours]:
+    """Quiet window from QUIET_HOURS (e.g. '22:00-07:00' or 'off') or the handbook"""
+    override = os.getenv('QUIET_HOURS')
+    if override is not None:
+        text = f'quiet hours: {override}'
+    else:
+        try:
+            text = (Path(vault_path) / 'Company_Handbook.md').read_text(encoding='utf-8')
+        except OSError:
+            return None
+    match = _QUIET_LINE.search(text)
+    if not match:
+        return None
+    h1, m1, h2, m2 = (int(group) for group in match.groups())
+    return (h1 * 60 + m1, h2 * 60 + m2)
+
+
+def seconds_until_quiet_end(quiet: Optional[QuietHours], now: datetime) -> float:
+    """0 outside the quiet window, else the seconds until it ends (handles windows past midnight)"""
+    if not quiet:
+        return 0.0
+    start, end = quiet
+    minute = now.hour * 60 + now.minute
+    inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+    if not inside:
+        return 0.0
+    end_time = now.replace(hour=end // 60, minute=end % 60, second=0, microsecond=0)
+    if end_time <= now:
+        end_time += timedelta(days=1)
+    return (end_time - now).total_seconds()
+
+
+class AdaptiveSchedule:
+    """Per-watcher polling interval that follows activity, errors and quiet hours"""
+
+    def __init__(self, name: str, base_interval: float, min_interval: Optional[float] = None,
+                 max_interval: Optional[float] = None, quiet_hours: Optional[QuietHours] = None,
+                 jitter: float = JITTER, adaptive: bool = ADAPTIVE):
+        self.name = name
+        self.base = base_interval
+        self.min_interval = min_interval if min_interval is not None else base_interval * MIN_FACTOR
+        self.max_interval = max_interval if max_interval is not None else base_interval * MAX_FACTOR
+        # A steady schedule has no idle backoff for quiet hours to stretch
+        self.quiet_hours = quiet_hours if self.min_interval < self.max_interval else None
+        self.jitter = jitter
+        self.adaptive = adaptive
+        self.interval = base_interval
+        self.errors = 0
+
+    def _jittered(self, delay: float) -> float:
+        if self.jitter <= 0:
+            return delay
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def next_delay(self, items: int = 0, error: Optional[BaseException] = None,
+                   now: Optional[datetime] = None) -> float:
+        """Seconds to wait before the next poll, given this cycle's outcome"""
+        if error is not None:
+            self.errors += 1
+            delay = min(MAX_BACKOFF, max(1.0, min(self.base, FIRST_RETRY)) * 2 ** (self.errors - 1))
+            retry_after = retry_after_of(error)
+            if retry_after is not None:
+                # Rate limited: also slow the normal cadence once the source recovers
+                self.interval = min(self.max_interval, max(self.interval, self.base) * 2)
+                delay = max(delay, retry_after)
+                logger.warning(f"{self.name} rate limited; waiting {delay:.0f}s")
+            return self._jittered(delay)
+
+        self.errors = 0
+        if not self.adaptive:
+            self.interval = self.base
+        elif items:
+            self.interval = max(self.min_interval, min(self.interval, self.base) / 2)
+        elif self.interval < self.base:
+            self.interval = self.base
+        else:
+            self.interval = min(self.max_interval, self.interval * IDLE_GROWTH)
+
+        delay = self._jittered(self.interval)
+        quiet_left = 0.0 if items else seconds_until_quiet_end(self.quiet_hours, now or datetime.now())
+        if quiet_left:
+            delay = max(delay, min(QUIET_INTERVAL, quiet_left))
+        return delay
+
+
+def schedule_for(watcher, name: str, vault_path: Path) -> AdaptiveSchedule:
+    """
+    Schedule for a watcher, honouring optional min_interval/max_interval
+    attributes on it; a truthy ``quiet_hours_exempt`` attribute opts out of quiet hours
+    """
+    exempt = getattr(watcher, 'quiet_hours_exempt', False)
+    return AdaptiveSchedule(
+        name,
+        watcher.check_interval,
+        min_interval=getattr(watcher, 'min_interval', None),
+        max_interval=getattr(watcher, 'max_interval', None),
+        quiet_hours=None if exempt else load_quiet_hours(vault_path),
+    )
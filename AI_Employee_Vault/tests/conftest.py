@@ -0,0 +1,43 @@
+"""
+Shared test setup: import paths and a throwaway vault
+Part of the AI Employee Silver Tier implementation
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+TESTS_PATH = Path(__file__).resolve().parent
+VAULT_ROOT = TESTS_PATH.parent
+FIXTURES = TESTS_PATH / 'fixtures'
+
+for path in (TESTS_PATH, VAULT_ROOT, VAULT_ROOT / 'watchers', VAULT_ROOT.parent / 'scripts'):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+VAULT_FOLDERS = ['Inbox', 'Needs_Action', 'Plans', 'Pending_Approval', 'Approved', 'Rejected', 'Done', 'Logs']
+
+
+@pytest.fixture
+def vault(tmp_path: Path) -> Path:
+    """An empty vault with the usual folders"""
+    for folder in VAULT_FOLDERS:
+        (tmp_path / folder).mkdir()
+    return tmp_path
+
+
+@pytest.fixture
+def browser_pool():
+    """A headless BrowserPool; skips when Playwright or a Chromium build is unavailable"""
+    pytest.importorskip('playwright.sync_api')
+    from browser_pool import BrowserPool
+
+    pool = BrowserPool(headless=True)
+    try:
+        pool.start()
+    except Exception as e:
+        pool.close()
+        pytest.skip(f"Chromium could not launch (set BROWSER_EXECUTABLE?): {str(e).splitlines()[0]}")
+    yield pool
+    pool.close()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Fake Gmail - A minimal local stand-in for the Gmail API, for tests
+Part of the AI Employee Silver Tier implementation
+
+Serves the real Gmail discovery document (from google-api-python-client)
+rewritten to point at itself, so the watcher builds an ordinary client with
+GMAIL_DISCOVERY_URL. It answers the calls GmailWatcher makes:
+users.getProfile, messages.list, history.list, messages.get, and the
+multipart/mixed batch endpoint. Mailbox changes are recorded as history
+records, the way Gmail records them.
+
+Usage (standalone): python tests/fake_gmail.py [port]
+"""
+
+import sys
+import json
+import threading
+from email import message_from_bytes
+from email.policy import HTTP
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import googleapiclient.discovery_cache
+
+DOCUMENT = Path(googleapiclient.discovery_cache.__file__).parent / 'documents' / 'gmail.v1.json'
+API_PREFIX = '/gmail/v1/users/me/'
+DEFAULT_LABELS = ('INBOX', 'UNREAD', 'IMPORTANT')
+BOUNDARY = 'fake_batch_boundary'
+
+
+class FakeMailbox:
+    """Messages, labels and a history log; thread-safe"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.messages: Dict[str, Dict] = {}
+        self.history: List[Dict] = []
+        self.history_id = 1000
+        self.oldest_history_id = 1000  # startHistoryId below this answers 404, like an expired ID
+        self.errors: Dict[str, int] = {}  # message id -> HTTP status messages.get answers with
+        self.calls: Dict[str, int] = {}  # Endpoint -> number of calls
+
+    def add_message(self, message_id: str, subject: str, sender: str = 'client@example.com',
+                    snippet: str = '', labels=DEFAULT_LABELS):
+        with self.lock:
+            self.history_id += 1
+            message = {'id': message_id, 'threadId': f't{message_id}', 'labelIds': list(labels),
+                       'snippet': snippet or f'Preview of {subject}',
+                       'headers': {'From': sender, 'Subject': subject,
+                                   'Date': 'Mon, 19 Oct 2026 09:00:00 +0000'}}
+            self.messages[message_id] = message
+            self.history.append({'id': str(self.history_id), 'messagesAdded': [
+                {'message': {'id': message_id, 'threadId': message['threadId'],
+                             'labelIds': list(labels)}}]})
+
+    def delete_message(self, message_id: str):
+        with self.lock:
+            self.history_id += 1
+            self.messages.pop(message_id, None)
+
+    def _count(self, endpoint: str):
+        self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+
+    # --- Endpoints: (status, body) ---
+
+    def profile(self, query) -> Tuple[int, Dict]:
+        return 200, {'emailAddress': 'me@example.com', 'historyId': str(self.history_id)}
+
+    def list_messages(self, query) -> Tuple[int, Dict]:
+        matching = [{'id': m['id'], 'threadId': m['threadId']} for m in self.messages.values()
+                    if {'UNREAD', 'IMPORTANT'}.issubset(m['labelIds'])]
+        return 200, _page(matching, 'messages', query)
+
+    def list_history(self, query) -> Tuple[int, Dict]:
+        start = int(query['startHistoryId'][0])
+        if start < self.oldest_history_id:
+            return 404, _error(404, 'Requested entity was not found.')
+        records = [record for record in self.history if int(record['id']) > start]
+        body = _page(records, 'history', query)
+        body['historyId'] = str(self.history_id)
+        return 200, body
+
+    def get_message(self, message_id: str, query) -> Tuple[int, Dict]:
+        if message_id in self.errors:
+            status = self.errors[message_id]
+            return status, _error(status, 'Injected error')
+        message = self.messages.get(message_id)
+        if message is None:
+            return 404, _error(404, 'Requested entity was not found.')
+        wanted = query.get('metadataHeaders', list(message['headers']))
+        return 200, {'id': message['id'], 'threadId': message['threadId'],
+                     'labelIds': message['labelIds'], 'snippet': message['snippet'],
+                     'payload': {'headers': [{'name': name, 'value': value}
+                                             for name, value in message['headers'].items()
+                                             if name in wanted]}}
+
+    def route(self, method: str, url: str) -> Tuple[int, Dict]:
+        parts = urlsplit(url)
+        query = parse_qs(parts.query)
+        path = parts.path
+        with self.lock:
+            if method == 'GET' and path == API_PREFIX + 'profile':
+                self._count('users.getProfile')
+                return self.profile(query)
+            if method == 'GET' and path == API_PREFIX + 'messages':
+                self._count('messages.list')
+                return self.list_messages(query)
+            if method == 'GET' and path == API_PREFIX + 'history':
+                self._count('history.list')
+                return self.list_history(query)
+            if method == 'GET' and path.startswith(API_PREFIX + 'messages/'):
+                self._count('messages.get')
+                return self.get_message(path[len(API_PREFIX + 'messages/'):], query)
+        return 404, _error(404, f'No fake for {method} {path}')
+
+
+def _page(items: List, key: str, query) -> Dict:
+    size = int(query.get('maxResults', ['100'])[0])
+    start = int(query.get('pageToken', ['0'])[0])
+    body = {key: items[start:start + size]}
+    if start + size < len(items):
+        body['nextPageToken'] = str(start + size)
+    return body
+
+
+def _error(status: int, message: str) -> Dict:
+    return {'error': {'code': status, 'message': message, 'errors': [{'message': message}]}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    mailbox: FakeMailbox = None
+    document = b''
+
+    def _reply(self, status: int, body: bytes, content_type: str = 'application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if 'discovery' in self.path or '$discovery' in self.path:
+            self._reply(200, self.document)
+            return
+        status, body = self.mailbox.route('GET', self.path)
+        self._reply(status, json.dumps(body).encode())
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if urlsplit(self.path).path != '/batch':
+            self._reply(404, json.dumps(_error(404, 'Not faked')).encode())
+            return
+        with self.mailbox.lock:
+            self.mailbox._count('batch')
+        self._reply(200, self._batch(body), f'multipart/mixed; boundary={BOUNDARY}')
+
+    def _batch(self, body: bytes) -> bytes:
+        """Answer each application/http part of a batch request"""
+        envelope = message_from_bytes(
+            b'Content-Type: ' + self.headers['Content-Type'].encode() + b'\r\n\r\n' + body, policy=HTTP)
+        out = []
+        for part in envelope.iter_parts():
+            request_line = part.get_payload(decode=True).decode().lstrip().split('\n', 1)[0].strip()
+            method, url, _ = request_line.split(' ', 2)
+            status, response = self.mailbox.route(method, url)
+            payload = json.dumps(response)
+            content_id = part['Content-ID'].replace('<', '<response-', 1)
+            out.append(f'--{BOUNDARY}\r\nContent-Type: application/http\r\n'
+                       f'Content-ID: {content_id}\r\n\r\n'
+                       f'HTTP/1.1 {status} {"OK" if status == 200 else "Error"}\r\n'
+                       f'Content-Type: application/json; charset=UTF-8\r\n'
+                       f'Content-Length: {len(payload)}\r\n\r\n{payload}\r\n')
+        out.append(f'--{BOUNDARY}--\r\n')
+        return ''.join(out).encode()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeGmail:
+    """Runs a FakeMailbox behind a local HTTP server"""
+
+    def __init__(self, port: int = 0, mailbox: Optional[FakeMailbox] = None):
+        self.mailbox = mailbox or FakeMailbox()
+        handler = type('FakeGmailHandler', (_Handler,), {'mailbox': self.mailbox})
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+        self.server.daemon_threads = True
+        self.root = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        document = json.loads(DOCUMENT.read_text(encoding='utf-8'))
+        document['rootUrl'] = self.root
+        document['baseUrl'] = self.root + document['servicePath']
+        handler.document = json.dumps(document).encode()
+        self.discovery_url = self.root + 'discovery/v1/apis/gmail/v1/rest'
+        self._thread = None
+
+    def start(self) -> "FakeGmail":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
+    fake = FakeGmail(port)
+    for i in range(3):
+        fake.mailbox.add_message(f'demo{i}', f'Demo message {i}')
+    print(f"Fake Gmail running; set GMAIL_DISCOVERY_URL={fake.discovery_url}")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Tests for the approval executor's EmailHandler
+Part of the AI Employee Silver Tier implementation
+"""
+
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from approved_messages import SendResult
+from approval_executor import EmailHandler, ExecutionError
+
+APPROVAL = "---\ntype: email\nto: client@example.com\nsubject: Report\n---\n\n## Body\nAttached.\n"
+
+
+class LoginFailsSender:
+    """Stands in for an SMTPSender whose login is refused"""
+
+    auth_failed = True
+
+    def __init__(self):
+        self.closed = False
+
+    def send(self, email):
+        return SendResult(email.id, False, 0, 'SMTP login failed', transient=True)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def handler(vault, monkeypatch):
+    monkeypatch.delenv('OUTBOX_DB', raising=False)
+    handler = EmailHandler(SimpleNamespace(vault_path=vault, logger=logging.getLogger('test')))
+    yield handler
+    handler.close()
+
+
+def test_login_failure_closes_and_drops_the_sender(vault, handler):
+    made = []
+
+    def make_sender():
+        made.append(LoginFailsSender())
+        return made[-1]
+
+    handler._make_sender = make_sender
+    approval = vault / 'Approved' / 'APPROVAL_report.md'
+    approval.write_text(APPROVAL, encoding='utf-8')
+
+    for attempt in (1, 2):
+        with pytest.raises(ExecutionError, match='login failed'):
+            handler.execute(approval, {'type': 'email'})
+        assert len(made) == attempt  # A fresh sender for every attempt
+        assert made[-1].closed
+        assert handler._senders == []
+    assert approval.exists()  # Released unsent, still waiting in Approved/
+
+
+def test_poll_reads_the_next_due_time_once(handler, monkeypatch):
+    calls = []
+    monkeypatch.setattr(handler.outbox, 'next_due', lambda: calls.append(1))
+    assert handler.poll() == 0
+    assert len(calls) == 1
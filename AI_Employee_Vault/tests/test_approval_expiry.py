@@ -0,0 +1,83 @@
+"""
+Tests for ApprovalExpiry: approvals tracked while the startup scan runs, and
+sweeps that meet deadlines no longer known
+Part of the AI Employee Silver Tier implementation
+"""
+
+import time
+
+import pytest
+
+from approval_expiry import ApprovalExpiry, DeadlineStore
+
+APPROVAL = "---\ntype: email\nstatus: pending\nexpires: {expires}\n---\n\nSend the report.\n"
+
+
+def write_approval(path, expires: float):
+    path.write_text(APPROVAL.format(expires=time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(expires))),
+                    encoding='utf-8')
+
+
+@pytest.fixture
+def expiry(vault):
+    expiry = ApprovalExpiry(str(vault))
+    expiry.store = DeadlineStore(expiry.db_path)  # What setup() does, minus the observer
+    yield expiry
+    expiry.teardown()
+
+
+def test_file_tracked_during_the_scan_is_kept(vault, expiry, monkeypatch):
+    now = time.time()
+    write_approval(vault / 'Pending_Approval' / 'APPROVAL_scanned.md', now + 3600)
+    late = vault / 'Pending_Approval' / 'APPROVAL_late.md'
+    read_entry = expiry._entry
+
+    def entry_with_event(path, stat):
+        # While the scan reads a file, another one lands and the observer tracks it
+        if path != late and not late.exists():
+            write_approval(late, now - 60)
+            expiry.track(late)  # What the observer does on the creation event
+        return read_entry(path, stat)
+
+    monkeypatch.setattr(expiry, '_entry', entry_with_event)
+    stats = expiry.load()
+
+    assert stats['tracked'] == 2
+    assert str(late) in expiry.known
+    assert expiry.sweep(now) == 1
+    assert (vault / 'Rejected' / 'APPROVAL_late.md').exists()
+    assert str(vault / 'Pending_Approval' / 'APPROVAL_scanned.md') in expiry.known
+
+
+def test_approved_files_are_not_swept(vault, expiry):
+    now = time.time()
+    write_approval(vault / 'Approved' / 'APPROVAL_sending.md', now - 60)  # Outbox may be retrying it
+    write_approval(vault / 'Pending_Approval' / 'APPROVAL_due.md', now - 60)
+    expiry.load()
+
+    assert expiry.sweep(now) == 1
+    assert (vault / 'Approved' / 'APPROVAL_sending.md').exists()
+    assert not (vault / 'Rejected' / 'APPROVAL_sending.md').exists()
+
+
+def test_sweep_skips_deadlines_no_longer_known(vault, expiry):
+    now = time.time()
+    write_approval(vault / 'Pending_Approval' / 'APPROVAL_due.md', now - 60)
+    expiry.load()
+    expiry.wheel.schedule('ghost', now - 30)  # Scheduled, but not (or no longer) in known
+
+    assert expiry.sweep(now) == 1
+    assert (vault / 'Rejected' / 'APPROVAL_due.md').exists()
+    assert expiry.known == {}
+
+
+def test_restart_reuses_persisted_deadlines(vault, expiry):
+    write_approval(vault / 'Pending_Approval' / 'APPROVAL_one.md', time.time() + 3600)
+    assert expiry.load()['parsed'] == 1
+
+    restarted = ApprovalExpiry(str(vault))
+    restarted.store = DeadlineStore(restarted.db_path)
+    try:
+        assert restarted.load() == {'tracked': 1, 'parsed': 0, 'removed': 0}
+    finally:
+        restarted.teardown()
@@ -0,0 +1,95 @@
+"""
+Tests for loading approved emails: an invalid approval file or JSONL line
+fails on its own and the rest of the batch is still loaded and sent.
+Part of the AI Employee Silver Tier implementation
+"""
+
+import json
+import socket
+
+import pytest
+
+from approved_messages import load_directory, load_jsonl, load_messages
+
+EMAIL = "---\ntype: email\nto: {to}\nsubject: {subject}\n---\n\n## Body\nHello from {subject}.\n"
+
+
+def write_approvals(folder):
+    (folder / 'APPROVAL_a.md').write_text(EMAIL.format(to='a@example.com', subject='A'), encoding='utf-8')
+    (folder / 'APPROVAL_b.md').write_text("---\ntype: email\nsubject: No recipient\n---\n\nBody\n",
+                                          encoding='utf-8')
+    (folder / 'APPROVAL_c.md').write_text(EMAIL.format(to='c@example.com', subject='C'), encoding='utf-8')
+    (folder / 'APPROVAL_move.md').write_text("---\ntype: file_move\n---\n", encoding='utf-8')
+
+
+def write_jsonl(path):
+    lines = [json.dumps({'id': 'one', 'to': 'a@example.com', 'subject': 'One', 'body': 'x'}),
+             '{not json',
+             json.dumps({'id': 'no-to', 'subject': 'Missing to'}),
+             json.dumps(['a', 'list']),
+             '',
+             json.dumps({'to': 'c@example.com', 'subject': 'Last', 'body': 'y'})]
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+def test_directory_skips_invalid_file(vault):
+    write_approvals(vault / 'Approved')
+    failures = []
+    messages = load_directory(vault / 'Approved', 'me@example.com', failures)
+
+    assert [message.id for message in messages] == ['APPROVAL_a', 'APPROVAL_c']
+    assert [(failure.id, failure.ok, failure.attempts) for failure in failures] == [('APPROVAL_b', False, 0)]
+    assert "no 'to' field" in failures[0].error
+    assert not failures[0].transient
+
+
+def test_directory_raises_without_failures_list(vault):
+    write_approvals(vault / 'Approved')
+    with pytest.raises(ValueError, match="no 'to' field"):
+        load_directory(vault / 'Approved', 'me@example.com')
+
+
+def test_jsonl_skips_invalid_lines(tmp_path):
+    source = tmp_path / 'batch.jsonl'
+    write_jsonl(source)
+    failures = []
+    messages = load_messages(source, 'me@example.com', failures)
+
+    assert [message.id for message in messages] == ['one', 'batch:6']
+    assert [failure.id for failure in failures] == ['batch:2', 'no-to', 'batch:4']
+    assert all(failure.error.startswith(f'{source}:') for failure in failures)
+
+    with pytest.raises(ValueError, match=':2: invalid message'):
+        load_jsonl(source, 'me@example.com')
+
+
+def test_smtp_batch_sends_the_rest(vault):
+    pytest.importorskip('aiosmtpd')
+    from aiosmtpd.controller import Controller
+    from send_smtp import SMTPSender, send_batch
+
+    class Collect:
+        received = []
+
+        async def handle_DATA(self, server, session, envelope):
+            self.received.append(envelope.rcpt_tos)
+            return '250 OK'
+
+    write_approvals(vault / 'Approved')
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    controller = Controller(Collect(), hostname='127.0.0.1', port=port)
+    controller.start()
+    try:
+        smtp = SMTPSender('127.0.0.1', port, username=None, starttls=False, rate_limit=0)
+        results = send_batch(vault / 'Approved', 'me@example.com', vault / 'Done', smtp)
+        smtp.close()
+    finally:
+        controller.stop()
+
+    assert {result.id: result.ok for result in results} == {
+        'APPROVAL_a': True, 'APPROVAL_b': False, 'APPROVAL_c': True}
+    assert Collect.received == [['a@example.com'], ['c@example.com']]
+    assert sorted(path.name for path in (vault / 'Done').iterdir()) == ['APPROVAL_a.md', 'APPROVAL_c.md']
+    assert (vault / 'Approved' / 'APPROVAL_b.md').exists()  # Left for a human to fix
@@ -0,0 +1,141 @@
+"""
+Tests for BrowserPool against a local fixture page: page reuse across polls,
+recovery from a crashed page or browser, and the pool metrics.
+Part of the AI Employee Silver Tier implementation
+"""
+
+import os
+import signal
+from pathlib import Path
+
+import pytest
+
+from conftest import FIXTURES
+
+PAGE_URL = (FIXTURES / 'pool_page.html').as_uri()
+READY = '#ready'
+
+
+def poll(pool, name='fixture'):
+    """What a browser watcher does each cycle: fetch its page and read from it"""
+    page = pool.get_page(name, PAGE_URL, ready_selector=READY)
+    return page, page.evaluate('window.loadId')
+
+
+def kill_chromium():
+    """SIGKILL the Chromium this process launched, leaving the Playwright driver alone"""
+    killed = 0
+    for entry in Path('/proc').iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            cmdline = (entry / 'cmdline').read_bytes().split(b'\0')
+            ppid = int((entry / 'stat').read_text().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        # The browser process is the one talking to the driver over a pipe
+        if b'--remote-debugging-pipe' in cmdline and ppid != 1 and _descends_from_us(ppid):
+            os.kill(int(entry.name), signal.SIGKILL)
+            killed += 1
+    return killed
+
+
+def _descends_from_us(pid: int) -> bool:
+    while pid > 1:
+        if pid == os.getpid():
+            return True
+        try:
+            pid = int((Path('/proc') / str(pid) / 'stat').read_text().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            return False
+    return False
+
+
+def test_page_reused_across_polls(browser_pool):
+    page, load_id = poll(browser_pool)
+    for _ in range(3):
+        again, again_id = poll(browser_pool)
+        assert again is page
+        assert again_id == load_id  # Not reloaded
+
+    stats = browser_pool.metrics()
+    assert stats['contexts'] == 1
+    assert stats['pages'] == 1
+    assert stats['page_restarts'] == 0
+
+
+def test_contexts_are_isolated(browser_pool):
+    first, _ = poll(browser_pool, 'first')
+    second, _ = poll(browser_pool, 'second')
+    first.evaluate("localStorage.setItem('who', 'first')")
+
+    assert first.context is not second.context
+    assert second.evaluate("localStorage.getItem('who')") is None
+    assert browser_pool.metrics()['contexts'] == 2
+
+
+def test_restart_page_opens_a_fresh_page(browser_pool):
+    page, load_id = poll(browser_pool)
+    browser_pool.restart_page('fixture')
+
+    fresh, fresh_id = poll(browser_pool)
+    assert fresh is not page and page.is_closed()
+    assert fresh_id != load_id
+    assert browser_pool.metrics()['page_restarts'] == 1
+    assert browser_pool.metrics()['pages'] == 1
+
+
+def test_closed_page_is_reopened(browser_pool):
+    page, _ = poll(browser_pool)
+    page.close()
+
+    fresh, _ = poll(browser_pool)
+    assert fresh is not page
+    assert browser_pool.metrics()['page_restarts'] == 1
+
+
+@pytest.mark.skipif(not Path('/proc').exists(), reason="Finds the browser process through /proc")
+def test_browser_crash_relaunches(browser_pool):
+    page, load_id = poll(browser_pool)
+    first_browser = browser_pool.browser
+    assert kill_chromium() == 1
+
+    # Playwright notices the dead browser on the first call that needs it,
+    # so one poll may fail; the next one must find a relaunched browser
+    try:
+        poll(browser_pool)
+    except Exception:
+        pass
+    fresh, fresh_id = poll(browser_pool)
+
+    assert browser_pool.browser is not first_browser
+    assert browser_pool.browser.is_connected()
+    assert fresh_id != load_id
+    stats = browser_pool.metrics()
+    assert stats['browser_restarts'] == 1
+    assert stats['contexts'] == 1 and stats['pages'] == 1
+
+
+def test_metrics_sample_memory(browser_pool, monkeypatch):
+    import browser_pool as module
+
+    monkeypatch.setattr(module, 'METRICS_INTERVAL', 0)  # Sample on every call
+    poll(browser_pool)
+    stats = browser_pool.metrics()
+
+    assert stats['browser_rss_bytes'] > 0
+    assert stats['js_heap_bytes']['fixture'] > 0
+    stats['pages'] = 99
+    assert browser_pool.metrics()['pages'] == 1  # A copy, not the live dict
+
+
+def test_session_saved_and_restored(browser_pool, tmp_path):
+    state = tmp_path / 'session' / 'storage_state.json'
+    page = browser_pool.get_page('fixture', PAGE_URL, READY, storage_state=state)
+    page.context.add_cookies([{'name': 'sid', 'value': 'abc', 'url': 'https://example.com'}])
+    browser_pool.save_session('fixture')
+    assert state.exists()
+
+    browser_pool.slots.pop('fixture').context.close()
+    page = browser_pool.get_page('fixture', PAGE_URL, READY, storage_state=state)
+    assert [c['value'] for c in page.context.cookies('https://example.com')] == ['abc']
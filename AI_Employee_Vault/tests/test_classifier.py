@@ -0,0 +1,80 @@
+"""
+Tests for the keyword priority classifier
+Part of the AI Employee Silver Tier implementation
+"""
+
+from classifier import PriorityClassifier
+
+
+def test_default_rules_score_and_rank():
+    result = PriorityClassifier().classify("URGENT: the invoice is overdue, please help asap")
+
+    assert result.priority == 'urgent'
+    assert result.matches == ('asap', 'help', 'invoice', 'urgent')
+    assert result.score == 10 + 5 + 5 + 10
+
+
+def test_keywords_match_on_word_boundaries_only():
+    classifier = PriorityClassifier()
+
+    assert classifier.classify("Thanks, that was helpful").matches == ()
+    assert classifier.classify("Need help.").matches == ('help',)
+
+
+def test_repeated_keyword_counts_once():
+    assert PriorityClassifier().classify("urgent urgent URGENT").score == 10
+
+
+def test_default_sets_the_floor():
+    classifier = PriorityClassifier()
+
+    assert classifier.classify("nothing to see").priority == 'normal'
+    assert classifier.classify("nothing to see", default='low').priority == 'low'
+    assert classifier.classify("invoice", default='urgent').priority == 'urgent'
+
+
+def test_explicit_weights_and_multi_word_keywords():
+    classifier = PriorityClassifier({'high': ['pay', 'payment=7', 'wire transfer=3']})
+
+    result = classifier.classify("Payment sent by wire\n  transfer, will pay again")
+
+    assert result.matches == ('pay', 'payment', 'wire transfer')
+    assert result.score == 5 + 7 + 3
+
+
+def test_non_numeric_weight_falls_back_to_level_default():
+    classifier = PriorityClassifier({'urgent': ['a=b', 'asap']})
+
+    assert classifier.keywords['a'] == ('urgent', 10)
+    assert classifier.classify("a").priority == 'urgent'
+
+
+def test_case_insensitive_match_that_lowercases_differently():
+    # 'İ'.lower() is 'i' + combining dot, which is not the stored keyword
+    result = PriorityClassifier().classify("İnvoice attached")
+
+    assert result.matches == ('invoice',)
+    assert result.priority == 'high'
+
+
+def test_rules_loaded_from_handbook(tmp_path):
+    handbook = tmp_path / "Company_Handbook.md"
+    handbook.write_text(
+        "| Priority | Criteria | Response |\n"
+        "|---|---|---|\n"
+        "| 🔴 Urgent | Contains keywords: \"outage=20\", \"down=x\" | Now |\n"
+        "| 🟡 High | Contains keywords: \"contract\" | Today |\n"
+        "| 🟢 Low | Newsletters | Whenever |\n",
+        encoding='utf-8')
+
+    classifier = PriorityClassifier.from_handbook(handbook)
+
+    assert classifier.keywords == {'outage': ('urgent', 20), 'down': ('urgent', 10),
+                                   'contract': ('high', 5)}
+    assert classifier.classify("Site down, contract at risk").score == 15
+
+
+def test_missing_handbook_uses_default_rules(tmp_path):
+    classifier = PriorityClassifier.from_handbook(tmp_path / "missing.md")
+
+    assert classifier.keywords == PriorityClassifier().keywords
@@ -0,0 +1,39 @@
+"""
+Tests for Dashboard activity: action items are logged once, when created
+Part of the AI Employee Silver Tier implementation
+"""
+
+import pytest
+
+from dashboard import Dashboard
+from vault_io import atomic_copy, atomic_write_text
+
+
+@pytest.fixture
+def dashboard(vault):
+    dashboard = Dashboard(vault, render_interval=3600)
+    dashboard.start()
+    yield dashboard
+    dashboard.close()
+
+
+def created_events(dashboard):
+    return [message for _, kind, message in dashboard.index.recent_events(100) if kind == 'action_created']
+
+
+def test_rewritten_action_file_is_logged_once(vault, dashboard):
+    reminder = vault / 'Needs_Action' / 'LINKEDIN_POST_REMINDER_20260101.md'
+    atomic_write_text(reminder, 'first\n')
+    atomic_write_text(reminder, 'rewritten\n')
+
+    assert created_events(dashboard) == ['New action item: LINKEDIN_POST_REMINDER_20260101']
+
+
+def test_copied_action_file_is_logged_when_new(vault, dashboard, tmp_path):
+    source = tmp_path / 'note.md'
+    source.write_text('hello\n', encoding='utf-8')
+    atomic_copy(source, vault / 'Needs_Action' / 'FILE_note.md')
+    atomic_copy(source, vault / 'Needs_Action' / 'FILE_note.md')
+    atomic_write_text(vault / 'Done' / 'FILE_old.md', 'done\n')  # Not an action item
+
+    assert created_events(dashboard) == ['New action item: FILE_note']
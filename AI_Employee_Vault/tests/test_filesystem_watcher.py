@@ -0,0 +1,90 @@
+"""
+Tests for Inbox ingestion: every strategy keeps the user's file intact, and
+the metadata file never takes the place of an ingested file
+Part of the AI Employee Bronze Tier Implementation
+"""
+
+import pytest
+
+from file_ingest import FileIngestor
+from filesystem_watcher import FilesystemWatcher
+
+NOTES = "# Notes\n\nCall the client about the overdue invoice.\n"
+
+
+@pytest.fixture
+def make_watcher(vault):
+    watchers = []
+
+    def make(strategy: str) -> FilesystemWatcher:
+        watcher = FilesystemWatcher(str(vault))
+        watcher.ingestor = FileIngestor(strategy, index=watcher.index)
+        watchers.append(watcher)
+        return watcher
+
+    yield make
+    for watcher in watchers:
+        watcher.index.close()
+
+
+def needs_action(vault):
+    return sorted((vault / 'Needs_Action').iterdir())
+
+
+def test_move_keeps_a_dropped_markdown_file(vault, make_watcher):
+    watcher = make_watcher('move')
+    (vault / 'Inbox' / 'notes.md').write_text(NOTES, encoding='utf-8')
+    watcher.process_file(vault / 'Inbox' / 'notes.md')
+
+    assert list((vault / 'Inbox').iterdir()) == []
+    ingested, meta = needs_action(vault)
+    assert ingested.name.startswith('FILE_') and ingested.name.endswith('_notes.md')
+    assert meta.name == ingested.name + '.md'
+    assert ingested.read_text(encoding='utf-8') == NOTES
+    metadata = meta.read_text(encoding='utf-8')
+    assert 'type: file_drop' in metadata and 'original_name: notes.md' in metadata
+    assert f'**Location:** Needs_Action/{ingested.name}\n' in metadata
+
+
+def test_auto_ingests_an_independent_copy(vault, make_watcher):
+    watcher = make_watcher('auto')
+    source = vault / 'Inbox' / 'report.txt'
+    source.write_text('Quarterly report\n', encoding='utf-8')
+    watcher.process_file(source)
+
+    ingested, meta = needs_action(vault)
+    assert ingested.stat().st_ino != source.stat().st_ino
+    assert source.stat().st_nlink == 1
+    ingested.write_text('Edited in Needs_Action\n', encoding='utf-8')
+    assert source.read_text(encoding='utf-8') == 'Quarterly report\n'
+    assert '(original still in Inbox)' in meta.read_text(encoding='utf-8')
+
+
+def test_hardlink_only_when_asked_for(vault):
+    assert 'hardlink' not in FileIngestor('auto')._candidates()
+    assert FileIngestor('hardlink')._candidates() == ['hardlink', 'copy']
+
+
+def test_ingest_refuses_an_existing_destination(vault):
+    source = vault / 'Inbox' / 'a.txt'
+    source.write_text('new', encoding='utf-8')
+    dest = vault / 'Needs_Action' / 'FILE_a.txt'
+    dest.write_text('already here', encoding='utf-8')
+
+    for strategy in ('auto', 'move', 'copy', 'hardlink'):
+        with pytest.raises(FileExistsError):
+            FileIngestor(strategy).ingest(source, dest)
+    assert dest.read_text(encoding='utf-8') == 'already here'
+    assert source.exists()
+
+
+def test_same_name_twice_in_one_second(vault, make_watcher):
+    watcher = make_watcher('move')
+    for text in ('first version\n', 'second version\n'):
+        (vault / 'Inbox' / 'notes.md').write_text(text, encoding='utf-8')
+        watcher.process_file(vault / 'Inbox' / 'notes.md')
+
+    contents = sorted(path.read_text(encoding='utf-8') for path in needs_action(vault)
+                      if not path.name.endswith('.md.md'))
+    assert contents == ['first version\n', 'second version\n']
+    assert sum(path.name.endswith('.md.md') for path in needs_action(vault)) == 2
@@ -0,0 +1,139 @@
+"""
+GmailWatcher against the local fake Gmail (discovery, history.list, batch)
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip('googleapiclient')
+from google.oauth2.credentials import Credentials
+
+from fake_gmail import FakeGmail
+from gmail_push import PushReceiver, send_notification
+from gmail_watcher import BATCH_SIZE, GmailWatcher, build_service
+
+
+@pytest.fixture
+def gmail():
+    with FakeGmail() as fake:
+        yield fake
+
+
+def make_watcher(vault, gmail, receiver=None) -> GmailWatcher:
+    expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
+    service = build_service(Credentials(token='fake-token', expiry=expiry), gmail.discovery_url)
+    return GmailWatcher(vault, service=service, sync_mode='history', push=receiver is not None,
+                        receiver=receiver)
+
+
+def action_files(vault):
+    return sorted((vault / 'Needs_Action').glob('EMAIL_*.md'))
+
+
+def test_first_poll_fetches_metadata_in_batches(vault, gmail):
+    count = BATCH_SIZE * 2 + 5
+    for i in range(count):
+        gmail.mailbox.add_message(f'm{i:04d}', f'Invoice {i}')
+    gmail.mailbox.add_message('plain', 'Newsletter', labels=('INBOX', 'UNREAD'))  # Not important
+
+    watcher = make_watcher(vault, gmail)
+    assert watcher.poll_once() == count
+
+    calls = gmail.mailbox.calls
+    assert calls['batch'] == 3  # One round trip per BATCH_SIZE messages
+    assert calls['messages.get'] == count  # All of them inside the batches
+    assert calls['messages.list'] == 1
+    files = action_files(vault)
+    assert len(files) == count
+    text = files[0].read_text(encoding='utf-8')
+    assert 'subject: Invoice 0' in text and 'gmail_id: m0000' in text
+    assert watcher.history_id == str(gmail.mailbox.history_id)
+
+
+def test_later_polls_sync_incrementally(vault, gmail):
+    gmail.mailbox.add_message('old', 'Already there')
+    watcher = make_watcher(vault, gmail)
+    assert watcher.poll_once() == 1
+
+    gmail.mailbox.add_message('new1', 'Contract signed')
+    gmail.mailbox.add_message('new2', 'Payment received')
+    assert watcher.poll_once() == 2
+    assert watcher.poll_once() == 0
+
+    calls = gmail.mailbox.calls
+    assert calls['messages.list'] == 1  # Only the first poll lists the mailbox
+    assert calls['history.list'] == 2
+    assert len(action_files(vault)) == 3
+
+
+def test_expired_history_id_falls_back_to_full_sync(vault, gmail):
+    gmail.mailbox.add_message('a', 'First')
+    watcher = make_watcher(vault, gmail)
+    watcher.poll_once()
+    gmail.mailbox.add_message('b', 'Second')
+    gmail.mailbox.oldest_history_id = gmail.mailbox.history_id + 1
+
+    assert watcher.poll_once() == 1
+    assert gmail.mailbox.calls['messages.list'] == 2
+
+
+def test_deleted_message_does_not_hold_back_history(vault, gmail):
+    gmail.mailbox.add_message('a', 'First')
+    watcher = make_watcher(vault, gmail)
+    watcher.poll_once()
+
+    gmail.mailbox.add_message('kept', 'Still here')
+    gmail.mailbox.add_message('deleted', 'Gone before the batch get')
+    gmail.mailbox.errors['deleted'] = 404
+    assert watcher.poll_once() == 1
+    assert watcher.history_id == str(gmail.mailbox.history_id)  # Advanced past the 404
+
+    history_calls = gmail.mailbox.calls['history.list']
+    assert watcher.poll_once() == 0
+    assert gmail.mailbox.calls['messages.get'] == 3  # Nothing replayed
+    assert gmail.mailbox.calls['history.list'] == history_calls + 1
+
+
+def test_transient_error_holds_back_history(vault, gmail):
+    gmail.mailbox.add_message('a', 'First')
+    watcher = make_watcher(vault, gmail)
+    watcher.poll_once()
+    before = watcher.history_id
+
+    gmail.mailbox.add_message('flaky', 'Server trouble')
+    gmail.mailbox.errors['flaky'] = 500
+    assert watcher.poll_once() == 0
+    assert watcher.history_id == before
+
+    del gmail.mailbox.errors['flaky']
+    assert watcher.poll_once() == 1  # Replayed and fetched
+    assert watcher.history_id == str(gmail.mailbox.history_id)
+
+
+def test_push_notification_triggers_a_history_sync(vault, gmail):
+    gmail.mailbox.add_message('old', 'Already there')
+    watcher = make_watcher(vault, gmail, PushReceiver('127.0.0.1', 0, token='secret'))
+    watcher.setup()  # Starts the receiver; the injected service needs no login
+    try:
+        assert watcher.poll_once() == 1  # The first cycle is the fallback full sync
+
+        gmail.mailbox.add_message('new', 'Contract signed')
+        assert watcher.poll_once() == 0  # No notification yet, and the fallback poll is not due
+
+        # What Pub/Sub would POST once Gmail publishes the change
+        assert send_notification(watcher.receiver.url, 'me@example.com',
+                                 str(gmail.mailbox.history_id), token='secret') == 204
+        assert watcher.receiver.wait(5)
+        assert watcher.poll_once() == 1
+        assert gmail.mailbox.calls['history.list'] == 1
+        assert any('gmail_id: new' in path.read_text(encoding='utf-8') for path in action_files(vault))
+
+        # A repeated notification for a change already synced does not sync again
+        send_notification(watcher.receiver.url, 'me@example.com', str(gmail.mailbox.history_id),
+                          token='secret')
+        assert watcher.receiver.wait(5)
+        assert watcher.poll_once() == 0
+        assert gmail.mailbox.calls['history.list'] == 1
+    finally:
+        watcher.teardown()
@@ -0,0 +1,115 @@
+"""
+Tests for LinkedInWatcher against the fixture messaging page in
+tests/fixtures/linkedin.html: in-place refresh, the full reload fallback, and
+carrying old name/date message IDs over to thread IDs.
+Part of the AI Employee Silver Tier implementation
+"""
+
+from datetime import datetime
+
+import pytest
+
+from conftest import FIXTURES
+
+pytest.importorskip('playwright.sync_api')
+import linkedin_watcher  # noqa: E402
+from dedup_store import DedupStore  # noqa: E402
+from linkedin_watcher import LinkedInWatcher  # noqa: E402
+
+FIXTURE_URL = (FIXTURES / 'linkedin.html').as_uri()
+
+
+@pytest.fixture
+def make_watcher(vault, browser_pool, monkeypatch):
+    monkeypatch.setattr(linkedin_watcher, 'LINKEDIN_URL', FIXTURE_URL)
+    monkeypatch.setattr(linkedin_watcher, 'MESSAGING_URL', FIXTURE_URL)
+    watchers = []
+
+    def make() -> LinkedInWatcher:
+        watcher = LinkedInWatcher(vault, vault / 'session', pool=browser_pool)
+        watcher.setup()
+        watchers.append(watcher)
+        return watcher
+
+    yield make
+    for watcher in watchers:
+        watcher.teardown()
+
+
+def action_files(vault):
+    return sorted(path.name for path in (vault / 'Needs_Action').rglob('LINKEDIN_MSG_*.md'))
+
+
+def test_nav_click_refreshes_without_reloading(vault, make_watcher):
+    watcher = make_watcher()
+    assert watcher.poll_once() == 1  # Dana is unread; Sam is not
+    loads = watcher.page.evaluate('loads()')
+
+    watcher.page.evaluate("deliver('2-CCC', 'Lee Client', 'Can we talk about the project?')")
+    assert watcher.poll_once() == 1
+    assert watcher.page.evaluate('loads()') == loads  # Picked up in place
+    assert any(name.startswith('LINKEDIN_MSG_Lee Client_') for name in action_files(vault))
+
+    assert watcher.poll_once() == 0  # Nothing new: no files, still no reload
+    assert watcher.page.evaluate('loads()') == loads
+
+
+def test_new_message_in_a_known_thread_surfaces(vault, make_watcher):
+    watcher = make_watcher()
+    assert watcher.poll_once() == 1
+
+    watcher.page.evaluate("deliver('2-AAA', 'Dana Recruiter', 'Following up on my last note')")
+    assert watcher.poll_once() == 1
+    assert len(watcher.processed_messages) == 2
+    assert any('Following up on my last note' in path.read_text(encoding='utf-8')
+               for path in (vault / 'Needs_Action').rglob('LINKEDIN_MSG_Dana Recruiter_*.md'))
+
+
+def test_falls_back_to_a_full_reload(vault, make_watcher, monkeypatch):
+    watcher = make_watcher()
+    assert watcher.poll_once() == 1
+    loads = watcher.page.evaluate('loads()')
+
+    # No Messaging link to click: reload the page instead
+    watcher.page.evaluate("document.querySelector('.global-nav__primary-link').remove()")
+    watcher.page.evaluate("deliver('2-CCC', 'Lee Client', 'Can we talk about the project?')")
+    assert watcher.poll_once() == 1
+    assert watcher.page.evaluate('loads()') == loads + 1
+
+    # And periodically, even when the in-place refresh works
+    monkeypatch.setattr(linkedin_watcher, 'RELOAD_INTERVAL', 0)
+    assert watcher.poll_once() == 0
+    assert watcher.page.evaluate('loads()') == loads + 2
+
+
+def test_posting_reminder_counts_once(vault, make_watcher):
+    (vault / 'Business_Goals.md').write_text('# Goals\n', encoding='utf-8')
+    watcher = make_watcher()
+    assert watcher.poll_once() == 2  # Dana plus today's posting reminder
+
+    # The pending reminder is not rewritten or counted again, so the cycle stays idle
+    assert watcher.poll_once() == 0
+    assert len(list((vault / 'Needs_Action').rglob('LINKEDIN_POST_REMINDER_*.md'))) == 1
+
+
+def test_old_name_date_ids_carry_over(vault, make_watcher):
+    # Dana was imported today by the watcher's old name/date ID scheme
+    store = DedupStore(vault / 'Logs' / 'linkedin_watcher_seen.log')
+    store.add(f"Dana Recruiter_{datetime.now().strftime('%Y%m%d')}")
+    store.close()
+
+    watcher = make_watcher()
+    assert watcher.poll_once() == 0  # Not imported a second time
+    assert len(watcher.processed_messages) == 2  # Old ID plus the new thread ID
+
+    watcher.page.evaluate("deliver('2-AAA', 'Dana Recruiter', 'Following up on my last note')")
+    assert watcher.poll_once() == 1
+
+
+def test_old_ids_past_the_seed_window_are_ignored(vault):
+    store = DedupStore(vault / 'Logs' / 'linkedin_watcher_seen.log', ttl_days=None)
+    store.update(['Dana Recruiter_20200101', 'Sam Colleague_' + datetime.now().strftime('%Y%m%d'),
+                  '2-AAA_0123456789ab'])
+
+    assert linkedin_watcher.legacy_names(store) == {'Sam Colleague'}
+    store.close()
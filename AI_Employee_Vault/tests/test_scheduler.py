@@ -0,0 +1,65 @@
+"""
+Tests for AdaptiveSchedule's quiet hours
+Part of the AI Employee Silver Tier implementation
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from scheduler import QUIET_INTERVAL, AdaptiveSchedule, load_quiet_hours, schedule_for
+
+NIGHT = datetime(2026, 10, 18, 23, 0)  # Inside 22:00-07:00
+DAY = datetime(2026, 10, 18, 12, 0)
+QUIET = (22 * 60, 7 * 60)
+
+
+@pytest.fixture(autouse=True)
+def no_quiet_override(monkeypatch):
+    monkeypatch.delenv('QUIET_HOURS', raising=False)
+
+
+def test_idle_backoff_stretched_in_quiet_hours():
+    schedule = AdaptiveSchedule('idle', 60, quiet_hours=QUIET, jitter=0)
+    assert schedule.next_delay(0, now=NIGHT) == QUIET_INTERVAL
+    assert schedule.next_delay(0, now=DAY) < QUIET_INTERVAL
+
+
+def test_busy_cycle_keeps_its_pace_in_quiet_hours():
+    schedule = AdaptiveSchedule('busy', 60, quiet_hours=QUIET, jitter=0)
+    assert schedule.next_delay(3, now=NIGHT) == 30
+
+
+def test_quiet_window_never_overslept():
+    schedule = AdaptiveSchedule('idle', 60, quiet_hours=QUIET, jitter=0)
+    assert schedule.next_delay(0, now=datetime(2026, 10, 19, 6, 50)) == 600
+
+
+def test_steady_schedule_ignores_quiet_hours():
+    pump = AdaptiveSchedule('pump', 1, min_interval=1, max_interval=1, quiet_hours=QUIET, jitter=0)
+    assert pump.next_delay(0, now=NIGHT) == 1
+
+
+def test_exempt_watcher_gets_no_quiet_hours(vault, monkeypatch):
+    monkeypatch.setenv('QUIET_HOURS', '22:00-07:00')
+    regular = SimpleNamespace(check_interval=30)
+    exempt = SimpleNamespace(check_interval=30, max_interval=60, quiet_hours_exempt=True)
+
+    assert schedule_for(regular, 'regular', vault).quiet_hours == QUIET
+    assert schedule_for(exempt, 'exempt', vault).quiet_hours is None
+
+
+def test_executor_and_expiry_are_exempt():
+    from approval_executor import ApprovalExecutor
+    from approval_expiry import ApprovalExpiry
+
+    assert ApprovalExecutor.quiet_hours_exempt and ApprovalExpiry.quiet_hours_exempt
+
+
+def test_handbook_ships_without_quiet_hours(tmp_path):
+    from conftest import VAULT_ROOT
+
+    assert load_quiet_hours(VAULT_ROOT) is None
+    (tmp_path / 'Company_Handbook.md').write_text('- **Quiet hours:** 22:00-07:00\n', encoding='utf-8')
+    assert load_quiet_hours(tmp_path) == QUIET
@@ -0,0 +1,28 @@
+"""
+Tests for StreamingMessage attachments: a missing file fails the send for good
+Part of the AI Employee Silver Tier implementation
+"""
+
+import pytest
+
+from approved_messages import OutgoingEmail
+from streaming_mime import StreamingMessage
+
+
+def test_missing_attachment_raises(tmp_path):
+    with pytest.raises(FileNotFoundError, match='Attachment not found'):
+        StreamingMessage('me@example.com', 'you@example.com', 'Report', 'Attached.',
+                         attachments=[tmp_path / 'missing.pdf'])
+
+
+def test_missing_attachment_is_a_permanent_smtp_failure(tmp_path):
+    from send_smtp import SMTPSender
+
+    email = OutgoingEmail('APPROVAL_report', 'me@example.com', 'you@example.com', 'Report', 'Attached.',
+                          attachments=(str(tmp_path / 'missing.pdf'),))
+    with SMTPSender('127.0.0.1', 9, username=None, starttls=False, rate_limit=0) as smtp:
+        result = smtp.send(email)  # Fails while building, before any connection is made
+
+    assert not result.ok
+    assert not result.transient
+    assert 'missing.pdf' in result.error
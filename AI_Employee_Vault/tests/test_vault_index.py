@@ -0,0 +1,43 @@
+"""
+Tests for VaultIndex removals: one row for a file, a key range for a directory
+Part of the AI Employee Silver Tier implementation
+"""
+
+from pathlib import Path
+
+import pytest
+
+from vault_index import VaultIndex
+
+
+@pytest.fixture
+def index(vault):
+    index = VaultIndex(vault)
+    yield index
+    index.close()
+
+
+def indexed(index):
+    return sorted(Path(item['path']).relative_to(index.vault_path).as_posix() for item in index.query())
+
+
+def test_removing_a_file_keeps_its_neighbours(vault, index):
+    for name in ('a.md', 'a.md.md', 'b.md'):
+        (vault / 'Needs_Action' / name).write_text('---\nstatus: pending\n---\n', encoding='utf-8')
+    index.sync()
+
+    index.remove_file(vault / 'Needs_Action' / 'a.md')
+
+    assert indexed(index) == ['Needs_Action/a.md.md', 'Needs_Action/b.md']
+
+
+def test_removing_a_directory_drops_only_its_children(vault, index):
+    for relative in ('2026-10/x.md', '2026-10/deep/y.md', '2026-10-old/z.md', 'top.md'):
+        path = vault / 'Done' / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('done\n', encoding='utf-8')
+    index.sync()
+
+    index.remove_file(vault / 'Done' / '2026-10', is_directory=True)
+
+    assert indexed(index) == ['Done/2026-10-old/z.md', 'Done/top.md']
@@ -0,0 +1,88 @@
+"""
+Tests for vault_layout's date partitions, the archiver and migrate
+Part of the AI Employee Silver Tier implementation
+"""
+
+import os
+from datetime import datetime
+
+from vault_layout import archive, iter_files, migrate, partition_dir
+
+WHEN = datetime(2026, 10, 18, 9, 30)
+SEPTEMBER = datetime(2026, 9, 3, 14, 0)
+
+
+def write_item(path, when: datetime, status: str = 'pending'):
+    """An action file whose mtime (what partitioning goes by) is ``when``"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"---\ntype: email\nstatus: {status}\n---\n\n{path.stem}\n", encoding='utf-8')
+    os.utime(path, (when.timestamp(), when.timestamp()))
+
+
+def tree(folder):
+    return sorted(path.relative_to(folder).as_posix() for path in iter_files(folder))
+
+
+def test_flat_layout_uses_the_folder(vault):
+    assert partition_dir(vault, 'Needs_Action', WHEN, layout='flat') == vault / 'Needs_Action'
+
+
+def test_partition_recreated_after_removal(vault):
+    directory = partition_dir(vault, 'Needs_Action', WHEN, layout='daily')
+    assert directory == vault / 'Needs_Action' / '2026' / '10' / '18'
+    assert directory.is_dir()
+
+    # Emptied and removed (by migrate, or by hand) while the watchers run
+    directory.rmdir()
+    assert partition_dir(vault, 'Needs_Action', WHEN, layout='daily').is_dir()
+
+
+def test_dry_run_creates_nothing(vault):
+    directory = partition_dir(vault, 'Done', WHEN, layout='monthly', create=False)
+    assert directory == vault / 'Done' / '2026' / '10'
+    assert not directory.exists()
+
+
+def test_archive_files_dated_items_into_done_partitions(vault):
+    write_item(vault / 'Done' / 'EMAIL_a.md', WHEN)
+    write_item(vault / 'Done' / 'EMAIL_b.md', SEPTEMBER)
+    write_item(vault / 'Done' / '2026' / '10' / 'EMAIL_c.md', WHEN)  # Already filed
+    write_item(vault / 'Done' / '2026' / '10' / 'EMAIL_d.md', WHEN)
+    write_item(vault / 'Done' / 'EMAIL_d.md', WHEN)  # Same name as a filed item
+    write_item(vault / 'Needs_Action' / 'EMAIL_e.md', WHEN, status='done')
+    write_item(vault / 'Needs_Action' / 'EMAIL_f.md', WHEN)  # Still pending
+
+    result = archive(vault, layout='monthly', batch_size=2)
+
+    assert result == {'completed': 1, 'loose': 3, 'moved': 4}
+    assert tree(vault / 'Done') == ['2026/09/EMAIL_b.md', '2026/10/EMAIL_a.md', '2026/10/EMAIL_c.md',
+                                    '2026/10/EMAIL_d.md', '2026/10/EMAIL_d_1.md', '2026/10/EMAIL_e.md']
+    assert tree(vault / 'Needs_Action') == ['EMAIL_f.md']
+    assert 'status: pending' in (vault / 'Done' / '2026' / '10' / 'EMAIL_d.md').read_text(encoding='utf-8')
+
+
+def test_archive_dry_run_moves_nothing(vault):
+    write_item(vault / 'Done' / 'EMAIL_a.md', WHEN)
+
+    assert archive(vault, layout='daily', dry_run=True)['moved'] == 1
+    assert tree(vault / 'Done') == ['EMAIL_a.md']
+
+
+def test_migrate_partitions_a_flat_folder(vault):
+    write_item(vault / 'Needs_Action' / 'EMAIL_a.md', WHEN)
+    write_item(vault / 'Needs_Action' / 'EMAIL_b.md', SEPTEMBER)
+    write_item(vault / 'Needs_Action' / '2026' / '10' / 'EMAIL_a.md', WHEN)  # Written after a layout switch
+    write_item(vault / 'Done' / 'EMAIL_c.md', SEPTEMBER)
+
+    assert migrate(vault, layout='monthly') == {'Needs_Action': 2, 'Done': 1}
+    assert tree(vault / 'Needs_Action') == ['2026/09/EMAIL_b.md', '2026/10/EMAIL_a.md', '2026/10/EMAIL_a_1.md']
+    assert tree(vault / 'Done') == ['2026/09/EMAIL_c.md']
+
+
+def test_migrate_back_to_flat_renames_collisions_and_drops_empty_partitions(vault):
+    write_item(vault / 'Needs_Action' / '2026' / '09' / 'EMAIL_a.md', SEPTEMBER)
+    write_item(vault / 'Needs_Action' / '2026' / '10' / 'EMAIL_a.md', WHEN)
+
+    assert migrate(vault, layout='flat')['Needs_Action'] == 2
+    assert tree(vault / 'Needs_Action') == ['EMAIL_a.md', 'EMAIL_a_1.md']
+    assert not (vault / 'Needs_Action' / '2026').exists()
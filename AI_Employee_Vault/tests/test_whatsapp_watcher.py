@@ -0,0 +1,95 @@
+"""
+Tests for WhatsAppWatcher in push and poll mode, against the fixture chat
+list in tests/fixtures/whatsapp.html (served through WHATSAPP_URL).
+Part of the AI Employee Silver Tier implementation
+"""
+
+import time
+
+import pytest
+
+from conftest import FIXTURES
+
+pytest.importorskip('playwright.sync_api')
+import whatsapp_watcher  # noqa: E402
+from whatsapp_watcher import WhatsAppWatcher  # noqa: E402
+
+FIXTURE_URL = (FIXTURES / 'whatsapp.html').as_uri()
+PUMP_DEADLINE = 5  # seconds to wait for the observer's debounced report
+
+
+@pytest.fixture
+def make_watcher(vault, browser_pool, monkeypatch):
+    """Build a watcher in the given mode on the shared pool, pointed at the fixture"""
+    monkeypatch.setattr(whatsapp_watcher, 'WHATSAPP_URL', FIXTURE_URL)
+    watchers = []
+
+    def make(mode: str) -> WhatsAppWatcher:
+        watcher = WhatsAppWatcher(vault, vault / 'session', check_interval=30, pool=browser_pool, mode=mode)
+        watcher.setup()
+        watchers.append(watcher)
+        return watcher
+
+    yield make
+    for watcher in watchers:
+        watcher.teardown()
+
+
+def action_files(vault):
+    return sorted(path.name for path in (vault / 'Needs_Action').rglob('WHATSAPP_*.md'))
+
+
+def pump_until(watcher: WhatsAppWatcher, expected: int) -> int:
+    """Poll until ``expected`` files were created (push reports arrive a debounce later)"""
+    created, deadline = 0, time.monotonic() + PUMP_DEADLINE
+    while created < expected and time.monotonic() < deadline:
+        created += watcher.poll_once()
+    return created
+
+
+def test_poll_mode_scans_unread_chats(vault, make_watcher):
+    watcher = make_watcher('poll')
+
+    assert watcher.poll_once() == 1  # Acme is urgent; Family is not; Old Client is read
+    assert action_files(vault)[0].startswith('WHATSAPP_Acme Ltd_')
+    assert watcher.poll_once() == 0  # Already processed
+
+    watcher.page.evaluate("receiveMessage('Supplier', 'Payment failed, we need help asap')")
+    watcher.page.evaluate("receiveMessage('Family', 'Dinner at eight?')")
+    assert watcher.poll_once() == 1
+    assert any(name.startswith('WHATSAPP_Supplier_') for name in action_files(vault))
+    assert len(action_files(vault)) == 2
+
+
+def test_push_mode_reports_changes_without_scanning(vault, make_watcher):
+    watcher = make_watcher('push')
+    assert watcher.check_interval == watcher.min_interval == watcher.max_interval
+
+    # First pump: the observer reports what is already unread, the fallback scan runs once
+    assert pump_until(watcher, 1) == 1
+    assert action_files(vault)[0].startswith('WHATSAPP_Acme Ltd_')
+    first_scan = watcher._last_full_scan
+    assert first_scan > 0
+
+    watcher.page.evaluate("receiveMessage('Supplier', 'Payment failed, we need help asap')")
+    assert pump_until(watcher, 1) == 1
+    assert watcher._last_full_scan == first_scan  # Found by the observer, not a rescan
+    assert any(name.startswith('WHATSAPP_Supplier_') for name in action_files(vault))
+
+    watcher.page.evaluate("receiveMessage('Family', 'Dinner at eight?')")
+    assert pump_until(watcher, 1) == 0
+    assert len(action_files(vault)) == 2
+
+
+def test_push_mode_falls_back_to_a_full_scan(vault, make_watcher):
+    watcher = make_watcher('push')
+    assert pump_until(watcher, 1) == 1
+
+    # Drop the observer's reports; only the periodic full scan can find the message now
+    watcher.page.evaluate("window.__aiEmployeeReportUnread = () => {}")
+    watcher.page.evaluate("receiveMessage('Supplier', 'Payment failed, we need help asap')")
+    assert pump_until(watcher, 1) == 0
+
+    watcher._last_full_scan = 0.0  # Fallback interval elapsed
+    assert watcher.poll_once() == 1
+    assert any(name.startswith('WHATSAPP_Supplier_') for name in action_files(vault))
@@ -0,0 +1,155 @@
+"""
+Timer Wheel - Hierarchical timing wheel for large numbers of deadlines
+Part of the AI Employee Silver Tier implementation
+
+Timers live in ``levels`` wheels of ``slots`` buckets each. Level 0 holds
+timers due within the current window of ``slots`` ticks, level 1 those due
+within the current window of ``slots**2`` ticks, and so on. Timers further
+out than the top level wait in an overflow set. When the clock enters a new
+window, the matching bucket one level up is cascaded down. Scheduling and
+cancelling are O(1), and advancing the clock costs O(ticks crossed + timers
+fired). It never costs O(timers pending). Stretches with nothing scheduled
+are skipped a whole window at a time.
+
+With the defaults (1 s ticks, 4 levels of 64 slots) the wheels cover about
+194 days. A timer never fires early: deadlines are rounded up to the next
+tick.
+"""
+
+import math
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+RESOLUTION = 1.0  # seconds per tick
+SLOTS = 64
+LEVELS = 4
+
+_DUE = -1  # Location of timers whose tick has passed but that were not yet returned
+_OVERFLOW = -2
+
+
+class TimerWheel:
+    """Deadlines keyed by any hashable; ``advance(now)`` returns the keys that are due"""
+
+    def __init__(self, now: float, resolution: float = RESOLUTION, slots: int = SLOTS,
+                 levels: int = LEVELS):
+        self.resolution = resolution
+        self.slots = slots
+        self.levels = levels
+        self.spans = [slots ** level for level in range(levels + 1)]  # Ticks per bucket at each level
+        self.current = math.floor(now / resolution)
+        self.wheels: List[List[Set[Hashable]]] = [[set() for _ in range(slots)] for _ in range(levels)]
+        self.counts = [0] * (levels + 1)  # Timers per level; the last entry is the overflow
+        self.overflow: Set[Hashable] = set()
+        self.due: Dict[Hashable, None] = {}  # Ordered set
+        self.ticks: Dict[Hashable, int] = {}
+        self.deadlines: Dict[Hashable, float] = {}
+        self._where: Dict[Hashable, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.ticks
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        return self.deadlines.get(key)
+
+    def _place(self, key: Hashable, tick: int):
+        if tick <= self.current:
+            self.due[key] = None
+            self._where[key] = (_DUE, 0)
+            return
+        for level in range(self.levels):
+            span = self.spans[level + 1]
+            if tick // span == self.current // span:  # Due within this level's current window
+                slot = (tick // self.spans[level]) % self.slots
+                self.wheels[level][slot].add(key)
+                self.counts[level] += 1
+                self._where[key] = (level, slot)
+                return
+        self.overflow.add(key)
+        self.counts[self.levels] += 1
+        self._where[key] = (_OVERFLOW, 0)
+
+    def _remove(self, key: Hashable):
+        level, slot = self._where.pop(key)
+        if level == _DUE:
+            del self.due[key]
+        elif level == _OVERFLOW:
+            self.overflow.discard(key)
+            self.counts[self.levels] -= 1
+        else:
+            self.wheels[level][slot].discard(key)
+            self.counts[level] -= 1
+
+    def schedule(self, key: Hashable, deadline: float):
+        """Fire ``key`` at ``deadline`` (epoch seconds), replacing any earlier timer for it"""
+        if key in self.ticks:
+            self._remove(key)
+        tick = math.ceil(deadline / self.resolution)
+        self.ticks[key] = tick
+        self.deadlines[key] = deadline
+        self._place(key, tick)
+
+    def cancel(self, key: Hashable) -> bool:
+        """Drop the timer for ``key``; False if there was none"""
+        if key not in self.ticks:
+            return False
+        self._remove(key)
+        del self.ticks[key]
+        del self.deadlines[key]
+        return True
+
+    def _cascade(self, level: int, slot: int):
+        """Re-place every timer in one bucket now that the clock has reached its window"""
+        if level == self.levels:
+            bucket, self.overflow = self.overflow, set()
+        else:
+            bucket, self.wheels[level][slot] = self.wheels[level][slot], set()
+        self.counts[level] -= len(bucket)
+        for key in bucket:
+            self._place(key, self.ticks[key])
+
+    def _skip_to(self, target: int) -> bool:
+        """Jump over ticks where nothing can fire or cascade; True if the target was reached"""
+        for level in range(self.levels + 1):
+            if self.counts[level]:
+                break
+        else:
+            self.current = target  # Nothing scheduled at all
+            return True
+        if level == 0:
+            return False
+        span = self.spans[level]  # Lowest busy level only cascades at multiples of its span
+        boundary = (self.current // span + 1) * span
+        if boundary > target:
+            self.current = target
+            return True
+        self.current = boundary - 1
+        return False
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Move the clock to ``now`` and return (and forget) every key whose deadline has passed"""
+        target = math.floor(now / self.resolution)
+        while self.current < target:
+            if self._skip_to(target):
+                break
+            self.current += 1
+            tick = self.current
+            for level in range(self.levels, 0, -1):  # Top level first so its timers can cascade further
+                if tick % self.spans[level] == 0:
+                    self._cascade(level, (tick // self.spans[level]) % self.slots)
+            slot = tick % self.slots
+            bucket, self.wheels[0][slot] = self.wheels[0][slot], set()
+            self.counts[0] -= len(bucket)
+            for key in bucket:
+                self.due[key] = None
+                self._where[key] = (_DUE, 0)
+
+        fired = list(self.due)
+        self.due.clear()
+        for key in fired:
+            del self._where[key]
+            del self.ticks[key]
+            del self.deadlines[key]
+        return fired
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Vault Index - Incremental SQLite index of action-file frontmatter
+Part of the AI Employee Silver Tier implementation
+
+Every markdown file under the indexed folders gets one row holding its
+frontmatter (type, status, priority, gmail_id, chat_id, received, plus the
+full field set as JSON), and an events table records activity such as
+"posted on LinkedIn" for the dashboard. The index is kept current three ways:
+
+- sync() compares each file's size/mtime with its row and only re-parses
+  files that changed (run at startup, cheap when nothing did)
+- a vault_io write listener updates rows as soon as a watcher writes a file
+- a watchdog observer catches edits, moves and deletes made by anyone else
+  (Obsidian, Claude Code skills, the user)
+
+Usage:
+    python vault_index.py sync
+    python vault_index.py --sync query --status pending --priority high
+    python vault_index.py query --type email --field from=boss@example.com
+    python vault_index.py stats
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from vault_io import add_write_listener, remove_write_listener
+
+logger = logging.getLogger("VaultIndex")
+
+VAULT_PATH = Path(__file__).parent
+INDEXED_FOLDERS = ['Needs_Action', 'Plans', 'Pending_Approval', 'Approved', 'Rejected', 'Done']
+COLUMNS = ['type', 'status', 'priority', 'gmail_id', 'chat_id', 'received']
+FRONTMATTER_MAX_BYTES = 16 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    path TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    type TEXT,
+    status TEXT,
+    priority TEXT,
+    gmail_id TEXT,
+    chat_id TEXT,
+    received TEXT,
+    frontmatter TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_status_priority ON items (status, priority);
+CREATE INDEX IF NOT EXISTS items_folder ON items (folder, received);
+CREATE INDEX IF NOT EXISTS items_type ON items (type);
+CREATE INDEX IF NOT EXISTS items_gmail_id ON items (gmail_id);
+CREATE INDEX IF NOT EXISTS items_chat_id ON items (chat_id);
+CREATE TABLE IF NOT EXISTS events (
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_kind_ts ON events (kind, ts);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+"""
+
+
+def parse_frontmatter(path: Path) -> Dict[str, str]:
+    """Flat ``key: value`` pairs between the leading ``---`` lines"""
+    fields: Dict[str, str] = {}
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        if f.readline().strip() != '---':
+            return fields
+        consumed = 0
+        for line in f:
+            consumed += len(line)
+            if line.strip() == '---' or consumed > FRONTMATTER_MAX_BYTES:
+                break
+            key, sep, value = line.partition(':')
+            if sep and key.strip() and not key.startswith((' ', '\t', '-')):
+                fields[key.strip()] = value.strip().strip('"\'')
+    return fields
+
+
+class VaultIndex:
+    """Frontmatter index over the vault's workflow folders"""
+
+    def __init__(self, vault_path: Path, db_path: Optional[Path] = None):
+        self.vault_path = Path(vault_path).resolve()
+        self.db_path = Path(db_path) if db_path else self.vault_path / 'Logs' / 'vault_index.sqlite3'
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()  # Listener and observer threads share the connection
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self.observer = None
+
+    # --- Maintenance ---
+
+    def _folder_of(self, path: Path) -> Optional[str]:
+        """Indexed top-level folder containing ``path``, or None if it is not indexed"""
+        if path.suffix != '.md' or path.name.startswith('.'):
+            return None
+        try:
+            parts = path.resolve().relative_to(self.vault_path).parts
+        except ValueError:
+            return None
+        if len(parts) > 1 and parts[0] in INDEXED_FOLDERS:
+            return parts[0]
+        return None
+
+    def _row(self, path: Path, folder: str, stat: os.stat_result) -> Tuple:
+        fields = parse_frontmatter(path)
+        return ((str(path), folder, stat.st_size, stat.st_mtime_ns)
+                + tuple(fields.get(column) for column in COLUMNS)
+                + (json.dumps(fields),))
+
+    def update_file(self, path: Path):
+        """Re-index one file (removes its row if it no longer exists)"""
+        path = Path(path).resolve()
+        folder = self._folder_of(path)
+        if folder is None:
+            return
+        try:
+            row = self._row(path, folder, path.stat())
+        except OSError:
+            self.remove_file(path)
+            return
+        with self._lock, self._conn:
+            self._conn.execute(f'INSERT OR REPLACE INTO items VALUES ({", ".join("?" * len(row))})', row)
+
+    def remove_file(self, path: Path, is_directory: bool = False):
+        """Drop one file's row, or every row under a removed directory (both PK lookups)"""
+        path = Path(path).resolve()
+        with self._lock, self._conn:
+            if not is_directory:
+                self._conn.execute('DELETE FROM items WHERE path = ?', (str(path),))
+                return
+            prefix = str(path) + os.sep
+            self._conn.execute('DELETE FROM items WHERE path >= ? AND path < ? || char(1114111)',
+                               (prefix, prefix))
+
+    def _walk(self) -> Iterator[Tuple[str, str, os.stat_result]]:
+        stack = [(folder, self.vault_path / folder) for folder in INDEXED_FOLDERS]
+        while stack:
+            folder, directory = stack.pop()
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir():
+                        stack.append((folder, Path(entry.path)))
+                    elif entry.name.endswith('.md'):
+                        yield entry.path, folder, entry.stat()
+
+    def sync(self) -> Dict[str, int]:
+        """Bring the index in line with disk, parsing only files whose size/mtime changed"""
+        with self._lock:
+            known = {path: (size, mtime_ns) for path, size, mtime_ns
+                     in self._conn.execute('SELECT path, size, mtime_ns FROM items')}
+
+        changed: List[Tuple] = []
+        seen = set()
+        for path, folder, stat in self._walk():
+            seen.add(path)
+            if known.get(path) != (stat.st_size, stat.st_mtime_ns):
+                try:
+                    changed.append(self._row(Path(path), folder, stat))
+                except OSError:
+                    continue
+        removed = [(path,) for path in known.keys() - seen]
+
+        with self._lock, self._conn:
+            if changed:
+                self._conn.executemany(
+                    f'INSERT OR REPLACE INTO items VALUES ({", ".join("?" * len(changed[0]))})', changed)
+            if removed:
+                self._conn.executemany('DELETE FROM items WHERE path = ?', removed)
+
+        result = {'files': len(seen), 'updated': len(changed), 'removed': len(removed)}
+        logger.info(f"Vault index synced: {result}")
+        return result
+
+    # --- Live updates ---
+
+    def start(self):
+        """Sync, then follow watcher writes and filesystem events"""
+        self.sync()
+        add_write_listener(self.update_file)
+
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            logger.warning("watchdog not installed; vault index only follows watcher writes")
+            return
+
+        index = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_created(self, event):
+                if not event.is_directory:
+                    index.update_file(Path(event.src_path))
+
+            on_modified = on_created
+
+            def on_deleted(self, event):
+                index.remove_file(Path(event.src_path), event.is_directory)
+
+            def on_moved(self, event):
+                index.remove_file(Path(event.src_path), event.is_directory)
+                if event.is_directory:
+                    index.sync()
+                else:
+                    index.update_file(Path(event.dest_path))
+
+        self.observer = Observer()
+        for folder in INDEXED_FOLDERS:
+            (self.vault_path / folder).mkdir(exist_ok=True)
+            self.observer.schedule(_Handler(), str(self.vault_path / folder), recursive=True)
+        self.observer.start()
+
+    def stop(self):
+        remove_write_listener(self.update_file)
+        if self.observer:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            self._conn.close()
+
+    # --- Queries ---
+
+    def query(self, folder: Optional[str] = None, status: Optional[str] = None,
+              priority: Optional[str] = None, type: Optional[str] = None,
+              fields: Optional[Dict[str, str]] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Items matching every given filter, newest first"""
+        clauses, params = [], []
+        for column, value in (('folder', folder), ('status', status),
+                              ('priority', priority), ('type', type)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        for key, value in (fields or {}).items():
+            if key in COLUMNS:
+                clauses.append(f'{key} = ?')
+            else:
+                clauses.append('json_extract(frontmatter, ?) = ?')
+                params.append(f'$."{key}"')
+            params.append(value)
+
+        sql = 'SELECT path, folder, frontmatter FROM items'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY received DESC'
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{'path': path, 'folder': folder, **json.loads(frontmatter)}
+                for path, folder, frontmatter in rows]
+
+    def count(self, group_by: str = 'folder', modified_since: Optional[float] = None,
+              **filters) -> Dict[str, int]:
+        """Item counts grouped by one of folder/status/priority/type"""
+        if group_by not in ('folder', 'status', 'priority', 'type'):
+            raise ValueError(f"Cannot group by {group_by!r}")
+        unknown = set(filters) - set(COLUMNS) - {'folder'}
+        if unknown:
+            raise ValueError(f"Cannot filter on {sorted(unknown)}")
+        clauses = [f'{column} = ?' for column in filters]
+        params = list(filters.values())
+        if modified_since is not None:
+            clauses.append('mtime_ns >= ?')
+            params.append(int(modified_since * 1e9))
+        sql = f'SELECT {group_by}, COUNT(*) FROM items'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += f' GROUP BY {group_by}'
+        with self._lock:
+            return {key or '': n for key, n in self._conn.execute(sql, params)}
+
+    def exists(self, column: str, value: str) -> bool:
+        """True if any item has ``column == value`` (e.g. a gmail_id already filed)"""
+        if column not in COLUMNS:
+            raise ValueError(f"{column!r} is not an indexed column")
+        with self._lock:
+            return self._conn.execute(
+                f'SELECT 1 FROM items WHERE {column} = ? LIMIT 1', (value,)).fetchone() is not None
+
+    # --- Activity events ---
+
+    def add_event(self, kind: str, message: str, ts: Optional[float] = None):
+        """Record an activity event (e.g. kind='linkedin_post')"""
+        with self._lock, self._conn:
+            self._conn.execute('INSERT INTO events VALUES (?, ?, ?)',
+                               (ts or time.time(), kind, message))
+
+    def recent_events(self, limit: int = 20) -> List[Tuple[float, str, str]]:
+        """Latest (ts, kind, message) events, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT ts, kind, message FROM events ORDER BY ts DESC LIMIT ?', (limit,)).fetchall()
+        return rows[::-1]
+
+    def last_event_time(self, kind: str) -> Optional[float]:
+        """Timestamp of the most recent event of ``kind``"""
+        with self._lock:
+            row = self._conn.execute('SELECT MAX(ts) FROM events WHERE kind = ?', (kind,)).fetchone()
+        return row[0]
+
+    def prune_events(self, older_than: float):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM events WHERE ts < ?', (older_than,))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the vault frontmatter index')
+    parser.add_argument('--vault', default=os.getenv('VAULT_PATH', str(VAULT_PATH)))
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('sync', help='Re-index changed files')
+    query = sub.add_parser('query', help='List matching items')
+    query.add_argument('--folder')
+    query.add_argument('--status')
+    query.add_argument('--priority')
+    query.add_argument('--type')
+    query.add_argument('--field', action='append', default=[], metavar='KEY=VALUE',
+                       help='Any other frontmatter field (repeatable)')
+    query.add_argument('--limit', type=int)
+    query.add_argument('--json', action='store_true', help='Print full frontmatter as JSON lines')
+    stats = sub.add_parser('stats', help='Item counts')
+    stats.add_argument('--by', default='folder', choices=['folder', 'status', 'priority', 'type'])
+    parser.add_argument('--sync', action='store_true',
+                        help='Re-index changed files first (not needed while the supervisor runs)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(name)s - %(levelname)s - %(message)s')
+    index = VaultIndex(Path(args.vault))
+    try:
+        if args.command == 'sync':
+            print(index.sync())
+            return
+        if args.sync:
+            index.sync()
+
+        start = time.perf_counter()
+
+        if args.command == 'stats':
+            for key, n in sorted(index.count(args.by).items()):
+                print(f"{key or '(none)':<20} {n}")
+            return
+
+        fields = dict(item.split('=', 1) for item in args.field)
+        items = index.query(args.folder, args.status, args.priority, args.type, fields, args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        for item in items:
+            if args.json:
+                print(json.dumps(item))
+            else:
+                print(f"{item.get('priority', ''):<8} {item.get('status', ''):<10} "
+                      f"{item['folder']:<16} {Path(item['path']).name}")
+        print(f"{len(items)} item(s) in {elapsed:.1f} ms", file=sys.stderr)
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
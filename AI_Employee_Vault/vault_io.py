@@ -0,0 +1,139 @@
+"""
+Vault I/O - Crash-safe writes for state and action files
+Part of the AI Employee Silver Tier implementation
+
+Every write goes to a hidden temp file in the target directory, is fsynced,
+and is then renamed over the destination. Readers (watchers, Obsidian,
+Claude Code skills) therefore see either the old file or the complete new
+one, never a truncated one. Temp names start with '.' so the Inbox handler
+and Obsidian both ignore them.
+
+Write listeners (see add_write_listener) are told about every completed
+write, so in-process caches such as the vault index stay current without
+waiting for a filesystem event. Create listeners (see add_create_listener)
+only hear about writes that brought a new file into existence.
+"""
+
+import os
+import json
+import shutil
+import logging
+from pathlib import Path
+from typing import Any, Callable, List
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+logger = logging.getLogger("VaultIO")
+
+_write_listeners: List[Callable[[Path], None]] = []
+_create_listeners: List[Callable[[Path], None]] = []
+
+
+def add_write_listener(listener: Callable[[Path], None]):
+    """Call ``listener(path)`` after every completed atomic write or copy"""
+    if listener not in _write_listeners:
+        _write_listeners.append(listener)
+
+
+def remove_write_listener(listener: Callable[[Path], None]):
+    if listener in _write_listeners:
+        _write_listeners.remove(listener)
+
+
+def add_create_listener(listener: Callable[[Path], None]):
+    """Call ``listener(path)`` after a write or copy that created ``path``"""
+    if listener not in _create_listeners:
+        _create_listeners.append(listener)
+
+
+def remove_create_listener(listener: Callable[[Path], None]):
+    if listener in _create_listeners:
+        _create_listeners.remove(listener)
+
+
+def _notify(path: Path, created: bool):
+    listeners = list(_write_listeners) + (list(_create_listeners) if created else [])
+    for listener in listeners:
+        try:
+            listener(path)
+        except Exception as e:
+            logger.error(f"Write listener failed for {path.name}: {e}")
+
+
+def _temp_path(path: Path) -> Path:
+    """Hidden temp file next to the destination (same filesystem for rename)"""
+    return path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+
+def fsync_dir(directory: Path):
+    """Persist a rename by fsyncing the containing directory (POSIX only)"""
+    if os.name != 'posix':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path: Path, data: bytes, fsync: bool = True, overwrite: bool = True):
+    """
+    Write bytes via temp file + fsync + rename. With ``overwrite=False`` the
+    temp file is linked into place instead, which raises FileExistsError
+    rather than replace an existing file.
+    """
+    path = Path(path)
+    tmp_path = _temp_path(path)
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        if overwrite:
+            created = not path.exists()
+            os.replace(tmp_path, path)
+        else:
+            os.link(tmp_path, path)
+            tmp_path.unlink()
+            created = True
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    if fsync:
+        fsync_dir(path.parent)
+    _notify(path, created)
+
+
+def atomic_write_text(path: Path, text: str, encoding: str = 'utf-8', fsync: bool = True,
+                      overwrite: bool = True):
+    """Write text via temp file + fsync + rename"""
+    atomic_write_bytes(path, text.encode(encoding), fsync=fsync, overwrite=overwrite)
+
+
+def atomic_write_json(path: Path, data: Any, fsync: bool = True):
+    """Write JSON via temp file + fsync + rename"""
+    atomic_write_text(path, json.dumps(data, indent=2), fsync=fsync)
+
+
+def atomic_copy(source: Path, dest: Path, fsync: bool = True):
+    """Copy a file (data and metadata) so dest only appears once complete"""
+    dest = Path(dest)
+    tmp_path = _temp_path(dest)
+    try:
+        with open(source, 'rb') as src, open(tmp_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+            dst.flush()
+            if fsync:
+                os.fsync(dst.fileno())
+        shutil.copystat(source, tmp_path)
+        created = not dest.exists()
+        os.replace(tmp_path, dest)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    if fsync:
+        fsync_dir(dest.parent)
+    _notify(dest, created)
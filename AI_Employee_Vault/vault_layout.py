@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Vault Layout - Optional date partitioning of Needs_Action/ and Done/
+Part of the AI Employee Silver Tier implementation
+
+With VAULT_LAYOUT=flat (the default) every action file sits directly in its
+folder, as before. With 'monthly' or 'daily', watchers write new items to
+Needs_Action/2026/10/ or Needs_Action/2026/10/18/, and the archiver moves
+completed items into matching Done/ partitions, so no single directory grows
+to hundreds of thousands of entries.
+
+Readers should use iter_files() (or the vault index), which walk both layouts.
+
+Usage:
+    python vault_layout.py archive            # File completed items into Done/ partitions
+    python vault_layout.py migrate --dry-run  # Partition an existing flat vault
+"""
+
+import os
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set
+
+from vault_io import fsync_dir
+from vault_index import parse_frontmatter
+
+logger = logging.getLogger("VaultLayout")
+
+VAULT_PATH = Path(__file__).parent
+LAYOUTS = ('flat', 'monthly', 'daily')
+VAULT_LAYOUT = os.getenv('VAULT_LAYOUT', 'flat')
+PARTITIONED_FOLDERS = ('Needs_Action', 'Done')
+ARCHIVE_BATCH_SIZE = 500  # Renames per batch; each touched directory is fsynced once per batch
+COMPLETED_STATUSES = {'done', 'completed', 'complete'}
+
+
+def partition_dir(vault_path: Path, folder: str, when: Optional[datetime] = None,
+                  layout: str = VAULT_LAYOUT, create: bool = True) -> Path:
+    """Directory a new item for ``folder`` belongs in (created if missing)"""
+    base = Path(vault_path) / folder
+    if layout == 'flat' or folder not in PARTITIONED_FOLDERS:
+        return base
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown vault layout {layout!r}; expected one of {LAYOUTS}")
+    when = when or datetime.now()
+    directory = base / f'{when:%Y}' / f'{when:%m}'
+    if layout == 'daily':
+        directory = directory / f'{when:%d}'
+    if create:
+        # Not cached: a partition emptied and removed by migrate or by hand must come back
+        directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def iter_files(directory: Path, suffix: Optional[str] = None) -> Iterator[Path]:
+    """Every non-hidden file under ``directory``, in either layout"""
+    stack = [Path(directory)]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir():
+                    stack.append(Path(entry.path))
+                elif suffix is None or entry.name.endswith(suffix):
+                    yield Path(entry.path)
+
+
+def _free_name(directory: Path, name: str, taken: Set[str]) -> Path:
+    """``directory/name``, suffixed with _1, _2... if that name is already used"""
+    candidate = directory / name
+    stem, dot, ext = name.partition('.')
+    n = 0
+    while str(candidate) in taken or candidate.exists():
+        n += 1
+        candidate = directory / f'{stem}_{n}{dot}{ext}'
+    taken.add(str(candidate))
+    return candidate
+
+
+def _move_batches(moves: List[tuple], batch_size: int, dry_run: bool) -> int:
+    """Rename (source, dest) pairs, fsyncing each touched directory once per batch"""
+    moved = 0
+    for start in range(0, len(moves), batch_size):
+        touched: Set[Path] = set()
+        for source, dest in moves[start:start + batch_size]:
+            if dry_run:
+                logger.info(f"Would move {source} -> {dest}")
+            else:
+                try:
+                    os.rename(source, dest)
+                except OSError as e:
+                    logger.error(f"Could not move {source.name}: {e}")
+                    continue
+                touched.update((source.parent, dest.parent))
+            moved += 1
+        for directory in touched:
+            fsync_dir(directory)
+    return moved
+
+
+def _plan(files: List[Path], vault_path: Path, folder: str, layout: str,
+          taken: Set[str], dry_run: bool = False) -> List[tuple]:
+    """Destination in ``folder`` for each file, partitioned by its mtime"""
+    moves = []
+    for path in files:
+        when = datetime.fromtimestamp(path.stat().st_mtime)
+        directory = partition_dir(vault_path, folder, when, layout, create=not dry_run)
+        if path.parent != directory:
+            moves.append((path, _free_name(directory, path.name, taken)))
+    return moves
+
+
+def archive(vault_path: Path, layout: str = VAULT_LAYOUT, batch_size: int = ARCHIVE_BATCH_SIZE,
+            index=None, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Move completed Needs_Action items (status: done/completed) and anything
+    left loose at the top of Done/ into Done's partitions.
+    Uses the vault index for the status lookup when one is given.
+    """
+    vault_path = Path(vault_path)
+    taken: Set[str] = set()
+
+    if index is not None:
+        completed = [Path(item['path']) for status in COMPLETED_STATUSES
+                     for item in index.query(folder='Needs_Action', status=status)]
+    else:
+        completed = [path for path in iter_files(vault_path / 'Needs_Action', '.md')
+                     if parse_frontmatter(path).get('status', '').lower() in COMPLETED_STATUSES]
+    completed = [path for path in completed if path.exists()]
+
+    done = vault_path / 'Done'
+    loose = [Path(entry.path) for entry in os.scandir(done)
+             if entry.is_file() and not entry.name.startswith('.')] if done.is_dir() else []
+    if layout == 'flat':
+        loose = []  # Nothing to partition
+
+    moves = (_plan(completed, vault_path, 'Done', layout, taken, dry_run)
+             + _plan(loose, vault_path, 'Done', layout, taken, dry_run))
+    moved = _move_batches(moves, batch_size, dry_run)
+    result = {'completed': len(completed), 'loose': len(loose), 'moved': moved}
+    logger.info(f"Archive: {result}")
+    return result
+
+
+def migrate(vault_path: Path, layout: str = VAULT_LAYOUT, batch_size: int = ARCHIVE_BATCH_SIZE,
+            dry_run: bool = False) -> Dict[str, int]:
+    """One-shot: move every file in the partitioned folders to where ``layout`` puts it"""
+    vault_path = Path(vault_path)
+    taken: Set[str] = set()
+    result = {}
+    for folder in PARTITIONED_FOLDERS:
+        files = list(iter_files(vault_path / folder))
+        moves = _plan(files, vault_path, folder, layout, taken, dry_run)
+        result[folder] = _move_batches(moves, batch_size, dry_run)
+        if not dry_run:
+            _remove_empty_dirs(vault_path / folder)
+    logger.info(f"Migrated to {layout} layout: {result}")
+    return result
+
+
+def _remove_empty_dirs(root: Path):
+    """Drop partition directories left empty (e.g. after migrating back to flat)"""
+    for directory, _, _ in sorted(os.walk(root), key=lambda entry: -len(entry[0])):
+        if Path(directory) != root:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass  # Not empty
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Partition and archive vault action files')
+    parser.add_argument('command', choices=['archive', 'migrate'])
+    parser.add_argument('--vault', default=os.getenv('VAULT_PATH', str(VAULT_PATH)))
+    parser.add_argument('--layout', default=VAULT_LAYOUT, choices=LAYOUTS)
+    parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument('--dry-run', action='store_true', help='Only log what would move')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(name)s - %(levelname)s - %(message)s')
+    if args.command == 'archive':
+        result = archive(Path(args.vault), args.layout, args.batch_size, dry_run=args.dry_run)
+    else:
+        result = migrate(Path(args.vault), args.layout, args.batch_size, dry_run=args.dry_run)
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
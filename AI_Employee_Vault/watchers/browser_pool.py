@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Browser Pool - One shared headless Chromium for the browser-based watchers
+Part of the AI Employee Silver Tier implementation
+
+WhatsApp and LinkedIn each get their own browser context (isolated cookies
+and storage, persisted to a storage-state file in their session folder)
+inside a single Chromium process. A crashed or closed page is recreated in
+its context without restarting the browser.
+
+Playwright's sync API is bound to the thread that started it, so every call
+into the pool must happen on the same thread (the supervisor gives browser
+watchers one shared worker thread).
+"""
+
+import os
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+
+from playwright.sync_api import sync_playwright, Page
+
+logger = logging.getLogger("BrowserPool")
+
+# Set BROWSER_HEADLESS=false for the first run to scan the QR code / log in
+HEADLESS = os.getenv('BROWSER_HEADLESS', 'true').lower() == 'true'
+BROWSER_ARGS = ['--no-sandbox', '--disable-dev-shm-usage']
+# Use a specific Chromium build instead of Playwright's (e.g. a system Chrome)
+EXECUTABLE = os.getenv('BROWSER_EXECUTABLE') or None
+METRICS_INTERVAL = 60  # seconds between memory samples
+READY_TIMEOUT = 60000  # ms to wait for a page's ready selector
+
+
+class _Slot:
+    """A named context and its page"""
+
+    def __init__(self, name: str, context, storage_state: Optional[Path]):
+        self.name = name
+        self.context = context
+        self.storage_state = storage_state
+        self.page: Optional[Page] = None
+        self.crashed = False
+        self.restarts = 0
+
+
+class BrowserPool:
+    """Hands out long-lived pages from one shared Chromium instance"""
+
+    def __init__(self, headless: bool = HEADLESS, executable: Optional[str] = EXECUTABLE):
+        self.headless = headless
+        self.executable = executable
+        self.playwright = None
+        self.browser = None
+        self.slots: Dict[str, _Slot] = {}
+        self.stats: Dict = {'contexts': 0, 'pages': 0, 'page_restarts': 0, 'browser_restarts': 0,
+                            'browser_rss_bytes': None, 'js_heap_bytes': {}}
+        self._earlier_page_restarts = 0  # From slots dropped with a crashed browser
+        self._last_sample = 0.0
+
+    def start(self):
+        """Launch Chromium (no-op if already running)"""
+        if self.browser and self.browser.is_connected():
+            return
+        if self.playwright is None:
+            self.playwright = sync_playwright().start()
+        if self.browser is not None:
+            # The browser died (Playwright notices on the first failed call); its contexts went with it
+            self.stats['browser_restarts'] += 1
+            self._earlier_page_restarts += sum(slot.restarts for slot in self.slots.values())
+            logger.warning(f"Chromium disconnected; relaunching (restart #{self.stats['browser_restarts']})")
+        self.browser = self.playwright.chromium.launch(headless=self.headless, args=BROWSER_ARGS,
+                                                       executable_path=self.executable)
+        self.slots.clear()
+        logger.info(f"Launched shared Chromium (headless={self.headless})")
+
+    def get_page(self, name: str, url: str, ready_selector: Optional[str] = None,
+                 storage_state: Optional[Path] = None) -> Page:
+        """
+        Return the live page for ``name``, creating or restarting it if needed
+        New pages navigate to ``url`` and wait for ``ready_selector``.
+        """
+        self.start()
+
+        slot = self.slots.get(name)
+        if slot is None:
+            state = str(storage_state) if storage_state and storage_state.exists() else None
+            context = self.browser.new_context(storage_state=state)
+            slot = _Slot(name, context, storage_state)
+            self.slots[name] = slot
+
+        if slot.page is None or slot.page.is_closed() or slot.crashed:
+            if slot.page is not None:
+                slot.restarts += 1
+                logger.warning(f"Restarting {name} page (restart #{slot.restarts})")
+                if not slot.page.is_closed():
+                    slot.page.close()
+            slot.page = self._open_page(slot, url, ready_selector)
+
+        self._sample_metrics()
+        return slot.page
+
+    def _open_page(self, slot: _Slot, url: str, ready_selector: Optional[str]) -> Page:
+        """Open and load a fresh page in the slot's context"""
+        slot.crashed = False
+        page = slot.context.new_page()
+
+        def on_crash(_page):
+            logger.error(f"{slot.name} page crashed")
+            slot.crashed = True
+
+        page.on('crash', on_crash)
+        page.goto(url)
+        if ready_selector:
+            page.wait_for_selector(ready_selector, timeout=READY_TIMEOUT)
+        self.save_session(slot.name)
+        return page
+
+    def restart_page(self, name: str):
+        """Force the next get_page call to open a fresh page"""
+        slot = self.slots.get(name)
+        if slot:
+            slot.crashed = True
+
+    def save_session(self, name: str):
+        """Persist cookies/local storage (and IndexedDB when supported) for a context"""
+        slot = self.slots.get(name)
+        if not slot or not slot.storage_state:
+            return
+        slot.storage_state.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # WhatsApp Web keeps its session in IndexedDB (Playwright >= 1.51)
+            slot.context.storage_state(path=str(slot.storage_state), indexed_db=True)
+        except TypeError:
+            slot.context.storage_state(path=str(slot.storage_state))
+
+    def _sample_metrics(self):
+        """Refresh page counts and memory figures at most every METRICS_INTERVAL"""
+        now = time.monotonic()
+        self.stats['contexts'] = len(self.slots)
+        self.stats['pages'] = sum(len(slot.context.pages) for slot in self.slots.values())
+        self.stats['page_restarts'] = self._earlier_page_restarts + sum(
+            slot.restarts for slot in self.slots.values())
+        if now - self._last_sample < METRICS_INTERVAL:
+            return
+        self._last_sample = now
+
+        self.stats['browser_rss_bytes'] = _descendant_rss()
+        heap = {}
+        for name, slot in self.slots.items():
+            if slot.page is None or slot.page.is_closed():
+                continue
+            try:
+                cdp = slot.context.new_cdp_session(slot.page)
+                cdp.send('Performance.enable')
+                metrics = cdp.send('Performance.getMetrics')['metrics']
+                cdp.detach()
+                heap[name] = next((m['value'] for m in metrics if m['name'] == 'JSHeapUsedSize'), None)
+            except Exception as e:
+                logger.debug(f"Could not sample {name} heap: {e}")
+        self.stats['js_heap_bytes'] = heap
+
+    def metrics(self) -> Dict:
+        """Last sampled pool metrics (safe to read from any thread)"""
+        return dict(self.stats)
+
+    def close(self):
+        """Save sessions and shut the browser down"""
+        for name in list(self.slots):
+            try:
+                self.save_session(name)
+            except Exception as e:
+                logger.error(f"Error saving {name} session: {e}")
+        if self.browser:
+            self.browser.close()
+            self.browser = None
+        if self.playwright:
+            self.playwright.stop()
+            self.playwright = None
+        self.slots.clear()
+
+
+def _descendant_rss() -> Optional[int]:
+    """Total RSS of this process's descendants (Playwright driver + Chromium), Linux only"""
+    proc = Path('/proc')
+    if not proc.exists():
+        return None
+
+    children: Dict[int, list] = {}
+    rss: Dict[int, int] = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            status = (entry / 'status').read_text()
+        except OSError:
+            continue
+        fields = dict(line.split(':', 1) for line in status.splitlines() if ':' in line)
+        ppid = int(fields.get('PPid', '0').strip())
+        children.setdefault(ppid, []).append(int(entry.name))
+        rss[int(entry.name)] = int(fields.get('VmRSS', '0 kB').split()[0]) * 1024
+
+    total = 0
+    stack = list(children.get(os.getpid(), []))
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total
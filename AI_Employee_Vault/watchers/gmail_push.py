@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Gmail Push - Pub/Sub push notifications for the Gmail watcher
+Part of the AI Employee Silver Tier implementation
+
+users.watch() asks Gmail to publish a notification to a Cloud Pub/Sub topic
+whenever the mailbox changes. A push subscription on that topic POSTs each
+notification to PushReceiver, a small local HTTP endpoint; the Gmail watcher
+then runs its incremental history sync straight away instead of waiting for
+the next poll. Polling keeps running at the normal interval as a safety net.
+
+Pub/Sub only pushes to public HTTPS endpoints, so expose the receiver through
+a tunnel or reverse proxy and give the subscription a URL like
+https://<host>/gmail/push?token=<GMAIL_PUSH_TOKEN>.
+
+The ``send`` command is a fake Pub/Sub publisher for local testing.
+
+Usage:
+    python gmail_push.py serve                      # Run the receiver and print notifications
+    python gmail_push.py send --history-id 12345    # POST one notification to the receiver
+"""
+
+import os
+import sys
+import hmac
+import json
+import time
+import base64
+import logging
+import argparse
+import threading
+import urllib.request
+from pathlib import Path
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from metrics import API_SECONDS, REGISTRY
+
+# Configuration
+PUSH_HOST = os.getenv('GMAIL_PUSH_HOST', '127.0.0.1')
+PUSH_PORT = int(os.getenv('GMAIL_PUSH_PORT', '8085'))
+PUSH_PATH = '/gmail/push'
+# Shared secret expected as ?token= on the push URL (empty accepts any request)
+PUSH_TOKEN = os.getenv('GMAIL_PUSH_TOKEN', '')
+# Pub/Sub topic for users.watch, e.g. projects/my-project/topics/gmail
+WATCH_TOPIC = os.getenv('GMAIL_PUSH_TOPIC', '')
+WATCH_LABELS = ['INBOX']
+WATCH_RENEW_INTERVAL = 24 * 3600  # Google recommends renewing daily (a watch lasts 7 days)
+MAX_BODY_BYTES = 64 * 1024
+
+logger = logging.getLogger("GmailPush")
+
+NOTIFICATIONS_TOTAL = REGISTRY.counter('gmail_push_notifications_total',
+                                       'Pub/Sub push notifications received', ['result'])
+
+
+def encode_notification(email: str, history_id: str, message_id: Optional[str] = None,
+                        subscription: str = 'projects/local/subscriptions/gmail-push') -> Dict:
+    """Pub/Sub push envelope for a Gmail notification (what Pub/Sub would POST)"""
+    data = json.dumps({'emailAddress': email, 'historyId': int(history_id)}).encode('utf-8')
+    return {
+        'message': {
+            'data': base64.b64encode(data).decode('ascii'),
+            'messageId': message_id or str(time.time_ns()),
+            'publishTime': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+        },
+        'subscription': subscription,
+    }
+
+
+def decode_notification(body: bytes) -> Dict:
+    """Gmail notification ({emailAddress, historyId}) from a push body; raises ValueError"""
+    try:
+        envelope = json.loads(body)
+        data = json.loads(base64.b64decode(envelope['message']['data']))
+        return {'emailAddress': data['emailAddress'], 'historyId': str(data['historyId'])}
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Not a Gmail push notification: {e}") from e
+
+
+class _PushHandler(BaseHTTPRequestHandler):
+    receiver: "PushReceiver" = None  # Set per server by PushReceiver.start()
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != PUSH_PATH:
+            self.send_error(404)
+            return
+        token = parse_qs(url.query).get('token', [''])[0]
+        if self.receiver.token and not hmac.compare_digest(token, self.receiver.token):
+            NOTIFICATIONS_TOTAL.inc(result='forbidden')
+            self.send_error(403)
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            self.send_error(413)
+            return
+        try:
+            notification = decode_notification(self.rfile.read(length))
+        except ValueError as e:
+            # A 4xx would make Pub/Sub redeliver a message that can never parse; ack it instead
+            logger.warning(f"Ignoring push message: {e}")
+            NOTIFICATIONS_TOTAL.inc(result='invalid')
+            self.send_response(204)
+            self.end_headers()
+            return
+        self.receiver.notify(notification['historyId'])
+        NOTIFICATIONS_TOTAL.inc(result='accepted')
+        self.send_response(204)  # Any 2xx acknowledges the message
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass  # Notifications are logged by the watcher
+
+
+class PushReceiver:
+    """Local endpoint for Pub/Sub push requests; remembers the newest history ID"""
+
+    def __init__(self, host: str = PUSH_HOST, port: int = PUSH_PORT, token: str = PUSH_TOKEN):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.received = 0
+        self._history_id: Optional[str] = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}{PUSH_PATH}"
+
+    def start(self):
+        handler = type('PushHandler', (_PushHandler,), {'receiver': self})
+        self.server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]  # Resolves port 0
+        threading.Thread(target=self.server.serve_forever, name="gmail-push", daemon=True).start()
+        logger.info(f"Listening for Gmail push notifications on {self.url}")
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def notify(self, history_id: str):
+        with self._lock:
+            self.received += 1
+            if self._history_id is None or int(history_id) > int(self._history_id):
+                self._history_id = history_id
+        self._event.set()
+
+    def take(self) -> Optional[str]:
+        """Newest history ID notified since the last call, or None"""
+        with self._lock:
+            history_id, self._history_id = self._history_id, None
+            self._event.clear()
+        return history_id
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until a notification arrives (True) or the timeout passes (False)"""
+        return self._event.wait(timeout)
+
+
+def register_watch(service, topic: str = WATCH_TOPIC, label_ids=WATCH_LABELS) -> Dict:
+    """Start (or renew) Gmail notifications to ``topic``; returns {historyId, expiration}"""
+    body = {'topicName': topic, 'labelIds': list(label_ids), 'labelFilterBehavior': 'include'}
+    with API_SECONDS.time(watcher='gmail', call='users.watch'):
+        response = service.users().watch(userId='me', body=body).execute()
+    expires = datetime.fromtimestamp(int(response['expiration']) / 1000)
+    logger.info(f"Gmail watch registered on {topic} (history ID {response['historyId']}, "
+                f"expires {expires:%Y-%m-%d %H:%M})")
+    return response
+
+
+def send_notification(url: str, email: str, history_id: str, token: str = PUSH_TOKEN,
+                      timeout: float = 5) -> int:
+    """Fake Pub/Sub: POST one push notification to ``url``; returns the HTTP status"""
+    if token:
+        url = f"{url}{'&' if '?' in url else '?'}token={token}"
+    body = json.dumps(encode_notification(email, history_id)).encode('utf-8')
+    request = urllib.request.Request(url, data=body, method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.status
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gmail push receiver and fake Pub/Sub sender')
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve', help='Run the receiver and print notifications')
+    serve.add_argument('--host', default=PUSH_HOST)
+    serve.add_argument('--port', type=int, default=PUSH_PORT)
+    send = sub.add_parser('send', help='POST a fake Pub/Sub push notification')
+    send.add_argument('--url', default=f"http://{PUSH_HOST}:{PUSH_PORT}{PUSH_PATH}")
+    send.add_argument('--email', default='me@example.com')
+    send.add_argument('--history-id', default=str(int(time.time())))
+    send.add_argument('--count', type=int, default=1, help='Notifications to send (history ID +1 each)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(name)s - %(levelname)s - %(message)s')
+    if args.command == 'serve':
+        receiver = PushReceiver(args.host, args.port)
+        receiver.start()
+        try:
+            while True:
+                if receiver.wait(1):
+                    print(f"Notification: history ID {receiver.take()}")
+        except KeyboardInterrupt:
+            receiver.stop()
+    else:
+        for n in range(args.count):
+            history_id = str(int(args.history_id) + n)
+            status = send_notification(args.url, args.email, history_id)
+            print(f"Sent history ID {history_id}: HTTP {status}")
+
+
+if __name__ == "__main__":
+    main()
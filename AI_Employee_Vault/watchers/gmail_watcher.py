@@ -10,15 +10,27 @@ import time
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Set
+from typing import List, Dict, Optional
 import json
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dedup_store import DedupStore
+from vault_io import atomic_write_json, atomic_write_text
+from logging_setup import setup_logging, log_cycle
+from metrics import (API_SECONDS, WRITE_SECONDS, DEDUP_ENTRIES, SNAPSHOT_INTERVAL,
+                     record_cycle, write_snapshot)
+from vault_layout import partition_dir
+from scheduler import RateLimited, retry_after_of, schedule_for
+from classifier import load_classifier
+from gmail_push import PushReceiver, WATCH_TOPIC, WATCH_RENEW_INTERVAL, register_watch
+
 # Gmail API imports
 try:
     from google.oauth2.credentials import Credentials
     from google_auth_oauthlib.flow import InstalledAppFlow
     from google.auth.transport.requests import Request
     from googleapiclient.discovery import build
+    from googleapiclient.errors import HttpError
     import pickle
 except ImportError:
     print("Error: Gmail API libraries not installed.")
@@ -32,56 +44,86 @@ CREDENTIALS_PATH = Path(__file__).parent / "credentials" / "gmail_credentials.js
 TOKEN_PATH = Path(__file__).parent / "credentials" / "gmail_token.pickle"
 CHECK_INTERVAL = 120  # seconds (2 minutes)
 SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
+METADATA_HEADERS = ['From', 'Subject', 'Date']  # Only the headers we render
+BATCH_SIZE = 50  # Gmail recommends at most 50 calls per batch request
+QUERY = 'is:unread is:important'
+REQUIRED_LABELS = {'UNREAD', 'IMPORTANT'}  # history.list equivalent of QUERY
+PAGE_SIZE = 500  # Maximum page size for messages.list and history.list
+GONE_STATUSES = {404, 410}  # Message deleted since it was listed: nothing left to fetch
+# 'history' syncs incrementally via users.history.list, 'poll' re-lists every cycle
+SYNC_MODE = os.getenv('GMAIL_SYNC_MODE', 'history')
+# Optional discovery document override (e.g. a local fake Gmail service)
+DISCOVERY_URL = os.getenv('GMAIL_DISCOVERY_URL')
+# Sync as soon as a Pub/Sub push notification arrives (see gmail_push.py);
+# check_interval then only paces the fallback poll
+PUSH_ENABLED = os.getenv('GMAIL_PUSH', 'false').lower() == 'true'
+PUSH_PUMP_INTERVAL = 1  # seconds between checks for received notifications
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(VAULT_PATH / "Logs" / "gmail_watcher.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("GmailWatcher")
 
 
+def build_service(creds, discovery_url: Optional[str] = DISCOVERY_URL):
+    """Gmail API client, from the discovery document at ``discovery_url`` when one is set"""
+    if discovery_url:
+        return build('gmail', 'v1', credentials=creds, discoveryServiceUrl=discovery_url,
+                     static_discovery=False, cache_discovery=False)
+    return build('gmail', 'v1', credentials=creds)
+
+
 class GmailWatcher:
     """Watches Gmail for important unread messages and creates action items"""
 
-    def __init__(self, vault_path: Path, check_interval: int = 120):
+    def __init__(self, vault_path: Path, check_interval: int = 120, service=None,
+                 sync_mode: str = SYNC_MODE, push: bool = PUSH_ENABLED,
+                 receiver: Optional[PushReceiver] = None):
         self.vault_path = vault_path
         self.needs_action = vault_path / "Needs_Action"
-        self.check_interval = check_interval
-        self.processed_ids: Set[str] = set()
-        self.service = None
+        self.push = push
+        self.fallback_interval = check_interval
+        self.check_interval = PUSH_PUMP_INTERVAL if push else check_interval
+        if push:
+            # Checking for notifications is local; keep it steady instead of adaptive
+            self.min_interval = self.max_interval = PUSH_PUMP_INTERVAL
+        self.receiver = receiver
+        self._last_sync = float('-inf')
+        self._watch_renewed = float('-inf')
+        self.service = service
+        self.classifier = load_classifier(vault_path)
+        self.sync_mode = sync_mode
+        self.history_id: Optional[str] = None
+        self._next_history_id: Optional[str] = None
+        self._retry_after: Optional[float] = None  # Set when a batch was rate limited
+        self._unfetched = 0  # Messages whose fetch failed transiently this cycle
 
         # Ensure directories exist
         self.needs_action.mkdir(parents=True, exist_ok=True)
         (vault_path / "Logs").mkdir(parents=True, exist_ok=True)
 
-        # Load processed IDs from state file
+        # Processed IDs live in an append-only dedup log, the history ID in state
         self.state_file = vault_path / "Logs" / "gmail_watcher_state.json"
+        self.processed_ids = DedupStore(vault_path / "Logs" / "gmail_watcher_seen.log")
+        self.processed_ids.migrate_from_json(self.state_file, 'processed_ids')
         self._load_state()
 
     def _load_state(self):
-        """Load previously processed message IDs"""
+        """Load the last synced mailbox history ID"""
         if self.state_file.exists():
             try:
                 with open(self.state_file, 'r') as f:
                     state = json.load(f)
-                    self.processed_ids = set(state.get('processed_ids', []))
-                logger.info(f"Loaded {len(self.processed_ids)} processed message IDs")
+                    self.history_id = state.get('history_id')
+                logger.info(f"Loaded state (history ID {self.history_id}, "
+                            f"{len(self.processed_ids)} processed message IDs)")
             except Exception as e:
                 logger.error(f"Error loading state: {e}")
 
     def _save_state(self):
-        """Save processed message IDs"""
+        """Save the mailbox history ID"""
         try:
-            with open(self.state_file, 'w') as f:
-                json.dump({
-                    'processed_ids': list(self.processed_ids),
-                    'last_updated': datetime.now().isoformat()
-                }, f, indent=2)
+            atomic_write_json(self.state_file, {
+                'history_id': self.history_id,
+                'last_updated': datetime.now().isoformat()
+            })
         except Exception as e:
             logger.error(f"Error saving state: {e}")
 
@@ -113,20 +155,23 @@ class GmailWatcher:
             with open(TOKEN_PATH, 'wb') as token:
                 pickle.dump(creds, token)
 
-        self.service = build('gmail', 'v1', credentials=creds)
+        self.service = build_service(creds)
         logger.info("Gmail authentication successful")
 
     def check_for_updates(self) -> List[Dict]:
         """Check for new important unread messages"""
         try:
-            # Query for unread important messages
-            results = self.service.users().messages().list(
-                userId='me',
-                q='is:unread is:important',
-                maxResults=10
-            ).execute()
-
-            messages = results.get('messages', [])
+            if self.sync_mode == 'history' and self.history_id:
+                try:
+                    messages = self._incremental_sync()
+                except HttpError as e:
+                    if e.resp.status != 404:
+                        raise
+                    # startHistoryId is too old (Gmail keeps about a week)
+                    logger.warning(f"History ID {self.history_id} expired, running full resync")
+                    messages = self._full_sync()
+            else:
+                messages = self._full_sync()
 
             # Filter out already processed messages
             new_messages = [
@@ -139,17 +184,129 @@ class GmailWatcher:
 
         except Exception as e:
             logger.error(f"Error checking Gmail: {e}")
-            return []
+            raise
+
+    def _full_sync(self) -> List[Dict]:
+        """List every message matching QUERY, following all result pages"""
+        # Read the history ID first so nothing arriving during the listing is missed
+        if self.sync_mode == 'history':
+            with API_SECONDS.time(watcher='gmail', call='users.getProfile'):
+                profile = self.service.users().getProfile(userId='me').execute()
+            self._next_history_id = profile['historyId']
+
+        messages = []
+        page_token = None
+        while True:
+            with API_SECONDS.time(watcher='gmail', call='messages.list'):
+                results = self.service.users().messages().list(
+                    userId='me',
+                    q=QUERY,
+                    maxResults=PAGE_SIZE,
+                    pageToken=page_token
+                ).execute()
+            messages.extend(results.get('messages', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+
+        return messages
+
+    def _incremental_sync(self) -> List[Dict]:
+        """Fetch only messages added (or newly labelled) since the stored history ID"""
+        found: Dict[str, Dict] = {}
+        page_token = None
+        while True:
+            with API_SECONDS.time(watcher='gmail', call='history.list'):
+                results = self.service.users().history().list(
+                    userId='me',
+                    startHistoryId=self.history_id,
+                    historyTypes=['messageAdded', 'labelAdded'],
+                    maxResults=PAGE_SIZE,
+                    pageToken=page_token
+                ).execute()
+
+            for record in results.get('history', []):
+                changes = record.get('messagesAdded', []) + record.get('labelsAdded', [])
+                for change in changes:
+                    message = change['message']
+                    if REQUIRED_LABELS.issubset(message.get('labelIds', [])):
+                        found[message['id']] = {'id': message['id'], 'threadId': message.get('threadId')}
+
+            self._next_history_id = results.get('historyId', self._next_history_id)
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+
+        return list(found.values())
+
+    def commit_history(self):
+        """Advance the stored history ID once this cycle's messages are handled"""
+        if self._next_history_id and self._next_history_id != self.history_id:
+            self.history_id = self._next_history_id
+            self._save_state()
+
+    def _metadata_request(self, message_id: str):
+        """Build a metadata-only get request for a single message"""
+        return self.service.users().messages().get(
+            userId='me',
+            id=message_id,
+            format='metadata',
+            metadataHeaders=METADATA_HEADERS
+        )
+
+    def fetch_messages(self, messages: List[Dict]) -> List[Dict]:
+        """Fetch message metadata in batch requests (one round trip per BATCH_SIZE)"""
+        fetched: Dict[str, Dict] = {}
+        gone = set()
+        self._retry_after = None
+
+        def on_response(request_id, response, exception):
+            if exception is None:
+                fetched[request_id] = response
+                return
+            status = getattr(getattr(exception, 'resp', None), 'status', None)
+            wait = retry_after_of(exception)
+            if wait is not None:
+                self._retry_after = max(self._retry_after or 0.0, wait)
+            elif status in GONE_STATUSES:
+                logger.info(f"Message {request_id} no longer exists, skipping")
+                gone.add(request_id)
+            elif status is not None and status < 500:
+                # Permanent: retrying the same history window would fail the same way
+                logger.error(f"Error fetching message {request_id}, skipping: {exception}")
+                gone.add(request_id)
+            else:
+                logger.error(f"Error fetching message {request_id}: {exception}")
+
+        for start in range(0, len(messages), BATCH_SIZE):
+            if self._retry_after is not None:
+                break  # Rate limited; the rest is fetched on the next cycle
+            chunk = messages[start:start + BATCH_SIZE]
+            batch = self.service.new_batch_http_request(callback=on_response)
+            for message in chunk:
+                batch.add(self._metadata_request(message['id']), request_id=message['id'])
+            try:
+                with API_SECONDS.time(watcher='gmail', call='batch.messages.get'):
+                    batch.execute()
+            except Exception as e:
+                logger.error(f"Error executing batch request: {e}")
+                wait = retry_after_of(e)
+                if wait is not None:
+                    self._retry_after = max(self._retry_after or 0.0, wait)
+
+        # Transient failures (429/5xx/network, or never sent) keep the history window open
+        self._unfetched = sum(1 for m in messages if m['id'] not in fetched and m['id'] not in gone)
+        # Preserve listing order; skip messages whose fetch failed
+        return [fetched[m['id']] for m in messages if m['id'] in fetched]
 
     def create_action_file(self, message: Dict) -> Path:
         """Create action file for a new message"""
         try:
-            # Get full message details
-            msg = self.service.users().messages().get(
-                userId='me',
-                id=message['id'],
-                format='full'
-            ).execute()
+            # Messages from fetch_messages already carry their metadata
+            msg = message
+            if 'payload' not in msg:
+                with API_SECONDS.time(watcher='gmail', call='messages.get'):
+                    msg = self._metadata_request(message['id']).execute()
 
             # Extract headers
             headers = {
@@ -164,6 +321,9 @@ class GmailWatcher:
             # Get message snippet
             snippet = msg.get('snippet', '')
 
+            # Important mail starts at high; urgent keywords raise it further
+            priority = self.classifier.classify(f"{subject}\n{snippet}", default='high').priority
+
             # Create action file
             content = f"""---
 type: email
@@ -171,7 +331,7 @@ from: {from_email}
 subject: {subject}
 received: {datetime.now().isoformat()}
 gmail_id: {message['id']}
-priority: high
+priority: {priority}
 status: pending
 ---
 
@@ -201,14 +361,14 @@ status: pending
             # Create filename
             safe_subject = "".join(c for c in subject if c.isalnum() or c in (' ', '-', '_'))[:50]
             filename = f"EMAIL_{safe_subject}_{message['id'][:8]}.md"
-            filepath = self.needs_action / filename
+            filepath = partition_dir(self.vault_path, 'Needs_Action') / filename
 
             # Write file
-            filepath.write_text(content, encoding='utf-8')
+            with WRITE_SECONDS.time(watcher='gmail'):
+                atomic_write_text(filepath, content)
 
             # Mark as processed
             self.processed_ids.add(message['id'])
-            self._save_state()
 
             logger.info(f"Created action file: {filename}")
             return filepath
@@ -217,36 +377,110 @@ status: pending
             logger.error(f"Error creating action file: {e}")
             return None
 
+    def setup(self):
+        """Authenticate before the first poll (skipped when a service was injected)"""
+        if self.service is None:
+            self.authenticate()
+        if self.push:
+            if self.receiver is None:
+                self.receiver = PushReceiver()
+            if self.receiver.server is None:
+                self.receiver.start()
+            self.renew_watch()
+
+    def renew_watch(self):
+        """Register users.watch on WATCH_TOPIC (again once a day); polling covers failures"""
+        if not WATCH_TOPIC:
+            return  # Notifications come from a watch registered elsewhere (or a fake sender)
+        if time.monotonic() - self._watch_renewed < WATCH_RENEW_INTERVAL:
+            return
+        try:
+            register_watch(self.service, WATCH_TOPIC)
+            self._watch_renewed = time.monotonic()
+        except Exception as e:
+            logger.error(f"Could not register Gmail watch, relying on polling: {e}")
+
+    def _sync_due(self) -> bool:
+        """In push mode: sync on a notification newer than our history ID, or when polling is due"""
+        notified = self.receiver.take()
+        if time.monotonic() - self._last_sync >= self.fallback_interval:
+            return True
+        if notified is None:
+            return False
+        if self.sync_mode == 'history' and self.history_id and int(notified) <= int(self.history_id):
+            return False  # Already synced past this change
+        logger.info(f"Push notification (history ID {notified}), syncing now")
+        return True
+
+    def teardown(self):
+        """Stop the push receiver and flush any group-committed state"""
+        if self.receiver is not None:
+            self.receiver.stop()
+        self.processed_ids.commit()
+
+    def poll_once(self) -> int:
+        """Run a single sync cycle and return the number of action files created"""
+        if self.push:
+            self.renew_watch()
+            if not self._sync_due():
+                return 0
+        self._last_sync = time.monotonic()
+
+        # Check for new messages
+        messages = self.check_for_updates()
+
+        # Create action files (metadata fetched in one batch per poll)
+        fetched = self.fetch_messages(messages)
+        created = [self.create_action_file(msg) for msg in fetched]
+        self.processed_ids.commit()
+        DEDUP_ENTRIES.set(len(self.processed_ids), watcher='gmail')
+
+        # Only move past this history window once every message landed or is gone
+        # for good; otherwise the next cycle replays it (processed_ids dedups)
+        if not self._unfetched and all(created):
+            self.commit_history()
+
+        if self._retry_after is not None:
+            # Back off before the remaining messages are fetched
+            raise RateLimited(f"Gmail rate limited after {len(fetched)} of {len(messages)} messages",
+                              self._retry_after)
+        return sum(1 for path in created if path)
+
     def run(self):
         """Main watcher loop"""
-        logger.info(f"Starting Gmail Watcher (checking every {self.check_interval}s)")
+        logger.info(f"Starting Gmail Watcher (checking every {self.fallback_interval}s"
+                    f"{', plus push notifications' if self.push else ''})")
         logger.info(f"Vault path: {self.vault_path}")
 
         # Authenticate
-        self.authenticate()
+        self.setup()
 
+        schedule = schedule_for(self, 'gmail', self.vault_path)
         while True:
+            started = time.monotonic()
             try:
-                # Check for new messages
-                messages = self.check_for_updates()
-
-                # Create action files
-                for msg in messages:
-                    self.create_action_file(msg)
+                items = self.poll_once()
+                record_cycle('gmail', items, time.monotonic() - started)
+                log_cycle(logger, "gmail", items, started)
+                write_snapshot(self.vault_path / "Logs" / "metrics_gmail.prom", SNAPSHOT_INTERVAL)
 
-                # Wait before next check
-                time.sleep(self.check_interval)
+                # Wait before next check (shorter while busy, longer while idle)
+                time.sleep(schedule.next_delay(items))
 
             except KeyboardInterrupt:
                 logger.info("Gmail Watcher stopped by user")
                 break
             except Exception as e:
-                logger.error(f"Error in main loop: {e}")
-                time.sleep(self.check_interval)
+                record_cycle('gmail', 0, time.monotonic() - started, error=True)
+                log_cycle(logger, "gmail", 0, started, error=e)
+                time.sleep(schedule.next_delay(error=e))
+
+        self.teardown()
 
 
 def main():
     """Entry point"""
+    setup_logging('gmail_watcher', VAULT_PATH)
     watcher = GmailWatcher(VAULT_PATH, CHECK_INTERVAL)
     watcher.run()
 
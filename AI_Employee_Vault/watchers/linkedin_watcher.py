@@ -5,137 +5,203 @@ Part of the AI Employee Silver Tier implementation
 """
 
 import os
+import re
 import sys
 import time
 import logging
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Dict, Set
-import json
+import hashlib
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dedup_store import DedupStore
+from vault_io import atomic_write_text
+from logging_setup import setup_logging, log_cycle
+from metrics import (API_SECONDS, WRITE_SECONDS, DEDUP_ENTRIES, SNAPSHOT_INTERVAL,
+                     record_cycle, write_snapshot)
+from vault_layout import partition_dir
+from scheduler import schedule_for
+from vault_index import VaultIndex
+from dashboard import posted_today, LINKEDIN_POST_EVENT
 
 # Playwright imports
 try:
-    from playwright.sync_api import sync_playwright, Browser, Page
+    from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
+    from browser_pool import BrowserPool
 except ImportError:
     print("Error: Playwright not installed.")
     print("Install with: pip install playwright && playwright install chromium")
     sys.exit(1)
 
 # Configuration
-VAULT_PATH = Path(__file__).parent.parent / "AI_Employee_Vault"
+VAULT_PATH = Path(__file__).parent.parent  # watchers/ -> AI_Employee_Vault/
 NEEDS_ACTION = VAULT_PATH / "Needs_Action"
 SESSION_PATH = Path(__file__).parent / "sessions" / "linkedin"
 CHECK_INTERVAL = 300  # seconds (5 minutes)
+# Override to point the watcher at a local fixture page (e.g. file:///...)
+LINKEDIN_URL = os.getenv('LINKEDIN_URL', 'https://www.linkedin.com')
+NAV_SEARCH_SELECTOR = '[data-test-global-nav-search]'
+MESSAGING_URL = os.getenv('LINKEDIN_MESSAGING_URL', 'https://www.linkedin.com/messaging/')
+CONVERSATION_LIST_SELECTOR = '.msg-conversations-container__conversations-list'
+# Clicking Messaging in the global nav re-fetches the conversation list in place
+MESSAGING_NAV_SELECTOR = '.global-nav__primary-link[href*="/messaging/"]'
+REFRESH_SETTLE_MS = 3000  # wait this long for the list to change after a refresh
+RELOAD_INTERVAL = int(os.getenv('LINKEDIN_RELOAD_INTERVAL', '1800'))  # seconds between full reloads
+# Message IDs used to be "<name>_<YYYYMMDD>"; recent ones seed the thread-based IDs
+LEGACY_ID_PATTERN = re.compile(r'^(?P<name>.+)_(?P<date>\d{8})$')
+LEGACY_SEED_DAYS = 7
+# Publishing approved posts (approval_executor.py) from the feed's share box
+FEED_URL = os.getenv('LINKEDIN_FEED_URL', 'https://www.linkedin.com/feed/')
+SHARE_BOX_SELECTOR = 'button.share-box-feed-entry__trigger'
+POST_EDITOR_SELECTOR = 'div.ql-editor[contenteditable="true"]'
+POST_SUBMIT_SELECTOR = 'button.share-actions__primary-action'
+PUBLISH_TIMEOUT = 30000  # ms
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(VAULT_PATH / "Logs" / "linkedin_watcher.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("LinkedInWatcher")
 
+# Flags the first change to the conversation list (or its replacement) so a
+# refresh can wait for LinkedIn to re-render instead of reading the old list
+ARM_REFRESH_JS = """
+(listSelector) => {
+    const list = document.querySelector(listSelector);
+    if (window.__aiEmployeeRefresh) window.__aiEmployeeRefresh.observer.disconnect();
+    const state = {list, changed: false, observer: new MutationObserver(() => { state.changed = true; })};
+    if (list) state.observer.observe(list, {childList: true, subtree: true, characterData: true});
+    window.__aiEmployeeRefresh = state;
+}
+"""
+REFRESHED_JS = """
+(listSelector) => {
+    const state = window.__aiEmployeeRefresh;
+    return !state || state.changed || document.querySelector(listSelector) !== state.list;
+}
+"""
+
+# Returns every unread conversation (name, snippet, thread ID) in one round trip
+EXTRACT_CONVERSATIONS_JS = """
+(listSelector) => {
+    const text = (root, selector) => {
+        const elem = root.querySelector(selector);
+        return elem ? elem.innerText.trim() : '';
+    };
+    return Array.from(document.querySelectorAll('.msg-conversation-listitem--unread')).map(item => {
+        const link = item.querySelector('a[href*="/messaging/thread/"]');
+        const match = link ? link.getAttribute('href').match(/\\/messaging\\/thread\\/([^/?#]+)/) : null;
+        return {
+            name: text(item, '.msg-conversation-listitem__participant-names') || 'Unknown',
+            snippet: text(item, '.msg-conversation-listitem__message-snippet'),
+            thread_id: match ? decodeURIComponent(match[1]) : null
+        };
+    });
+}
+"""
+
 
 class LinkedInWatcher:
     """Watches LinkedIn for messages and engagement opportunities"""
 
-    def __init__(self, vault_path: Path, session_path: Path, check_interval: int = 300):
+    def __init__(self, vault_path: Path, session_path: Path, check_interval: int = 300,
+                 pool: "BrowserPool" = None, index: VaultIndex = None):
         self.vault_path = vault_path
         self.needs_action = vault_path / "Needs_Action"
         self.session_path = session_path
         self.check_interval = check_interval
-        self.processed_messages: Set[str] = set()
+        self.pool = pool
+        self._owns_pool = pool is None
+        self.page = None
+        self._owns_index = index is None
+        self.index = index  # Opened in setup() when not shared by the supervisor
 
         # Ensure directories exist
         self.needs_action.mkdir(parents=True, exist_ok=True)
         (vault_path / "Logs").mkdir(parents=True, exist_ok=True)
         self.session_path.mkdir(parents=True, exist_ok=True)
 
-        # Load state
+        # Processed IDs live in an append-only dedup log (migrated from the old JSON set)
         self.state_file = vault_path / "Logs" / "linkedin_watcher_state.json"
-        self._load_state()
-
-    def _load_state(self):
-        """Load previously processed message IDs"""
-        if self.state_file.exists():
-            try:
-                with open(self.state_file, 'r') as f:
-                    state = json.load(f)
-                    self.processed_messages = set(state.get('processed_messages', []))
-                logger.info(f"Loaded {len(self.processed_messages)} processed messages")
-            except Exception as e:
-                logger.error(f"Error loading state: {e}")
-
-    def _save_state(self):
-        """Save processed message IDs"""
-        try:
-            with open(self.state_file, 'w') as f:
-                json.dump({
-                    'processed_messages': list(self.processed_messages),
-                    'last_updated': datetime.now().isoformat()
-                }, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving state: {e}")
+        self.processed_messages = DedupStore(vault_path / "Logs" / "linkedin_watcher_seen.log")
+        self.processed_messages.migrate_from_json(self.state_file, 'processed_messages')
+        self._legacy_names = legacy_names(self.processed_messages)
+        self._last_reload = 0.0
 
     def check_for_messages(self, page: Page) -> List[Dict]:
         """Check for new LinkedIn messages"""
         try:
-            # Navigate to messaging
-            page.goto('https://www.linkedin.com/messaging/')
-            page.wait_for_load_state('networkidle')
+            self.refresh_conversations(page)
 
-            # Find unread conversations
-            unread_convos = page.query_selector_all('.msg-conversation-listitem--unread')
+            # All unread conversations in a single evaluate
+            with API_SECONDS.time(watcher='linkedin', call='scan_conversations'):
+                conversations = page.evaluate(EXTRACT_CONVERSATIONS_JS, CONVERSATION_LIST_SELECTOR)
 
             new_messages = []
 
-            for convo in unread_convos[:5]:  # Check first 5 unread
-                try:
-                    # Get sender name
-                    name_elem = convo.query_selector('.msg-conversation-listitem__participant-names')
-                    name = name_elem.inner_text() if name_elem else "Unknown"
-
-                    # Get message preview
-                    preview_elem = convo.query_selector('.msg-conversation-listitem__message-snippet')
-                    preview = preview_elem.inner_text() if preview_elem else ""
+            for convo in conversations:
+                name = convo['name']
+                preview = convo['snippet']
 
-                    # Create unique ID
+                # Dedup on the stable thread ID plus the latest snippet, so a
+                # later message in the same thread still surfaces
+                if convo['thread_id']:
+                    digest = hashlib.sha1(preview.encode('utf-8')).hexdigest()[:12]
+                    msg_id = f"{convo['thread_id']}_{digest}"
+                else:
                     msg_id = f"{name}_{datetime.now().strftime('%Y%m%d')}"
 
-                    if msg_id not in self.processed_messages:
-                        new_messages.append({
-                            'name': name,
-                            'preview': preview[:200],
-                            'msg_id': msg_id
-                        })
-
-                except Exception as e:
-                    logger.error(f"Error processing conversation: {e}")
+                if msg_id in self.processed_messages:
                     continue
+                if convo['thread_id'] and name in self._legacy_names:
+                    # Imported under the old name/date ID; remember it under the new one
+                    self._legacy_names.discard(name)
+                    self.processed_messages.add(msg_id)
+                    logger.info(f"Carried over processed conversation with {name} to thread ID")
+                    continue
+                new_messages.append({
+                    'name': name,
+                    'preview': preview[:200],
+                    'msg_id': msg_id,
+                    'thread_id': convo['thread_id']
+                })
 
             logger.info(f"Found {len(new_messages)} new LinkedIn messages")
             return new_messages
 
         except Exception as e:
             logger.error(f"Error checking LinkedIn messages: {e}")
-            return []
+            raise
+
+    def refresh_conversations(self, page: Page):
+        """
+        Bring the conversation list up to date. Clicks Messaging in the nav so
+        LinkedIn re-fetches the list in place; navigates to /messaging/ on the
+        first cycle, every RELOAD_INTERVAL, or when the in-place refresh fails.
+        """
+        reload_due = time.monotonic() - self._last_reload >= RELOAD_INTERVAL
+        if not reload_due and page.url.startswith(MESSAGING_URL):
+            try:
+                with API_SECONDS.time(watcher='linkedin', call='refresh_messaging'):
+                    page.evaluate(ARM_REFRESH_JS, CONVERSATION_LIST_SELECTOR)
+                    page.click(MESSAGING_NAV_SELECTOR, timeout=5000)
+                    try:
+                        page.wait_for_function(REFRESHED_JS, arg=CONVERSATION_LIST_SELECTOR,
+                                               timeout=REFRESH_SETTLE_MS)
+                    except PlaywrightTimeoutError:
+                        pass  # Nothing new: LinkedIn left the list as it was
+                    page.wait_for_selector(CONVERSATION_LIST_SELECTOR, timeout=30000)
+                return
+            except Exception as e:
+                logger.warning(f"In-place refresh failed, reloading messaging: {e}")
+
+        with API_SECONDS.time(watcher='linkedin', call='open_messaging'):
+            page.goto(MESSAGING_URL, wait_until='domcontentloaded')
+            page.wait_for_selector(CONVERSATION_LIST_SELECTOR, timeout=30000)
+        self._last_reload = time.monotonic()
 
     def check_for_posting_opportunity(self, page: Page) -> bool:
         """Check if it's time to post on LinkedIn"""
         try:
-            # Read Dashboard to check last post date
-            dashboard_path = self.vault_path / "Dashboard.md"
-            if not dashboard_path.exists():
-                return True  # No dashboard, suggest posting
-
-            dashboard_content = dashboard_path.read_text()
-
-            # Simple check: if "Posted on LinkedIn" not in recent activity today
-            today = datetime.now().strftime('%Y-%m-%d')
-            if f"[{today}" in dashboard_content and "Posted on LinkedIn" in dashboard_content:
+            # Structured lookup in the vault index instead of scanning Dashboard.md
+            if posted_today(self.index, LINKEDIN_POST_EVENT):
                 logger.info("Already posted on LinkedIn today")
                 return False
 
@@ -159,6 +225,7 @@ type: linkedin_message
 from: {message['name']}
 received: {datetime.now().isoformat()}
 msg_id: {message['msg_id']}
+thread_id: {message.get('thread_id') or ''}
 priority: normal
 status: pending
 ---
@@ -188,14 +255,14 @@ Review the sender's profile to understand context and intent.
             # Create filename
             safe_name = "".join(c for c in message['name'] if c.isalnum() or c in (' ', '-', '_'))[:30]
             filename = f"LINKEDIN_MSG_{safe_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
-            filepath = self.needs_action / filename
+            filepath = partition_dir(self.vault_path, 'Needs_Action') / filename
 
             # Write file
-            filepath.write_text(content, encoding='utf-8')
+            with WRITE_SECONDS.time(watcher='linkedin'):
+                atomic_write_text(filepath, content)
 
             # Mark as processed
             self.processed_messages.add(message['msg_id'])
-            self._save_state()
 
             logger.info(f"Created action file: {filename}")
             return filepath
@@ -205,8 +272,14 @@ Review the sender's profile to understand context and intent.
             return None
 
     def create_posting_reminder(self) -> Path:
-        """Create reminder to post on LinkedIn"""
+        """Create today's reminder to post on LinkedIn (None if it already exists)"""
         try:
+            filename = f"LINKEDIN_POST_REMINDER_{datetime.now().strftime('%Y%m%d')}.md"
+            filepath = partition_dir(self.vault_path, 'Needs_Action') / filename
+            if filepath.exists():
+                # Already pending: leave it alone so it is not counted as new work every cycle
+                return None
+
             content = f"""---
 type: linkedin_post_reminder
 created: {datetime.now().isoformat()}
@@ -237,11 +310,9 @@ It's time to post on LinkedIn to generate business leads.
 Regular posting (3-5x per week) helps maintain visibility and generate leads.
 """
 
-            filename = f"LINKEDIN_POST_REMINDER_{datetime.now().strftime('%Y%m%d')}.md"
-            filepath = self.needs_action / filename
-
             # Write file
-            filepath.write_text(content, encoding='utf-8')
+            with WRITE_SECONDS.time(watcher='linkedin'):
+                atomic_write_text(filepath, content)
 
             logger.info(f"Created posting reminder: {filename}")
             return filepath
@@ -250,65 +321,136 @@ Regular posting (3-5x per week) helps maintain visibility and generate leads.
             logger.error(f"Error creating posting reminder: {e}")
             return None
 
+    def _get_page(self) -> Page:
+        """Get the LinkedIn page from the browser pool (reopened if it crashed)"""
+        return self.pool.get_page(
+            'linkedin',
+            LINKEDIN_URL,
+            ready_selector=NAV_SEARCH_SELECTOR,
+            storage_state=self.session_path / "storage_state.json"
+        )
+
+    def setup(self):
+        """Open LinkedIn in the shared browser and wait for it to load"""
+        if self.pool is None:
+            self.pool = BrowserPool()
+        if self.index is None:
+            self.index = VaultIndex(self.vault_path)
+
+        # Wait for user to log in if needed (run with BROWSER_HEADLESS=false)
+        logger.info("Navigating to LinkedIn...")
+        logger.info("Waiting for LinkedIn to load (log in if needed)...")
+        try:
+            self.page = self._get_page()
+            logger.info("LinkedIn loaded successfully")
+        except Exception:
+            logger.error("Failed to load LinkedIn. Please log in.")
+            self.teardown()
+            raise
+
+    def poll_once(self) -> int:
+        """Run a single check cycle and return the number of action files created"""
+        # Check for new messages
+        self.page = self._get_page()
+        messages = self.check_for_messages(self.page)
+
+        # Create action files for messages
+        created = [self.create_message_action_file(msg) for msg in messages]
+        self.processed_messages.commit()
+        DEDUP_ENTRIES.set(len(self.processed_messages), watcher='linkedin')
+
+        # Check if posting opportunity exists
+        if self.check_for_posting_opportunity(self.page):
+            created.append(self.create_posting_reminder())
+
+        return sum(1 for path in created if path)
+
+    def teardown(self):
+        """Save the session, release the browser and flush any group-committed state"""
+        self.processed_messages.commit()
+        if self._owns_index and self.index is not None:
+            self.index.close()
+            self.index = None
+        if self.pool is None:
+            return
+        if self._owns_pool:
+            self.pool.close()
+            self.pool = None
+        else:
+            self.pool.save_session('linkedin')
+
     def run(self):
         """Main watcher loop"""
         logger.info(f"Starting LinkedIn Watcher (checking every {self.check_interval}s)")
         logger.info(f"Vault path: {self.vault_path}")
         logger.info(f"Session path: {self.session_path}")
 
-        with sync_playwright() as p:
-            # Launch browser with persistent context
-            browser = p.chromium.launch_persistent_context(
-                str(self.session_path),
-                headless=False,  # Set to True for production
-                args=['--no-sandbox']
-            )
-
-            page = browser.pages[0] if browser.pages else browser.new_page()
-
-            # Navigate to LinkedIn
-            logger.info("Navigating to LinkedIn...")
-            page.goto('https://www.linkedin.com')
-
-            # Wait for user to log in if needed
-            logger.info("Waiting for LinkedIn to load (log in if needed)...")
+        try:
+            self.setup()
+        except Exception:
+            return
+
+        # Main loop
+        schedule = schedule_for(self, 'linkedin', self.vault_path)
+        while True:
+            started = time.monotonic()
             try:
-                page.wait_for_selector('[data-test-global-nav-search]', timeout=60000)
-                logger.info("LinkedIn loaded successfully")
-            except Exception as e:
-                logger.error("Failed to load LinkedIn. Please log in.")
-                browser.close()
-                return
-
-            # Main loop
-            while True:
-                try:
-                    # Check for new messages
-                    messages = self.check_for_messages(page)
+                items = self.poll_once()
+                record_cycle('linkedin', items, time.monotonic() - started)
+                log_cycle(logger, "linkedin", items, started)
+                write_snapshot(self.vault_path / "Logs" / "metrics_linkedin.prom", SNAPSHOT_INTERVAL)
 
-                    # Create action files for messages
-                    for msg in messages:
-                        self.create_message_action_file(msg)
+                # Wait before next check (shorter while busy, longer while idle)
+                time.sleep(schedule.next_delay(items))
 
-                    # Check if posting opportunity exists
-                    if self.check_for_posting_opportunity(page):
-                        self.create_posting_reminder()
-
-                    # Wait before next check
-                    time.sleep(self.check_interval)
-
-                except KeyboardInterrupt:
-                    logger.info("LinkedIn Watcher stopped by user")
-                    break
-                except Exception as e:
-                    logger.error(f"Error in main loop: {e}")
-                    time.sleep(self.check_interval)
-
-            browser.close()
+            except KeyboardInterrupt:
+                logger.info("LinkedIn Watcher stopped by user")
+                break
+            except Exception as e:
+                record_cycle('linkedin', 0, time.monotonic() - started, error=True)
+                log_cycle(logger, "linkedin", 0, started, error=e)
+                time.sleep(schedule.next_delay(error=e))
+
+        self.teardown()
+
+
+def legacy_names(store: DedupStore, days: int = LEGACY_SEED_DAYS) -> Set[str]:
+    """Names with an old-style "<name>_<YYYYMMDD>" ID from the last ``days`` days"""
+    cutoff = (datetime.now() - timedelta(days=days)).strftime('%Y%m%d')
+    names = set()
+    for item_id in store.entries:
+        match = LEGACY_ID_PATTERN.match(item_id)
+        if match and match.group('date') >= cutoff:
+            names.add(match.group('name'))
+    return names
+
+
+def publish_post(pool: BrowserPool, text: str, session_path: Path = SESSION_PATH):
+    """
+    Publish ``text`` as a LinkedIn post through the share box on the feed.
+    Uses its own page (same logged-in session as the watcher) and must run on
+    the pool's browser thread.
+    """
+    page = pool.get_page(
+        'linkedin_post',
+        FEED_URL,
+        ready_selector=SHARE_BOX_SELECTOR,
+        storage_state=session_path / "storage_state.json"
+    )
+    with API_SECONDS.time(watcher='linkedin', call='publish_post'):
+        if not page.url.startswith(FEED_URL):
+            page.goto(FEED_URL, wait_until='domcontentloaded')
+        page.click(SHARE_BOX_SELECTOR, timeout=PUBLISH_TIMEOUT)
+        page.fill(POST_EDITOR_SELECTOR, text, timeout=PUBLISH_TIMEOUT)
+        page.click(POST_SUBMIT_SELECTOR, timeout=PUBLISH_TIMEOUT)
+        # The composer closes once LinkedIn has accepted the post
+        page.wait_for_selector(POST_EDITOR_SELECTOR, state='detached', timeout=PUBLISH_TIMEOUT)
+    logger.info(f"Published LinkedIn post ({len(text)} characters)")
 
 
 def main():
     """Entry point"""
+    setup_logging('linkedin_watcher', VAULT_PATH)
     watcher = LinkedInWatcher(VAULT_PATH, SESSION_PATH, CHECK_INTERVAL)
     watcher.run()
 
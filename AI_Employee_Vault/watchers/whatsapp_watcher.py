@@ -10,120 +10,186 @@ import time
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Set
-import json
+from typing import List, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dedup_store import DedupStore
+from vault_io import atomic_write_text
+from logging_setup import setup_logging, log_cycle
+from metrics import (API_SECONDS, WRITE_SECONDS, DEDUP_ENTRIES, QUEUE_DEPTH, SNAPSHOT_INTERVAL,
+                     record_cycle, write_snapshot)
+from vault_layout import partition_dir
+from scheduler import schedule_for
+from classifier import load_classifier
 
 # Playwright imports
 try:
-    from playwright.sync_api import sync_playwright, Browser, Page
+    from playwright.sync_api import Page
+    from browser_pool import BrowserPool
 except ImportError:
     print("Error: Playwright not installed.")
     print("Install with: pip install playwright && playwright install chromium")
     sys.exit(1)
 
 # Configuration
-VAULT_PATH = Path(__file__).parent.parent / "AI_Employee_Vault"
+VAULT_PATH = Path(__file__).parent.parent  # watchers/ -> AI_Employee_Vault/
 NEEDS_ACTION = VAULT_PATH / "Needs_Action"
 SESSION_PATH = Path(__file__).parent / "sessions" / "whatsapp"
 CHECK_INTERVAL = 30  # seconds
-URGENT_KEYWORDS = ['urgent', 'asap', 'emergency', 'help', 'invoice', 'payment', 'important']
-
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(VAULT_PATH / "Logs" / "whatsapp_watcher.log"),
-        logging.StreamHandler()
-    ]
-)
+# Override to point the watcher at a local fixture page (e.g. file:///...)
+WHATSAPP_URL = os.getenv('WHATSAPP_URL', 'https://web.whatsapp.com')
+CHAT_LIST_SELECTOR = '[data-testid="chat-list"]'
+UNREAD_SELECTOR = '[aria-label*="unread"]'
+# 'push' reports unread rows from an in-page MutationObserver, 'poll' only scans
+DETECTION_MODE = os.getenv('WHATSAPP_MODE', 'push')
+PUSH_PUMP_INTERVAL = 1  # seconds between event pumps in push mode
+PUSH_PUMP_MS = 200  # time spent dispatching observer callbacks per pump
+
 logger = logging.getLogger("WhatsAppWatcher")
 
+# Returns name and preview text for every unread chat row in one round trip
+EXTRACT_ROWS_JS = """
+rows => rows.map(row => {
+    const nameElem = row.querySelector('[dir="auto"]');
+    return {name: nameElem ? nameElem.innerText : 'Unknown', text: row.innerText};
+})
+"""
+
+# Installs (once per chat list element) a MutationObserver that reports all
+# unread rows through the exposed binding, debounced to one call per burst
+OBSERVER_JS = """
+([listSelector, unreadSelector]) => {
+    const list = document.querySelector(listSelector);
+    if (!list) return false;
+    const state = window.__aiEmployeeObserver;
+    if (state && state.list === list) return true;
+    if (state) state.observer.disconnect();
+
+    let timer = null;
+    const report = () => {
+        timer = null;
+        const rows = Array.from(list.querySelectorAll(unreadSelector)).map(row => {
+            const nameElem = row.querySelector('[dir="auto"]');
+            return {name: nameElem ? nameElem.innerText : 'Unknown', text: row.innerText};
+        });
+        if (rows.length) window.__aiEmployeeReportUnread(rows);
+    };
+    const observer = new MutationObserver(() => {
+        if (timer === null) timer = setTimeout(report, 250);
+    });
+    observer.observe(list, {childList: true, subtree: true, characterData: true,
+                            attributes: true, attributeFilter: ['aria-label']});
+    window.__aiEmployeeObserver = {list, observer};
+    report();
+    return true;
+}
+"""
+
 
 class WhatsAppWatcher:
     """Watches WhatsApp Web for urgent messages and creates action items"""
 
-    def __init__(self, vault_path: Path, session_path: Path, check_interval: int = 30):
+    def __init__(self, vault_path: Path, session_path: Path, check_interval: int = 30,
+                 pool: "BrowserPool" = None, mode: str = DETECTION_MODE):
         self.vault_path = vault_path
         self.needs_action = vault_path / "Needs_Action"
         self.session_path = session_path
-        self.check_interval = check_interval
-        self.processed_chats: Set[str] = set()
-        self.keywords = URGENT_KEYWORDS
+        self.mode = mode
+        # In push mode check_interval only paces the fallback full scan
+        self.fallback_interval = check_interval
+        self.check_interval = PUSH_PUMP_INTERVAL if mode == 'push' else check_interval
+        if mode == 'push':
+            # Pumping page events is cheap; keep it steady instead of adaptive
+            self.min_interval = self.max_interval = PUSH_PUMP_INTERVAL
+        self._last_full_scan = 0.0
+        self._pushed_rows: List[Dict] = []
+        self._observed_page = None
+        self.pool = pool
+        self._owns_pool = pool is None
+        self.page = None
+        self.classifier = load_classifier(vault_path)  # Keywords from Company_Handbook.md
 
         # Ensure directories exist
         self.needs_action.mkdir(parents=True, exist_ok=True)
         (vault_path / "Logs").mkdir(parents=True, exist_ok=True)
         self.session_path.mkdir(parents=True, exist_ok=True)
 
-        # Load state
+        # Processed IDs live in an append-only dedup log (migrated from the old JSON set)
         self.state_file = vault_path / "Logs" / "whatsapp_watcher_state.json"
-        self._load_state()
-
-    def _load_state(self):
-        """Load previously processed chat IDs"""
-        if self.state_file.exists():
-            try:
-                with open(self.state_file, 'r') as f:
-                    state = json.load(f)
-                    self.processed_chats = set(state.get('processed_chats', []))
-                logger.info(f"Loaded {len(self.processed_chats)} processed chats")
-            except Exception as e:
-                logger.error(f"Error loading state: {e}")
-
-    def _save_state(self):
-        """Save processed chat IDs"""
-        try:
-            with open(self.state_file, 'w') as f:
-                json.dump({
-                    'processed_chats': list(self.processed_chats),
-                    'last_updated': datetime.now().isoformat()
-                }, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving state: {e}")
+        self.processed_chats = DedupStore(vault_path / "Logs" / "whatsapp_watcher_seen.log")
+        self.processed_chats.migrate_from_json(self.state_file, 'processed_chats')
 
     def check_for_updates(self, page: Page) -> List[Dict]:
-        """Check for new urgent messages"""
+        """Check for new urgent messages with one bulk scan of all unread chats"""
         try:
             # Wait for chat list to load
-            page.wait_for_selector('[data-testid="chat-list"]', timeout=10000)
-
-            # Find unread chats
-            unread_chats = page.query_selector_all('[aria-label*="unread"]')
-
-            urgent_messages = []
-
-            for chat in unread_chats[:5]:  # Check first 5 unread chats
-                try:
-                    # Get chat text
-                    text = chat.inner_text().lower()
+            page.wait_for_selector(CHAT_LIST_SELECTOR, timeout=10000)
 
-                    # Check for urgent keywords
-                    if any(keyword in text for keyword in self.keywords):
-                        # Get chat name
-                        name_elem = chat.query_selector('[dir="auto"]')
-                        name = name_elem.inner_text() if name_elem else "Unknown"
-
-                        # Create unique ID
-                        chat_id = f"{name}_{datetime.now().strftime('%Y%m%d')}"
-
-                        if chat_id not in self.processed_chats:
-                            urgent_messages.append({
-                                'name': name,
-                                'text': text[:200],  # First 200 chars
-                                'chat_id': chat_id
-                            })
-
-                except Exception as e:
-                    logger.error(f"Error processing chat: {e}")
-                    continue
+            # Name and preview of every unread chat in a single evaluate
+            with API_SECONDS.time(watcher='whatsapp', call='scan_unread'):
+                rows = page.eval_on_selector_all(UNREAD_SELECTOR, EXTRACT_ROWS_JS)
+            self._last_full_scan = time.monotonic()
 
+            urgent_messages = self._select_urgent(rows)
             logger.info(f"Found {len(urgent_messages)} urgent messages")
             return urgent_messages
 
         except Exception as e:
             logger.error(f"Error checking WhatsApp: {e}")
-            return []
+            raise
+
+    def _select_urgent(self, rows: List[Dict]) -> List[Dict]:
+        """Keep unread rows that match urgent keywords and were not yet processed"""
+        urgent_messages = []
+        seen = set()
+
+        for row in rows:
+            text = row.get('text', '').lower()
+
+            # Check for urgent keywords (whole words, weighted by the handbook)
+            result = self.classifier.classify(text, default='high')
+            if not result.matches:
+                continue
+
+            # Create unique ID
+            name = row.get('name') or "Unknown"
+            chat_id = f"{name}_{datetime.now().strftime('%Y%m%d')}"
+
+            if chat_id not in self.processed_chats and chat_id not in seen:
+                seen.add(chat_id)
+                urgent_messages.append({
+                    'name': name,
+                    'text': text[:200],  # First 200 chars
+                    'chat_id': chat_id,
+                    'priority': result.priority
+                })
+
+        return urgent_messages
+
+    def _on_unread_rows(self, source, rows: List[Dict]):
+        """Binding called from the page's MutationObserver"""
+        self._pushed_rows.extend(rows)
+
+    def _ensure_observer(self, page: Page):
+        """Expose the report binding and install the MutationObserver on this page"""
+        if self._observed_page is not page:
+            page.expose_binding('__aiEmployeeReportUnread', self._on_unread_rows)
+            self._observed_page = page
+            logger.info("Push mode: watching chat list for unread changes")
+        # Idempotent; re-attaches if WhatsApp re-rendered the chat list
+        page.evaluate(OBSERVER_JS, [CHAT_LIST_SELECTOR, UNREAD_SELECTOR])
+
+    def check_for_pushed(self, page: Page) -> List[Dict]:
+        """Dispatch pending observer callbacks and return any new urgent messages"""
+        self._ensure_observer(page)
+        page.wait_for_timeout(PUSH_PUMP_MS)  # Observer callbacks run while we wait
+
+        rows, self._pushed_rows = self._pushed_rows, []
+        QUEUE_DEPTH.set(len(rows), watcher='whatsapp')  # Rows pushed since the last pump
+        urgent_messages = self._select_urgent(rows)
+        if urgent_messages:
+            logger.info(f"Observer reported {len(urgent_messages)} urgent messages")
+        return urgent_messages
 
     def create_action_file(self, message: Dict) -> Path:
         """Create action file for urgent message"""
@@ -133,7 +199,7 @@ type: whatsapp
 from: {message['name']}
 received: {datetime.now().isoformat()}
 chat_id: {message['chat_id']}
-priority: high
+priority: {message.get('priority', 'high')}
 status: pending
 ---
 
@@ -163,14 +229,14 @@ Review the full conversation for context.
             # Create filename
             safe_name = "".join(c for c in message['name'] if c.isalnum() or c in (' ', '-', '_'))[:30]
             filename = f"WHATSAPP_{safe_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
-            filepath = self.needs_action / filename
+            filepath = partition_dir(self.vault_path, 'Needs_Action') / filename
 
             # Write file
-            filepath.write_text(content, encoding='utf-8')
+            with WRITE_SECONDS.time(watcher='whatsapp'):
+                atomic_write_text(filepath, content)
 
             # Mark as processed
             self.processed_chats.add(message['chat_id'])
-            self._save_state()
 
             logger.info(f"Created action file: {filename}")
             return filepath
@@ -179,61 +245,100 @@ Review the full conversation for context.
             logger.error(f"Error creating action file: {e}")
             return None
 
+    def _get_page(self) -> Page:
+        """Get the WhatsApp Web page from the browser pool (reopened if it crashed)"""
+        return self.pool.get_page(
+            'whatsapp',
+            WHATSAPP_URL,
+            ready_selector=CHAT_LIST_SELECTOR,
+            storage_state=self.session_path / "storage_state.json"
+        )
+
+    def setup(self):
+        """Open WhatsApp Web in the shared browser and wait for it to load"""
+        if self.pool is None:
+            self.pool = BrowserPool()
+
+        # Wait for user to scan QR code if needed (run with BROWSER_HEADLESS=false)
+        logger.info("Navigating to WhatsApp Web...")
+        logger.info("Waiting for WhatsApp to load (scan QR if needed)...")
+        try:
+            self.page = self._get_page()
+            logger.info("WhatsApp loaded successfully")
+        except Exception:
+            logger.error("Failed to load WhatsApp. Please scan QR code.")
+            self.teardown()
+            raise
+
+    def poll_once(self) -> int:
+        """Run a single check cycle and return the number of action files created"""
+        # Check for urgent messages
+        self.page = self._get_page()
+        if self.mode == 'push':
+            messages = self.check_for_pushed(self.page)
+            # The full scan stays as a safety net for missed mutations
+            if time.monotonic() - self._last_full_scan >= self.fallback_interval:
+                known = {msg['chat_id'] for msg in messages}
+                messages += [msg for msg in self.check_for_updates(self.page)
+                             if msg['chat_id'] not in known]
+        else:
+            messages = self.check_for_updates(self.page)
+
+        # Create action files
+        created = [self.create_action_file(msg) for msg in messages]
+        self.processed_chats.commit()
+        DEDUP_ENTRIES.set(len(self.processed_chats), watcher='whatsapp')
+        return sum(1 for path in created if path)
+
+    def teardown(self):
+        """Save the session, release the browser and flush any group-committed state"""
+        self.processed_chats.commit()
+        if self.pool is None:
+            return
+        if self._owns_pool:
+            self.pool.close()
+            self.pool = None
+        else:
+            self.pool.save_session('whatsapp')
+
     def run(self):
         """Main watcher loop"""
         logger.info(f"Starting WhatsApp Watcher (checking every {self.check_interval}s)")
         logger.info(f"Vault path: {self.vault_path}")
         logger.info(f"Session path: {self.session_path}")
 
-        with sync_playwright() as p:
-            # Launch browser with persistent context (saves login)
-            browser = p.chromium.launch_persistent_context(
-                str(self.session_path),
-                headless=False,  # Set to True for production
-                args=['--no-sandbox']
-            )
-
-            page = browser.pages[0] if browser.pages else browser.new_page()
-
-            # Navigate to WhatsApp Web
-            logger.info("Navigating to WhatsApp Web...")
-            page.goto('https://web.whatsapp.com')
-
-            # Wait for user to scan QR code if needed
-            logger.info("Waiting for WhatsApp to load (scan QR if needed)...")
+        try:
+            self.setup()
+        except Exception:
+            return
+
+        # Main loop
+        schedule = schedule_for(self, 'whatsapp', self.vault_path)
+        while True:
+            started = time.monotonic()
             try:
-                page.wait_for_selector('[data-testid="chat-list"]', timeout=60000)
-                logger.info("WhatsApp loaded successfully")
-            except Exception as e:
-                logger.error("Failed to load WhatsApp. Please scan QR code.")
-                browser.close()
-                return
+                items = self.poll_once()
+                record_cycle('whatsapp', items, time.monotonic() - started)
+                log_cycle(logger, "whatsapp", items, started)
+                write_snapshot(self.vault_path / "Logs" / "metrics_whatsapp.prom", SNAPSHOT_INTERVAL)
 
-            # Main loop
-            while True:
-                try:
-                    # Check for urgent messages
-                    messages = self.check_for_updates(page)
+                # Wait before next check (shorter while busy, longer while idle)
+                time.sleep(schedule.next_delay(items))
 
-                    # Create action files
-                    for msg in messages:
-                        self.create_action_file(msg)
-
-                    # Wait before next check
-                    time.sleep(self.check_interval)
-
-                except KeyboardInterrupt:
-                    logger.info("WhatsApp Watcher stopped by user")
-                    break
-                except Exception as e:
-                    logger.error(f"Error in main loop: {e}")
-                    time.sleep(self.check_interval)
+            except KeyboardInterrupt:
+                logger.info("WhatsApp Watcher stopped by user")
+                break
+            except Exception as e:
+                record_cycle('whatsapp', 0, time.monotonic() - started, error=True)
+                log_cycle(logger, "whatsapp", 0, started, error=e)
+                time.sleep(schedule.next_delay(error=e))
 
-            browser.close()
+        self.teardown()
 
 
 def main():
     """Entry point"""
+    setup_logging('whatsapp_watcher', VAULT_PATH)
     watcher = WhatsAppWatcher(VAULT_PATH, SESSION_PATH, CHECK_INTERVAL)
     watcher.run()
 
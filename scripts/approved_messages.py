@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Approved Messages - Load approved outgoing emails for the batch senders
+Part of the AI Employee Silver Tier implementation
+
+Reads either a directory of approval files (e.g. AI_Employee_Vault/Approved)
+or a JSONL file with one message per line. An approval file is an email when
+its frontmatter has ``type: email``; the frontmatter carries the envelope and
+the body comes from a "## Body" (or "## Email Body" / "## Message") section:
+
+    ---
+    type: email
+    to: client@example.com
+    cc: accounts@example.com
+    subject: Invoice for October
+    attachments: Inbox/invoice_2026-10.pdf
+    ---
+
+    ## Body
+    Hi, please find the invoice attached.
+
+Relative attachment paths are resolved against the vault root (the parent of
+the approval folder). JSONL lines use the same keys plus ``body`` and an
+optional ``id``; attachments may be a list or a comma-separated string.
+
+Given a ``failures`` list, the loaders record each invalid file or line
+there as a failed SendResult (with the message's id) and keep loading the
+rest, so one bad approval does not hold back the whole batch.
+"""
+
+import os
+import re
+import json
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+EMAIL_TYPES = {'email', 'send_email', 'email_send'}
+BODY_SECTIONS = ('body', 'email body', 'message', 'draft')
+INSTRUCTION_SECTIONS = ('to approve', 'to reject')
+DEFAULT_SENDER = os.getenv('EMAIL_FROM') or os.getenv('SMTP_USERNAME') or ''
+
+_SECTION = re.compile(r'^##\s+(.+?)\s*$', re.MULTILINE)
+
+
+class OutgoingEmail(NamedTuple):
+    """One approved email, independent of how it is sent"""
+    id: str
+    sender: str
+    to: str
+    subject: str
+    body: str
+    cc: Optional[str] = None
+    bcc: Optional[str] = None
+    attachments: Tuple[str, ...] = ()
+    source: Optional[str] = None  # Approval file this came from
+
+    def recipients(self) -> List[str]:
+        """Every envelope recipient: To, Cc and Bcc"""
+        return [address.strip() for field in (self.to, self.cc, self.bcc) if field
+                for address in field.split(',') if address.strip()]
+
+
+class SendResult(NamedTuple):
+    """Outcome of one message in a batch (from either sender)"""
+    id: str
+    ok: bool
+    attempts: int
+    error: Optional[str] = None
+    refused: tuple = ()  # Recipients the server refused while accepting the rest
+    message_id: Optional[str] = None  # Provider's ID for the sent message (Gmail API)
+    transient: bool = False  # A failure that may succeed later (4xx, 429/5xx, network, auth)
+
+
+def split_frontmatter(text: str) -> Tuple[Dict[str, str], str]:
+    """Flat ``key: value`` frontmatter pairs and the remaining markdown"""
+    if not text.startswith('---'):
+        return {}, text
+    end = text.find('\n---', 3)
+    if end == -1:
+        return {}, text
+    fields = {}
+    for line in text[3:end].splitlines():
+        key, sep, value = line.partition(':')
+        if sep and key.strip() and not key.startswith((' ', '\t', '-')):
+            fields[key.strip()] = value.strip().strip('"\'')
+    return fields, text[end + 4:].lstrip('\n')
+
+
+def extract_body(markdown: str, sections: Tuple[str, ...] = BODY_SECTIONS) -> str:
+    """The first of ``sections`` present, else the text minus the approve/reject instructions"""
+    headings = list(_SECTION.finditer(markdown))
+    found = [(m.group(1).strip().lower(), m.start(), m.end(),
+              headings[i + 1].start() if i + 1 < len(headings) else len(markdown))
+             for i, m in enumerate(headings)]
+    for wanted in sections:
+        for name, _, start, stop in found:
+            if name == wanted:
+                return markdown[start:stop].strip().rstrip('-').strip()
+    kept = markdown[:found[0][1]] if found else markdown
+    for name, heading, _, stop in found:
+        if name not in INSTRUCTION_SECTIONS:
+            kept += markdown[heading:stop]
+    return kept.strip().rstrip('-').strip()
+
+
+def _attachment_list(value) -> Tuple[str, ...]:
+    if not value:
+        return ()
+    if isinstance(value, str):
+        value = value.split(',')
+    return tuple(str(item).strip() for item in value if str(item).strip())
+
+
+def parse_approval_file(path: Path, sender: str = DEFAULT_SENDER) -> Optional[OutgoingEmail]:
+    """OutgoingEmail for an approved email file, or None if the file is another kind of action"""
+    path = Path(path)
+    fields, markdown = split_frontmatter(path.read_text(encoding='utf-8'))
+    if fields.get('type', '').lower() not in EMAIL_TYPES:
+        return None
+    if not fields.get('to'):
+        raise ValueError(f"{path.name}: approved email has no 'to' field")
+    vault_root = path.resolve().parent.parent
+    attachments = tuple(item if Path(item).is_absolute() else str(vault_root / item)
+                        for item in _attachment_list(fields.get('attachments')))
+    return OutgoingEmail(
+        id=path.stem,
+        sender=fields.get('from') or sender,
+        to=fields['to'],
+        subject=fields.get('subject', ''),
+        body=extract_body(markdown),
+        cc=fields.get('cc') or None,
+        bcc=fields.get('bcc') or None,
+        attachments=attachments,
+        source=str(path),
+    )
+
+
+def _invalid(failures: Optional[List[SendResult]], message_id: str, error: ValueError):
+    """Record an invalid message in ``failures``, or raise when the caller wants errors"""
+    if failures is None:
+        raise error
+    failures.append(SendResult(message_id, False, 0, str(error)))
+
+
+def load_directory(directory: Path, sender: str = DEFAULT_SENDER,
+                   failures: Optional[List[SendResult]] = None) -> List[OutgoingEmail]:
+    """Approved emails in ``directory`` (other action types are skipped), in name order"""
+    messages = []
+    for path in sorted(Path(directory).glob('*.md')):
+        try:
+            message = parse_approval_file(path, sender)
+        except ValueError as e:  # Includes UnicodeDecodeError
+            _invalid(failures, path.stem, e)
+            continue
+        if message is not None:
+            messages.append(message)
+    return messages
+
+
+def load_jsonl(path: Path, sender: str = DEFAULT_SENDER,
+               failures: Optional[List[SendResult]] = None) -> List[OutgoingEmail]:
+    """One email per JSON line: to, subject, body and optional from/cc/bcc/attachments/id"""
+    messages = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            message_id = f"{Path(path).stem}:{number}"
+            try:
+                data = json.loads(line)
+                if not isinstance(data, dict):
+                    raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+                message_id = str(data.get('id') or message_id)
+                messages.append(OutgoingEmail(
+                    id=message_id,
+                    sender=data.get('from') or sender,
+                    to=data['to'],
+                    subject=data.get('subject', ''),
+                    body=data.get('body', ''),
+                    cc=data.get('cc') or None,
+                    bcc=data.get('bcc') or None,
+                    attachments=_attachment_list(data.get('attachments')),
+                    source=str(path),
+                ))
+            except (KeyError, ValueError) as e:
+                _invalid(failures, message_id, ValueError(f"{path}:{number}: invalid message: {e}"))
+    return messages
+
+
+def load_messages(source: Path, sender: str = DEFAULT_SENDER,
+                  failures: Optional[List[SendResult]] = None) -> List[OutgoingEmail]:
+    """Approved emails from a directory of approval files or a .jsonl file"""
+    source = Path(source)
+    if source.is_dir():
+        return load_directory(source, sender, failures)
+    return load_jsonl(source, sender, failures)
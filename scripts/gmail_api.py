@@ -2,37 +2,106 @@
 """
 Gmail API Helper - Send emails via Gmail API
 Part of the AI Employee Silver Tier implementation
+
+GmailSender is meant to live as long as the process that sends mail. It
+loads the OAuth token once and refreshes it shortly before it expires,
+builds the client from a discovery document cached on disk
+(credentials/gmail_discovery.json, refetched after DISCOVERY_MAX_AGE)
+instead of rebuilding it per email, and sends batches on a bounded thread
+pool. Each worker thread has its own client, because httplib2 connections
+are not thread-safe. Library calls raise GmailSendError instead of exiting.
+Messages over INLINE_SEND_LIMIT are written to a temp file chunk by chunk
+and sent with a resumable media upload, so memory stays bounded.
+
+Usage:
+    python gmail_api.py --from me@x.com --to you@y.com --subject Hi --body Hello
+    python gmail_api.py --batch ../AI_Employee_Vault/Approved --done-dir ../AI_Employee_Vault/Done
+    python gmail_api.py --batch ../AI_Employee_Vault/Approved --done-dir ../AI_Employee_Vault/Done --outbox
 """
 
 import os
 import sys
+import json
+import time
+import logging
+import shutil
 import argparse
 import base64
+import threading
 from pathlib import Path
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, List, Optional
+import urllib.request
 
 try:
     from google.oauth2.credentials import Credentials
     from google_auth_oauthlib.flow import InstalledAppFlow
     from google.auth.transport.requests import Request
-    from googleapiclient.discovery import build
+    from google.auth.exceptions import GoogleAuthError
+    from google_auth_httplib2 import AuthorizedHttp
+    from googleapiclient.discovery import build_from_document
+    from googleapiclient.errors import HttpError
+    from googleapiclient.http import MediaFileUpload
+    import httplib2
     import pickle
 except ImportError:
     print("Error: Gmail API libraries not installed.")
     print("Install with: pip install google-auth google-auth-oauthlib google-auth-httplib2 google-api-python-client")
     sys.exit(1)
 
+from approved_messages import OutgoingEmail, SendResult, load_messages
+from streaming_mime import StreamingMessage
+
 # Configuration
 CREDENTIALS_PATH = Path(__file__).parent / "credentials" / "gmail_credentials.json"
 TOKEN_PATH = Path(__file__).parent / "credentials" / "gmail_token.pickle"
 SCOPES = ['https://www.googleapis.com/auth/gmail.send']
+DISCOVERY_URL = os.getenv('GMAIL_DISCOVERY_URL',
+                          'https://gmail.googleapis.com/$discovery/rest?version=v1')
+DISCOVERY_CACHE = Path(__file__).parent / "credentials" / "gmail_discovery.json"
+DISCOVERY_MAX_AGE = 7 * 24 * 3600  # seconds
+TOKEN_REFRESH_MARGIN = 300  # Refresh this many seconds before the access token expires
+SEND_CONCURRENCY = int(os.getenv('GMAIL_SEND_CONCURRENCY', '4'))
+MAX_RETRIES = 3  # googleapiclient retries 429/5xx with exponential backoff
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}  # Still worth retrying later once MAX_RETRIES are used up
+HTTP_TIMEOUT = 60  # seconds
+INLINE_SEND_LIMIT = 5 * 1024 * 1024  # Larger messages use a resumable upload from a temp file
+UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024  # Must be a multiple of 256 KB
 
 
-def authenticate():
-    """Authenticate with Gmail API"""
+class GmailSendError(Exception):
+    """Authentication or sending failed"""
+
+
+def load_discovery_document(url: str = DISCOVERY_URL, cache_path: Path = DISCOVERY_CACHE,
+                            max_age: float = DISCOVERY_MAX_AGE) -> str:
+    """Gmail discovery document, from the on-disk cache while it is fresh"""
+    try:
+        if time.time() - cache_path.stat().st_mtime < max_age:
+            return cache_path.read_text(encoding='utf-8')
+    except OSError:
+        pass  # No cache yet
+
+    try:
+        with urllib.request.urlopen(url, timeout=HTTP_TIMEOUT) as response:
+            document = response.read().decode('utf-8')
+        json.loads(document)  # Never cache an error page
+    except (OSError, ValueError) as e:
+        if cache_path.exists():
+            print(f"Warning: could not refresh discovery document ({e}); using cached copy")
+            return cache_path.read_text(encoding='utf-8')
+        raise GmailSendError(f"Could not load Gmail discovery document from {url}: {e}") from e
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_suffix('.tmp')
+    tmp.write_text(document, encoding='utf-8')
+    os.replace(tmp, cache_path)
+    return document
+
+
+def load_credentials():
+    """Load the saved token, refreshing or running the OAuth flow as needed"""
     creds = None
 
     # Load existing token
@@ -46,101 +115,246 @@ def authenticate():
             creds.refresh(Request())
         else:
             if not CREDENTIALS_PATH.exists():
-                print(f"Error: Credentials file not found: {CREDENTIALS_PATH}")
-                print("Download credentials from Google Cloud Console")
-                sys.exit(1)
+                raise GmailSendError(f"Credentials file not found: {CREDENTIALS_PATH}. "
+                                     "Download credentials from Google Cloud Console")
 
             flow = InstalledAppFlow.from_client_secrets_file(
                 str(CREDENTIALS_PATH), SCOPES)
             creds = flow.run_local_server(port=0)
 
-        # Save credentials
-        TOKEN_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with open(TOKEN_PATH, 'wb') as token:
-            pickle.dump(creds, token)
+        save_credentials(creds)
 
-    return build('gmail', 'v1', credentials=creds)
+    return creds
+
+
+def save_credentials(creds):
+    TOKEN_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(TOKEN_PATH, 'wb') as token:
+        pickle.dump(creds, token)
+
+
+def authenticate():
+    """Authenticate with Gmail API and return a service client"""
+    return GmailSender(concurrency=1).service
 
 
 def create_message(sender, to, subject, body, cc=None, bcc=None, attachments=None):
-    """Create email message"""
-    message = MIMEMultipart()
-    message['to'] = to
-    message['from'] = sender
-    message['subject'] = subject
-
-    if cc:
-        message['cc'] = cc
-    if bcc:
-        message['bcc'] = bcc
-
-    # Add body
-    message.attach(MIMEText(body, 'plain'))
-
-    # Add attachments
-    if attachments:
-        for filepath in attachments:
-            filepath = Path(filepath)
-            if not filepath.exists():
-                print(f"Warning: Attachment not found: {filepath}")
-                continue
-
-            with open(filepath, 'rb') as f:
-                part = MIMEBase('application', 'octet-stream')
-                part.set_payload(f.read())
-                encoders.encode_base64(part)
-                part.add_header(
-                    'Content-Disposition',
-                    f'attachment; filename={filepath.name}'
-                )
-                message.attach(part)
-
-    return {'raw': base64.urlsafe_b64encode(message.as_bytes()).decode()}
+    """Create an inline ('raw') email message; use execute_send() for large attachments"""
+    message = StreamingMessage(sender, to, subject, body, cc, bcc, attachments)
+    return {'raw': base64.urlsafe_b64encode(message.as_bytes(include_bcc=True)).decode()}
+
+
+def execute_send(service, message: StreamingMessage, num_retries: int = MAX_RETRIES) -> dict:
+    """
+    messages.send with bounded memory: small messages go inline as 'raw',
+    larger ones are streamed to a temp file and sent as a resumable media
+    upload in UPLOAD_CHUNK_SIZE pieces (Gmail accepts up to 35 MB this way).
+    """
+    messages = service.users().messages()
+    if message.estimated_size() <= INLINE_SEND_LIMIT:
+        body = {'raw': base64.urlsafe_b64encode(message.as_bytes(include_bcc=True)).decode()}
+        return messages.send(userId='me', body=body).execute(num_retries=num_retries)
+
+    path = message.write_temp_file(include_bcc=True)  # Gmail reads Bcc from the headers
+    media = MediaFileUpload(str(path), mimetype='message/rfc822',
+                            chunksize=UPLOAD_CHUNK_SIZE, resumable=True)
+    try:
+        return messages.send(userId='me', body={}, media_body=media).execute(num_retries=num_retries)
+    finally:
+        media.stream().close()
+        path.unlink(missing_ok=True)
+
+
+class GmailSender:
+    """Long-lived Gmail API sender: one token, a cached discovery document, a client per thread"""
+
+    def __init__(self, credentials=None, concurrency: int = SEND_CONCURRENCY,
+                 discovery_url: str = DISCOVERY_URL, cache_path: Path = DISCOVERY_CACHE,
+                 max_retries: int = MAX_RETRIES):
+        self.creds = credentials
+        self._owns_token = credentials is None  # Refreshed tokens go back to TOKEN_PATH
+        self.concurrency = max(1, concurrency)
+        self.discovery_url = discovery_url
+        self.cache_path = cache_path
+        self.max_retries = max_retries
+        self._document: Optional[str] = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.refreshes = 0
+
+    # --- Client ---
+
+    def ensure_fresh(self):
+        """Refresh the access token if it expires within TOKEN_REFRESH_MARGIN"""
+        with self._lock:
+            if self.creds is None:
+                self.creds = load_credentials()
+            expiry = getattr(self.creds, 'expiry', None)  # Naive UTC
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            if expiry is not None and expiry - now < timedelta(seconds=TOKEN_REFRESH_MARGIN):
+                if not self.creds.refresh_token:
+                    raise GmailSendError("Access token is expiring and there is no refresh token")
+                self.creds.refresh(Request())
+                self.refreshes += 1
+                if self._owns_token:
+                    save_credentials(self.creds)
+
+    @property
+    def service(self):
+        """This thread's Gmail client (built once per thread from the cached document)"""
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            self.ensure_fresh()
+            with self._lock:
+                if self._document is None:
+                    self._document = load_discovery_document(self.discovery_url, self.cache_path)
+            http = httplib2.Http(timeout=HTTP_TIMEOUT)
+            http.redirect_codes = http.redirect_codes - {308}  # Resumable uploads answer 308, not a redirect
+            http = AuthorizedHttp(self.creds, http=http)
+            service = self._local.service = build_from_document(self._document, http=http)
+        return service
+
+    # --- Sending ---
+
+    def send(self, email: OutgoingEmail) -> SendResult:
+        """Send one email and report the outcome instead of raising"""
+        try:
+            message = StreamingMessage(email.sender, email.to, email.subject, email.body,
+                                       email.cc, email.bcc, email.attachments)
+        except OSError as e:  # A missing attachment will still be missing on a retry
+            return SendResult(email.id, False, 0, f"Could not build message: {e}")
+        try:
+            self.ensure_fresh()
+            result = execute_send(self.service, message, self.max_retries)
+            return SendResult(email.id, True, 1, message_id=result.get('id'))
+        except HttpError as e:
+            return SendResult(email.id, False, 1, f"HTTP {e.resp.status}: {e}",
+                              transient=e.resp.status in TRANSIENT_STATUSES)
+        except Exception as e:
+            transient = isinstance(e, (OSError, httplib2.HttpLib2Error, GoogleAuthError, GmailSendError))
+            return SendResult(email.id, False, 0, f"{type(e).__name__}: {e}", transient=transient)
+
+    def submit(self, email: OutgoingEmail) -> "Future[SendResult]":
+        """Queue one email on the worker pool"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                                thread_name_prefix="gmail-send")
+        return self._executor.submit(self.send, email)
+
+    def send_many(self, emails: Iterable[OutgoingEmail]) -> List[SendResult]:
+        """Send with at most ``concurrency`` requests in flight; results in input order"""
+        self.ensure_fresh()  # Fail fast (and refresh once) before fanning out
+        futures = [self.submit(email) for email in emails]
+        return [future.result() for future in futures]
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
 
 def send_email(service, sender, to, subject, body, cc=None, bcc=None, attachments=None):
-    """Send email via Gmail API"""
+    """Send email via Gmail API; raises GmailSendError on failure"""
     try:
-        message = create_message(sender, to, subject, body, cc, bcc, attachments)
-        result = service.users().messages().send(userId='me', body=message).execute()
+        message = StreamingMessage(sender, to, subject, body, cc, bcc, attachments)
+        result = execute_send(service, message)
         print(f"Email sent successfully. Message ID: {result['id']}")
         return result
     except Exception as e:
-        print(f"Error sending email: {e}")
-        sys.exit(1)
+        raise GmailSendError(f"Error sending email: {e}") from e
+
+
+def send_batch(source: Path, sender: Optional[str] = None, done_dir: Optional[Path] = None,
+               gmail: Optional[GmailSender] = None) -> List[SendResult]:
+    """Send every approved email in ``source`` (directory or JSONL) concurrently"""
+    failures: List[SendResult] = []  # Invalid approvals fail on their own; the rest still go out
+    emails = load_messages(source, sender, failures) if sender else load_messages(source, failures=failures)
+    owns_sender = gmail is None
+    gmail = gmail or GmailSender()
+    try:
+        results = gmail.send_many(emails)
+    finally:
+        if owns_sender:
+            gmail.close()
+
+    if done_dir is not None:
+        done_dir = Path(done_dir)
+        done_dir.mkdir(parents=True, exist_ok=True)
+        for email, result in zip(emails, results):
+            if result.ok and email.source and Path(email.source).suffix == '.md':
+                shutil.move(email.source, done_dir / Path(email.source).name)
+    return failures + results
 
 
 def main():
     parser = argparse.ArgumentParser(description='Send email via Gmail API')
-    parser.add_argument('--from', dest='sender', required=True, help='Sender email address')
-    parser.add_argument('--to', required=True, help='Recipient email address')
-    parser.add_argument('--subject', required=True, help='Email subject')
-    parser.add_argument('--body', required=True, help='Email body')
+    parser.add_argument('--from', dest='sender', help='Sender email address')
+    parser.add_argument('--to', help='Recipient email address')
+    parser.add_argument('--subject', help='Email subject')
+    parser.add_argument('--body', help='Email body')
     parser.add_argument('--cc', help='CC recipients (comma-separated)')
     parser.add_argument('--bcc', help='BCC recipients (comma-separated)')
     parser.add_argument('--attachments', help='Attachment file paths (comma-separated)')
+    parser.add_argument('--batch', help='Send every approved email in a directory (e.g. Approved/) or .jsonl file')
+    parser.add_argument('--done-dir', help='With --batch: move sent approval files here')
+    parser.add_argument('--outbox', action='store_true',
+                        help='With --batch: go through the durable outbox (no resends after a crash, retries later)')
+    parser.add_argument('--concurrency', type=int, default=SEND_CONCURRENCY, help='Parallel sends with --batch')
 
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(name)s - %(levelname)s - %(message)s')
 
-    # Authenticate
-    service = authenticate()
-
-    # Parse attachments
-    attachments = None
-    if args.attachments:
-        attachments = [a.strip() for a in args.attachments.split(',')]
-
-    # Send email
-    send_email(
-        service,
-        args.sender,
-        args.to,
-        args.subject,
-        args.body,
-        args.cc,
-        args.bcc,
-        attachments
-    )
+    try:
+        if args.batch:
+            if args.outbox:
+                from outbox import run_batch
+                stats = run_batch(Path(args.batch), 'gmail', Path(args.done_dir) if args.done_dir else None,
+                                  args.sender, args.concurrency)
+                print(f"{stats.get('sent', 0)} sent, {stats.get('queued', 0)} to retry, {stats.get('dead', 0)} dead, "
+                      f"{stats.get('invalid', 0)} invalid")
+                sys.exit(1 if stats.get('dead') or stats.get('invalid') else 0)
+            with GmailSender(concurrency=args.concurrency) as gmail:
+                results = send_batch(Path(args.batch), args.sender,
+                                     Path(args.done_dir) if args.done_dir else None, gmail)
+            for result in results:
+                status = f"sent ({result.message_id})" if result.ok else f"FAILED: {result.error}"
+                print(f"{result.id}: {status}")
+            failed = sum(1 for result in results if not result.ok)
+            print(f"{len(results) - failed} sent, {failed} failed")
+            sys.exit(1 if failed else 0)
+
+        if not all([args.sender, args.to, args.subject, args.body]):
+            parser.error('--from, --to, --subject and --body are required without --batch')
+
+        # Authenticate
+        service = authenticate()
+
+        # Parse attachments
+        attachments = None
+        if args.attachments:
+            attachments = [a.strip() for a in args.attachments.split(',')]
+
+        # Send email
+        send_email(
+            service,
+            args.sender,
+            args.to,
+            args.subject,
+            args.body,
+            args.cc,
+            args.bcc,
+            attachments
+        )
+    except GmailSendError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
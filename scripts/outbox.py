@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Outbox - Durable queue of approved emails for the SMTP and Gmail senders
+Part of the AI Employee Silver Tier implementation
+
+Approved emails are written to a SQLite outbox (AI_Employee_Vault/Logs/
+outbox.sqlite3) before anything is sent, and worker threads drain it through
+SMTPSender or GmailSender. Every row is keyed by an idempotency key derived
+from the approval (its id plus a hash of its content), so enqueueing the same
+approval again - e.g. after a crash between sending and moving the file to
+Done/ - is a no-op, and the file of an already-sent row is simply moved.
+
+Row lifecycle: queued -> sending -> sent. Transient failures (4xx, 429/5xx,
+network, auth) go back to queued with exponential backoff until
+OUTBOX_MAX_ATTEMPTS; permanent failures go to the dead letter (dead). A row
+left in sending by a worker that died is in doubt - the message may have gone
+out - so after OUTBOX_STALE_AFTER it is dead-lettered instead of resent.
+``retry`` puts dead rows back in the queue once someone has checked.
+
+Usage:
+    python outbox.py enqueue ../AI_Employee_Vault/Approved
+    python outbox.py drain --via smtp --workers 4 --done-dir ../AI_Employee_Vault/Done
+    python outbox.py run ../AI_Employee_Vault/Approved --via gmail --done-dir ../AI_Employee_Vault/Done
+    python outbox.py serve ../AI_Employee_Vault/Approved --via gmail --done-dir ../AI_Employee_Vault/Done
+    python outbox.py status
+    python outbox.py retry <key> | --all-dead
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import shutil
+import sqlite3
+import hashlib
+import logging
+import argparse
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from approved_messages import OutgoingEmail, SendResult, load_messages
+
+logger = logging.getLogger("Outbox")
+
+# Configuration from environment
+VAULT_PATH = Path(__file__).resolve().parent.parent / 'AI_Employee_Vault'
+OUTBOX_DB = Path(os.getenv('OUTBOX_DB') or VAULT_PATH / 'Logs' / 'outbox.sqlite3')
+OUTBOX_WORKERS = int(os.getenv('OUTBOX_WORKERS', '4'))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '6'))
+OUTBOX_STALE_AFTER = int(os.getenv('OUTBOX_STALE_AFTER', '900'))  # seconds in 'sending' before a row is in doubt
+RETRY_BASE_DELAY = 60  # seconds; doubles on every attempt
+RETRY_MAX_DELAY = 3600  # seconds
+POLL_INTERVAL = 5  # seconds between passes in serve mode
+
+QUEUED, SENDING, SENT, DEAD = 'queued', 'sending', 'sent', 'dead'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    key TEXT PRIMARY KEY,
+    message TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    claimed_by TEXT,
+    claimed_at REAL,
+    last_error TEXT,
+    provider_id TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt);
+"""
+
+
+class OutboxItem(NamedTuple):
+    """One outbox row"""
+    key: str
+    email: OutgoingEmail
+    status: str
+    attempts: int = 0
+    error: Optional[str] = None
+    provider_id: Optional[str] = None
+
+
+def idempotency_key(email: OutgoingEmail) -> str:
+    """Approval id plus a hash of everything that ends up in the message"""
+    content = json.dumps([email.id, email.sender, email.to, email.cc, email.bcc, email.subject,
+                          email.body, [Path(item).name for item in email.attachments]])
+    return f"{email.id}:{hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]}"
+
+
+def _email_from_json(text: str) -> OutgoingEmail:
+    data = json.loads(text)
+    data['attachments'] = tuple(data.get('attachments') or ())
+    return OutgoingEmail(**data)
+
+
+def move_to_done(email: OutgoingEmail, done_dir: Optional[Path]):
+    """Move the approval file of a sent email to ``done_dir`` (JSONL sources stay put)"""
+    if done_dir is None or not email.source or Path(email.source).suffix != '.md':
+        return
+    source = Path(email.source)
+    if source.exists():
+        Path(done_dir).mkdir(parents=True, exist_ok=True)
+        shutil.move(str(source), str(Path(done_dir) / source.name))
+
+
+class Outbox:
+    """SQLite outbox shared by any number of worker threads and processes"""
+
+    def __init__(self, db_path: Path = OUTBOX_DB, max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+                 retry_delay: float = RETRY_BASE_DELAY, max_delay: float = RETRY_MAX_DELAY,
+                 stale_after: float = OUTBOX_STALE_AFTER):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_delay = max_delay
+        self.stale_after = stale_after
+        self._lock = threading.Lock()  # One connection, shared by the worker threads
+        # Autocommit mode; _transaction() issues BEGIN IMMEDIATE so claims are exclusive across processes
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=FULL')  # A lost 'sent' row would mean a resend
+        self._conn.executescript(SCHEMA)
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+
+    # --- Queue operations ---
+
+    def enqueue(self, emails: Iterable[OutgoingEmail]) -> Tuple[List[OutboxItem], List[OutboxItem]]:
+        """Add emails that are not in the outbox yet; returns (added, already present as they stand)"""
+        now = time.time()
+        added, existing = [], []
+        with self._transaction() as conn:
+            for email in emails:
+                key = idempotency_key(email)
+                inserted = conn.execute(
+                    'INSERT OR IGNORE INTO outbox (key, message, status, next_attempt, created_at, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (key, json.dumps(email._asdict()), QUEUED, now, now, now)).rowcount
+                if inserted:
+                    added.append(OutboxItem(key, email, QUEUED))
+                else:
+                    status, attempts, error, provider_id = conn.execute(
+                        'SELECT status, attempts, last_error, provider_id FROM outbox WHERE key = ?',
+                        (key,)).fetchone()
+                    existing.append(OutboxItem(key, email, status, attempts, error, provider_id))
+        return added, existing
+
+    def claim(self, worker: str, key: Optional[str] = None) -> Optional[OutboxItem]:
+        """Take the oldest due row, or the row ``key`` if it is due (queued -> sending); None if nothing is"""
+        now = time.time()
+        query = 'SELECT key, message, attempts FROM outbox WHERE status = ? AND next_attempt <= ?'
+        params = [QUEUED, now]
+        if key is not None:
+            query += ' AND key = ?'
+            params.append(key)
+        with self._transaction() as conn:
+            row = conn.execute(query + ' ORDER BY next_attempt, created_at LIMIT 1', params).fetchone()
+            if row is None:
+                return None
+            key, message, attempts = row
+            conn.execute(
+                'UPDATE outbox SET status = ?, attempts = attempts + 1, claimed_by = ?, '
+                'claimed_at = ?, updated_at = ? WHERE key = ?', (SENDING, worker, now, now, key))
+        return OutboxItem(key, _email_from_json(message), SENDING, attempts + 1)
+
+    def retry_delay_for(self, attempts: int) -> float:
+        return min(self.retry_delay * 2 ** (attempts - 1), self.max_delay)
+
+    def record(self, item: OutboxItem, result: SendResult) -> OutboxItem:
+        """Store the outcome of a claimed row's send attempt; returns the updated row"""
+        now = time.time()
+        if result.ok:
+            status, next_attempt = SENT, now
+            error = f"Refused: {', '.join(map(str, result.refused))}" if result.refused else None
+        elif result.transient and item.attempts < self.max_attempts:
+            status, next_attempt, error = QUEUED, now + self.retry_delay_for(item.attempts), result.error
+        else:
+            status, next_attempt, error = DEAD, now, result.error
+        with self._transaction() as conn:
+            conn.execute(
+                'UPDATE outbox SET status = ?, next_attempt = ?, last_error = ?, provider_id = ?, '
+                'claimed_by = NULL, updated_at = ? WHERE key = ?',
+                (status, next_attempt, error, result.message_id, now, item.key))
+        return item._replace(status=status, error=error, provider_id=result.message_id)
+
+    def release(self, item: OutboxItem):
+        """Put a claimed row back without counting the attempt (it was never sent)"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                'UPDATE outbox SET status = ?, attempts = attempts - 1, next_attempt = ?, '
+                'claimed_by = NULL, updated_at = ? WHERE key = ? AND status = ?',
+                (QUEUED, now, now, item.key, SENDING))
+
+    def recover_stale(self) -> int:
+        """Dead-letter rows stuck in 'sending' (their worker died mid-send, so they are in doubt)"""
+        now = time.time()
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE outbox SET status = ?, last_error = 'In doubt: worker ' || "
+                "COALESCE(claimed_by, '?') || ' stopped while sending; check Sent before retrying', "
+                'claimed_by = NULL, updated_at = ? WHERE status = ? AND claimed_at < ?',
+                (DEAD, now, SENDING, now - self.stale_after)).rowcount
+
+    def retry(self, key: Optional[str] = None) -> int:
+        """Requeue one dead row (or all of them) with a fresh attempt budget"""
+        now = time.time()
+        query = ('UPDATE outbox SET status = ?, attempts = 0, next_attempt = ?, last_error = NULL, '
+                 'updated_at = ? WHERE status = ?')
+        params = [QUEUED, now, now, DEAD]
+        if key is not None:
+            query += ' AND key = ?'
+            params.append(key)
+        with self._transaction() as conn:
+            return conn.execute(query, params).rowcount
+
+    def next_due(self) -> Optional[float]:
+        """When the next queued row becomes due (None if nothing is queued)"""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT MIN(next_attempt) FROM outbox WHERE status = ?', (QUEUED,)).fetchone()[0]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute('SELECT status, COUNT(*) FROM outbox GROUP BY status')
+            return {status: count for status, count in rows}
+
+    def items(self, status: str) -> List[OutboxItem]:
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT key, message, status, attempts, last_error, provider_id FROM outbox '
+                'WHERE status = ? ORDER BY updated_at', (status,)).fetchall()
+        return [OutboxItem(key, _email_from_json(message), status, attempts, error, provider_id)
+                for key, message, status, attempts, error, provider_id in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Workers ---
+
+    def deliver(self, item: OutboxItem, sender, done_dir: Optional[Path] = None) -> Optional[OutboxItem]:
+        """Send a claimed row and record the outcome; None if it was released unsent (SMTP login failed)"""
+        result = sender.send(item.email)
+        if not result.ok and getattr(sender, 'auth_failed', False):
+            self.release(item)  # Login failed before anything was sent
+            logger.warning(f"{item.email.id}: not sent, SMTP login failed")
+            return None
+        item = self.record(item, result)
+        if item.status == SENT:
+            move_to_done(item.email, done_dir)
+            logger.info(f"{item.email.id}: sent (attempt {item.attempts})")
+        elif item.status == QUEUED:
+            logger.warning(f"{item.email.id}: retry in {self.retry_delay_for(item.attempts):.0f}s ({item.error})")
+        else:
+            logger.error(f"{item.email.id}: DEAD after {item.attempts} attempt(s): {item.error}")
+        return item
+
+    def _work(self, name: str, make_sender: Callable, done_dir: Optional[Path], wait_for_retries: bool,
+              stop: threading.Event, stats: Dict[str, int], on_result: Optional[Callable]):
+        sender = make_sender()
+        try:
+            while not stop.is_set():
+                item = self.claim(name)
+                if item is None:
+                    due = self.next_due()
+                    if due is None or (not wait_for_retries and due > time.time()):
+                        return  # Nothing left that this pass should send
+                    stop.wait(min(max(due - time.time(), 0.05), POLL_INTERVAL))
+                    continue
+
+                item = self.deliver(item, sender, done_dir)
+                if item is None:
+                    return  # Every later message would fail the same login
+                if on_result is not None:
+                    on_result(item)
+                with self._lock:
+                    stats[item.status] = stats.get(item.status, 0) + 1
+        finally:
+            sender.close()
+
+    def drain(self, make_sender: Callable, workers: int = OUTBOX_WORKERS, done_dir: Optional[Path] = None,
+              wait_for_retries: bool = False, stop: Optional[threading.Event] = None,
+              on_result: Optional[Callable[[OutboxItem], None]] = None) -> Dict[str, int]:
+        """
+        Send due rows on ``workers`` threads, each with its own sender from
+        ``make_sender()``. Returns per-status counts for this pass. Rows
+        waiting for a later retry are left for the next pass unless
+        ``wait_for_retries`` is set. ``on_result`` is called with every
+        updated row.
+        """
+        stop = stop or threading.Event()
+        recovered = self.recover_stale()
+        if recovered:
+            logger.warning(f"Dead-lettered {recovered} in-doubt message(s) left in 'sending' by a stopped worker")
+        stats: Dict[str, int] = {}
+        threads = [threading.Thread(target=self._work, name=f"outbox-{i}", daemon=True,
+                                    args=(f"{self.worker_prefix}:{i}", make_sender, done_dir,
+                                          wait_for_retries, stop, stats, on_result))
+                   for i in range(max(1, workers))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return stats
+
+
+def sender_factory(via: str, workers: int = OUTBOX_WORKERS) -> Callable:
+    """make_sender for Outbox.drain: an SMTPSender per worker, or one shared GmailSender"""
+    if via == 'smtp':
+        from send_smtp import SMTPSender, SMTP_RATE_LIMIT, _require_credentials
+        _require_credentials()
+        rate_limit = SMTP_RATE_LIMIT / max(1, workers)  # SMTP_RATE_LIMIT applies to all workers together
+        return lambda: SMTPSender(rate_limit=rate_limit)
+    from gmail_api import GmailSender
+    gmail = GmailSender(concurrency=1)  # Thread-safe: each worker thread gets its own client
+    gmail.ensure_fresh()
+    return lambda: gmail
+
+
+def enqueue_source(outbox: Outbox, source: Path, sender: Optional[str] = None,
+                   done_dir: Optional[Path] = None, failures: Optional[List[SendResult]] = None) -> int:
+    """
+    Enqueue the approved emails in ``source``; returns how many were new.
+    Invalid approvals are skipped and added to ``failures`` (printed when it is not given).
+    """
+    invalid: List[SendResult] = []
+    emails = load_messages(source, sender, invalid) if sender else load_messages(source, failures=invalid)
+    if failures is None:
+        for result in invalid:
+            print(f"{result.id}: not queued: {result.error}")
+    else:
+        failures.extend(invalid)
+    added, existing = outbox.enqueue(emails)
+    for item in existing:
+        if item.status == SENT:
+            move_to_done(item.email, done_dir)  # Sent before a crash, but never moved
+    return len(added)
+
+
+def run_batch(source: Path, via: str, done_dir: Optional[Path] = None, sender: Optional[str] = None,
+              workers: int = OUTBOX_WORKERS, db_path: Path = OUTBOX_DB) -> Dict[str, int]:
+    """Enqueue ``source`` and drain the outbox once (what --batch --outbox does in both senders)"""
+    with Outbox(db_path) as outbox:
+        invalid: List[SendResult] = []
+        added = enqueue_source(outbox, source, sender, done_dir, invalid)
+        for result in invalid:
+            print(f"{result.id}: not queued: {result.error}")
+        print(f"Queued {added} new email(s)")
+        stats = outbox.drain(sender_factory(via, workers), workers, done_dir)
+        stats['invalid'] = len(invalid)
+        return stats
+
+
+def serve(outbox: Outbox, source: Optional[Path], via: str, done_dir: Optional[Path],
+          sender: Optional[str], workers: int):
+    """Enqueue new approvals and drain due rows every POLL_INTERVAL until interrupted"""
+    make_sender = sender_factory(via, workers)
+    reported: Set[str] = set()  # Invalid approvals already printed; they are re-read every poll
+    stop = threading.Event()
+    print(f"Serving outbox {outbox.db_path} via {via} with {workers} worker(s) (Ctrl+C to stop)")
+    try:
+        while not stop.is_set():
+            if source is not None:
+                invalid: List[SendResult] = []
+                enqueue_source(outbox, source, sender, done_dir, invalid)
+                for result in invalid:
+                    if result.id not in reported:
+                        reported.add(result.id)
+                        print(f"{result.id}: not queued: {result.error}")
+            outbox.drain(make_sender, workers, done_dir, stop=stop)
+            stop.wait(POLL_INTERVAL)
+    except KeyboardInterrupt:
+        stop.set()
+        print("Stopping")
+
+
+def print_counts(outbox: Outbox):
+    counts = outbox.counts()
+    print(', '.join(f"{status}: {counts.get(status, 0)}" for status in (QUEUED, SENDING, SENT, DEAD)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Durable outbox for approved emails')
+    parser.add_argument('--db', default=str(OUTBOX_DB), help='Outbox database path')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = commands.add_parser('enqueue', help='Queue approved emails from a directory or .jsonl file')
+    enqueue.add_argument('source')
+    drain = commands.add_parser('drain', help='Send every due message once')
+    run = commands.add_parser('run', help='enqueue, then drain')
+    run.add_argument('source')
+    serve_parser = commands.add_parser('serve', help='enqueue and drain every few seconds')
+    serve_parser.add_argument('source', nargs='?')
+    for command in (enqueue, drain, run, serve_parser):
+        command.add_argument('--done-dir', help='Move approval files of sent emails here')
+    for command in (enqueue, run, serve_parser):
+        command.add_argument('--from', dest='sender', help='Sender address when the approval has none')
+    for command in (drain, run, serve_parser):
+        command.add_argument('--via', choices=['smtp', 'gmail'], default='gmail')
+        command.add_argument('--workers', type=int, default=OUTBOX_WORKERS)
+    commands.add_parser('status', help='Counts per status and the dead letter')
+    retry = commands.add_parser('retry', help='Requeue dead-lettered messages')
+    retry.add_argument('key', nargs='?')
+    retry.add_argument('--all-dead', action='store_true')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(name)s - %(levelname)s - %(message)s')
+    done_dir = Path(args.done_dir) if getattr(args, 'done_dir', None) else None
+    if args.command == 'retry' and not args.key and not args.all_dead:
+        parser.error('give a key or --all-dead')
+
+    try:
+        with Outbox(Path(args.db)) as outbox:
+            if args.command in ('enqueue', 'run'):
+                added = enqueue_source(outbox, Path(args.source), args.sender, done_dir)
+                print(f"Queued {added} new email(s)")
+            if args.command == 'enqueue':
+                print_counts(outbox)
+            elif args.command in ('drain', 'run'):
+                stats = outbox.drain(sender_factory(args.via, args.workers), args.workers, done_dir)
+                print(f"{stats.get(SENT, 0)} sent, {stats.get(QUEUED, 0)} to retry, {stats.get(DEAD, 0)} dead")
+                sys.exit(1 if stats.get(DEAD) else 0)
+            elif args.command == 'serve':
+                serve(outbox, Path(args.source) if args.source else None, args.via, done_dir,
+                      args.sender, args.workers)
+            elif args.command == 'status':
+                print_counts(outbox)
+                for item in outbox.items(DEAD):
+                    print(f"  dead {item.key}: {item.error}")
+            elif args.command == 'retry':
+                print(f"Requeued {outbox.retry(None if args.all_dead else args.key)} message(s)")
+    except Exception as e:
+        print(f"Outbox error: {type(e).__name__}: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,117 +2,321 @@
 """
 SMTP Email Sender - Fallback email sending via SMTP
 Part of the AI Employee Silver Tier implementation
+
+SMTPSender keeps one authenticated connection open and reuses it for every
+message, reconnecting when the server drops it or after
+SMTP_MAX_PER_CONNECTION messages. Transient failures (4xx replies,
+disconnects) are retried with exponential backoff; sends are spaced to at
+most SMTP_RATE_LIMIT messages per second. Library calls raise SMTPSendError
+instead of exiting, so callers can send many messages in one process.
+Messages are streamed into DATA (see streaming_mime.py), so attachments
+of any size are sent with bounded memory.
+
+Usage:
+    python send_smtp.py --from me@x.com --to you@y.com --subject Hi --body Hello
+    python send_smtp.py --batch ../AI_Employee_Vault/Approved --done-dir ../AI_Employee_Vault/Done
+    python send_smtp.py --batch outbox.jsonl
+    python send_smtp.py --batch ../AI_Employee_Vault/Approved --done-dir ../AI_Employee_Vault/Done --outbox
 """
 
 import os
 import sys
-import argparse
+import time
+import shutil
+import logging
 import smtplib
+import argparse
 from pathlib import Path
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
+from typing import Iterable, List, Optional
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+from approved_messages import OutgoingEmail, SendResult, load_messages
+from streaming_mime import StreamingMessage, send_smtp_streaming
+
+logger = logging.getLogger("SMTPSender")
+
 # Configuration from environment
 SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
 SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
 SMTP_USERNAME = os.getenv('SMTP_USERNAME')
 SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
+# STARTTLS on the plain port; port 465 uses implicit TLS instead
+SMTP_STARTTLS = os.getenv('SMTP_STARTTLS', 'true').lower() == 'true'
+SMTP_RATE_LIMIT = float(os.getenv('SMTP_RATE_LIMIT', '1'))  # messages per second, 0 = unlimited
+SMTP_MAX_PER_CONNECTION = int(os.getenv('SMTP_MAX_PER_CONNECTION', '100'))
+SMTP_TIMEOUT = 30  # seconds
+MAX_RETRIES = 3  # Retries per message after a transient failure
+RETRY_BASE_DELAY = 2  # seconds; doubles on every retry
 
 
-def send_email_smtp(sender, to, subject, body, cc=None, bcc=None, attachments=None):
-    """Send email via SMTP"""
+class SMTPSendError(Exception):
+    """Sending failed; ``transient`` is True when a later retry may succeed"""
 
-    if not SMTP_USERNAME or not SMTP_PASSWORD:
-        print("Error: SMTP credentials not configured.")
-        print("Set SMTP_USERNAME and SMTP_PASSWORD in .env file")
-        sys.exit(1)
+    def __init__(self, message: str, transient: bool = False, code: Optional[int] = None):
+        super().__init__(message)
+        self.transient = transient
+        self.code = code
+        self.attempts = 0
+
+
+def build_message(sender, to, subject, body, cc=None, bcc=None, attachments=None) -> StreamingMessage:
+    """Create the message; attachments are encoded while it is sent, not here"""
+    return StreamingMessage(sender, to, subject, body, cc, bcc, attachments)
+
+
+def _classify(error: Exception) -> SMTPSendError:
+    """Wrap an smtplib/socket error, marking 4xx replies and dropped connections as transient"""
+    if isinstance(error, SMTPSendError):
+        return error
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        transient = bool(codes) and all(400 <= code < 500 for code in codes)
+        return SMTPSendError(f"All recipients refused: {error.recipients}", transient, max(codes, default=None))
+    if isinstance(error, smtplib.SMTPResponseException):
+        message = error.smtp_error.decode(errors='replace') if isinstance(error.smtp_error, bytes) else error.smtp_error
+        return SMTPSendError(f"{error.smtp_code} {message}", 400 <= error.smtp_code < 500, error.smtp_code)
+    if isinstance(error, (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)):
+        return SMTPSendError(f"Connection lost: {error}", transient=True)
+    return SMTPSendError(str(error) or type(error).__name__)
+
+
+class SMTPSender:
+    """One reusable, authenticated SMTP connection with retries and rate limiting"""
+
+    def __init__(self, server: str = SMTP_SERVER, port: int = SMTP_PORT,
+                 username: Optional[str] = SMTP_USERNAME, password: Optional[str] = SMTP_PASSWORD,
+                 starttls: bool = SMTP_STARTTLS, rate_limit: float = SMTP_RATE_LIMIT,
+                 max_per_connection: int = SMTP_MAX_PER_CONNECTION, max_retries: int = MAX_RETRIES,
+                 retry_delay: float = RETRY_BASE_DELAY, timeout: float = SMTP_TIMEOUT):
+        self.server = server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.min_gap = 1 / rate_limit if rate_limit > 0 else 0.0
+        self.max_per_connection = max_per_connection
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.connection: Optional[smtplib.SMTP] = None
+        self.connections = 0  # Opened so far (for stats and tests)
+        self.auth_failed = False
+        self._sent_on_connection = 0
+        self._last_send = float('-inf')
+
+    # --- Connection ---
+
+    def connect(self) -> smtplib.SMTP:
+        """Open, secure and authenticate a connection (reused until closed or dropped)"""
+        if self.connection is not None:
+            return self.connection
+        try:
+            if self.port == 465:
+                connection = smtplib.SMTP_SSL(self.server, self.port, timeout=self.timeout)
+            else:
+                connection = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+                if self.starttls:
+                    connection.starttls()
+            if self.username:
+                connection.login(self.username, self.password or '')
+        except smtplib.SMTPAuthenticationError as e:
+            self.auth_failed = True
+            raise SMTPSendError(f"SMTP login failed: {e}", transient=False, code=e.smtp_code) from e
+        except (smtplib.SMTPException, OSError) as e:
+            raise SMTPSendError(f"Could not connect to {self.server}:{self.port}: {e}", transient=True) from e
+        self.connection = connection
+        self.connections += 1
+        self._sent_on_connection = 0
+        return connection
+
+    def close(self):
+        """QUIT the connection if one is open"""
+        connection, self.connection = self.connection, None
+        if connection is None:
+            return
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, OSError):
+            connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
-    # Create message
-    message = MIMEMultipart()
-    message['From'] = sender
-    message['To'] = to
-    message['Subject'] = subject
-
-    if cc:
-        message['Cc'] = cc
-    if bcc:
-        message['Bcc'] = bcc
-
-    # Add body
-    message.attach(MIMEText(body, 'plain'))
-
-    # Add attachments
-    if attachments:
-        for filepath in attachments:
-            filepath = Path(filepath)
-            if not filepath.exists():
-                print(f"Warning: Attachment not found: {filepath}")
+    # --- Sending ---
+
+    def _throttle(self):
+        wait = self._last_send + self.min_gap - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self._last_send = time.monotonic()
+
+    def _send_once(self, message: StreamingMessage, sender: str, recipients: List[str]) -> dict:
+        if self.connection is not None and self._sent_on_connection >= self.max_per_connection:
+            self.close()  # Servers cap messages per session; start a fresh one
+        connection = self.connect()
+        self._throttle()
+        try:
+            refused = send_smtp_streaming(connection, sender, recipients, message)
+        except smtplib.SMTPServerDisconnected:
+            self.connection = None  # Reconnect on the retry
+            raise
+        except smtplib.SMTPException:  # A reply error; the session itself is still usable
+            try:
+                connection.rset()
+            except (smtplib.SMTPException, OSError):
+                self.connection = None
+            raise
+        except OSError:  # Socket error, or an attachment became unreadable mid-DATA
+            connection.close()
+            self.connection = None
+            raise
+        self._sent_on_connection += 1
+        return refused
+
+    def send_message(self, message: StreamingMessage, sender: str, recipients: List[str]) -> SendResult:
+        """Send a built message, retrying transient failures; raises SMTPSendError when it gives up"""
+        message_id = message.subject or ''
+        for attempt in range(1, self.max_retries + 2):
+            try:
+                refused = self._send_once(message, sender, recipients)
+                return SendResult(message_id, True, attempt, refused=tuple(refused))
+            except Exception as e:
+                error = _classify(e)
+                if not error.transient or attempt > self.max_retries:
+                    error.attempts = attempt
+                    raise error from e
+                delay = self.retry_delay * 2 ** (attempt - 1)
+                logger.warning(f"Transient SMTP error ({error}); retrying in {delay:.0f}s")
+                time.sleep(delay)
+
+    def send(self, email: OutgoingEmail) -> SendResult:
+        """Send one OutgoingEmail and report the outcome instead of raising"""
+        try:
+            message = build_message(email.sender, email.to, email.subject, email.body,
+                                    email.cc, email.bcc, email.attachments)
+            result = self.send_message(message, email.sender, email.recipients())
+            return result._replace(id=email.id)
+        except SMTPSendError as e:
+            return SendResult(email.id, False, e.attempts, str(e), transient=e.transient)
+        except OSError as e:
+            return SendResult(email.id, False, 0, f"Could not build message: {e}")
+
+    def send_many(self, emails: Iterable[OutgoingEmail]) -> List[SendResult]:
+        """Send every email over the pooled connection; one result per email, in order"""
+        emails = list(emails)
+        results = []
+        for email in emails:
+            if self.auth_failed:
+                # Bad credentials fail every message the same way
+                results.append(SendResult(email.id, False, 0, 'Skipped after SMTP login failure',
+                                          transient=True))
                 continue
+            results.append(self.send(email))
+        return results
 
-            with open(filepath, 'rb') as f:
-                part = MIMEBase('application', 'octet-stream')
-                part.set_payload(f.read())
-                encoders.encode_base64(part)
-                part.add_header(
-                    'Content-Disposition',
-                    f'attachment; filename={filepath.name}'
-                )
-                message.attach(part)
-
-    # Send email
-    try:
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USERNAME, SMTP_PASSWORD)
 
-            # Collect all recipients
-            recipients = [to]
-            if cc:
-                recipients.extend([r.strip() for r in cc.split(',')])
-            if bcc:
-                recipients.extend([r.strip() for r in bcc.split(',')])
+def _require_credentials():
+    if not SMTP_USERNAME or not SMTP_PASSWORD:
+        raise SMTPSendError("SMTP credentials not configured. Set SMTP_USERNAME and SMTP_PASSWORD in .env file")
 
-            server.sendmail(sender, recipients, message.as_string())
-            print(f"Email sent successfully via SMTP to {to}")
 
-    except Exception as e:
-        print(f"Error sending email via SMTP: {e}")
-        sys.exit(1)
+def send_email_smtp(sender, to, subject, body, cc=None, bcc=None, attachments=None) -> SendResult:
+    """Send a single email via SMTP; raises SMTPSendError on failure"""
+    _require_credentials()
+    email = OutgoingEmail('', sender, to, subject, body, cc, bcc, tuple(attachments or ()))
+    with SMTPSender() as smtp:
+        result = smtp.send_message(build_message(*email[1:8]), sender, email.recipients())
+    print(f"Email sent successfully via SMTP to {to}")
+    return result
+
+
+def send_batch(source: Path, sender: Optional[str] = None, done_dir: Optional[Path] = None,
+               smtp: Optional[SMTPSender] = None) -> List[SendResult]:
+    """Send every approved email in ``source`` (directory or JSONL) over one connection"""
+    failures: List[SendResult] = []  # Invalid approvals fail on their own; the rest still go out
+    emails = load_messages(source, sender, failures) if sender else load_messages(source, failures=failures)
+    owns_sender = smtp is None
+    smtp = smtp or SMTPSender()
+    try:
+        results = smtp.send_many(emails)
+    finally:
+        if owns_sender:
+            smtp.close()
+
+    if done_dir is not None:
+        done_dir = Path(done_dir)
+        done_dir.mkdir(parents=True, exist_ok=True)
+        for email, result in zip(emails, results):
+            if result.ok and email.source and Path(email.source).suffix == '.md':
+                shutil.move(email.source, done_dir / Path(email.source).name)
+    return failures + results
 
 
 def main():
     parser = argparse.ArgumentParser(description='Send email via SMTP')
-    parser.add_argument('--from', dest='sender', required=True, help='Sender email address')
-    parser.add_argument('--to', required=True, help='Recipient email address')
-    parser.add_argument('--subject', required=True, help='Email subject')
-    parser.add_argument('--body', required=True, help='Email body')
+    parser.add_argument('--from', dest='sender', help='Sender email address')
+    parser.add_argument('--to', help='Recipient email address')
+    parser.add_argument('--subject', help='Email subject')
+    parser.add_argument('--body', help='Email body')
     parser.add_argument('--cc', help='CC recipients (comma-separated)')
     parser.add_argument('--bcc', help='BCC recipients (comma-separated)')
     parser.add_argument('--attachments', help='Attachment file paths (comma-separated)')
+    parser.add_argument('--batch', help='Send every approved email in a directory (e.g. Approved/) or .jsonl file')
+    parser.add_argument('--done-dir', help='With --batch: move sent approval files here')
+    parser.add_argument('--outbox', action='store_true',
+                        help='With --batch: go through the durable outbox (no resends after a crash, retries later)')
+    parser.add_argument('--workers', type=int, default=4, help='With --outbox: parallel SMTP connections')
 
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(name)s - %(levelname)s - %(message)s')
+
+    try:
+        if args.batch:
+            _require_credentials()
+            if args.outbox:
+                from outbox import run_batch
+                stats = run_batch(Path(args.batch), 'smtp', Path(args.done_dir) if args.done_dir else None,
+                                  args.sender, args.workers)
+                print(f"{stats.get('sent', 0)} sent, {stats.get('queued', 0)} to retry, {stats.get('dead', 0)} dead, "
+                      f"{stats.get('invalid', 0)} invalid")
+                sys.exit(1 if stats.get('dead') or stats.get('invalid') else 0)
+            results = send_batch(Path(args.batch), args.sender,
+                                 Path(args.done_dir) if args.done_dir else None)
+            for result in results:
+                status = f"sent (attempt {result.attempts})" if result.ok else f"FAILED: {result.error}"
+                refused = f", refused {list(result.refused)}" if result.refused else ''
+                print(f"{result.id}: {status}{refused}")
+            failed = sum(1 for result in results if not result.ok)
+            print(f"{len(results) - failed} sent, {failed} failed")
+            sys.exit(1 if failed else 0)
 
-    # Parse attachments
-    attachments = None
-    if args.attachments:
-        attachments = [a.strip() for a in args.attachments.split(',')]
-
-    # Send email
-    send_email_smtp(
-        args.sender,
-        args.to,
-        args.subject,
-        args.body,
-        args.cc,
-        args.bcc,
-        attachments
-    )
+        if not all([args.sender, args.to, args.subject, args.body]):
+            parser.error('--from, --to, --subject and --body are required without --batch')
+
+        # Parse attachments
+        attachments = None
+        if args.attachments:
+            attachments = [a.strip() for a in args.attachments.split(',')]
+
+        # Send email
+        send_email_smtp(
+            args.sender,
+            args.to,
+            args.subject,
+            args.body,
+            args.cc,
+            args.bcc,
+            attachments
+        )
+    except SMTPSendError as e:
+        print(f"Error sending email via SMTP: {e}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
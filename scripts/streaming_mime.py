@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Streaming MIME - Build outgoing emails without holding attachments in memory
+Part of the AI Employee Silver Tier implementation
+
+StreamingMessage produces a multipart/mixed message as a series of byte
+chunks. Attachments are read and base64-encoded CHUNK_SIZE bytes at a time,
+so memory use stays bounded regardless of attachment size. The chunks can go
+straight into an SMTP DATA command (send_smtp_streaming, which also does the
+dot-stuffing smtplib would) or into a temp file for Gmail's resumable media
+upload (write_temp_file). A missing attachment raises FileNotFoundError
+when the message is built, so the send fails instead of going out without it.
+"""
+
+import os
+import errno
+import re
+import base64
+import smtplib
+import tempfile
+import mimetypes
+from pathlib import Path
+from email import policy
+from email.mime.base import MIMEBase
+from email.mime.text import MIMEText
+from email.utils import formatdate, make_msgid
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+CHUNK_SIZE = 57 * 1024  # Multiple of 57 so every chunk encodes to whole 76-char base64 lines
+LINE_BYTES = 76
+CRLF = b'\r\n'
+_LINE_START_DOT = re.compile(rb'\n\.')
+
+
+def _header_bytes(items) -> bytes:
+    """Fold and encode headers (RFC 2047 for non-ASCII) with CRLF line endings"""
+    return b''.join(policy.SMTP.fold_binary(name, value) for name, value in items)
+
+
+def _base64_lines(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Base64 of a file as CRLF-terminated 76-char lines, one chunk at a time"""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            encoded = base64.b64encode(chunk)
+            yield CRLF.join(encoded[i:i + LINE_BYTES] for i in range(0, len(encoded), LINE_BYTES)) + CRLF
+
+
+class StreamingMessage:
+    """A multipart/mixed email whose attachments are encoded on the fly"""
+
+    def __init__(self, sender: str, to: str, subject: str, body: str, cc: Optional[str] = None,
+                 bcc: Optional[str] = None, attachments: Optional[Sequence] = None,
+                 chunk_size: int = CHUNK_SIZE):
+        self.sender = sender
+        self.to = to
+        self.subject = subject
+        self.body = body
+        self.cc = cc
+        self.bcc = bcc
+        self.chunk_size = chunk_size
+        self.attachments: List[Path] = []
+        for filepath in attachments or ():
+            filepath = Path(filepath)
+            if not filepath.is_file():
+                raise FileNotFoundError(errno.ENOENT, "Attachment not found", str(filepath))
+            self.attachments.append(filepath)
+        self.boundary = f"===============_{os.urandom(12).hex()}=="
+        self.date = formatdate(localtime=True)
+        self.message_id = make_msgid()
+
+    def headers(self, include_bcc: bool = False) -> List[Tuple[str, str]]:
+        items = [('From', self.sender), ('To', self.to)]
+        if self.cc:
+            items.append(('Cc', self.cc))
+        if self.bcc and include_bcc:
+            items.append(('Bcc', self.bcc))
+        items += [
+            ('Subject', self.subject),
+            ('Date', self.date),
+            ('Message-ID', self.message_id),
+            ('MIME-Version', '1.0'),
+            ('Content-Type', f'multipart/mixed; boundary="{self.boundary}"'),
+        ]
+        return items
+
+    def recipients(self) -> List[str]:
+        return [address.strip() for field in (self.to, self.cc, self.bcc) if field
+                for address in field.split(',') if address.strip()]
+
+    def estimated_size(self) -> int:
+        """Approximate encoded size in bytes (base64 grows attachments by about 4/3)"""
+        attachments = sum(path.stat().st_size for path in self.attachments)
+        return len(self.body.encode('utf-8')) * 2 + attachments * 4 // 3 + 4096
+
+    def _attachment_headers(self, path: Path) -> bytes:
+        content_type, encoding = mimetypes.guess_type(path.name)
+        if content_type is None or encoding is not None:
+            content_type = 'application/octet-stream'
+        part = MIMEBase(*content_type.split('/', 1))
+        part['Content-Transfer-Encoding'] = 'base64'
+        part.add_header('Content-Disposition', 'attachment', filename=path.name)
+        return _header_bytes(part.items())
+
+    def chunks(self, include_bcc: bool = False) -> Iterator[bytes]:
+        """The whole message as CRLF-terminated byte chunks"""
+        delimiter = b'--' + self.boundary.encode('ascii')
+        yield _header_bytes(self.headers(include_bcc)) + CRLF
+        text = MIMEText(self.body, 'plain')
+        yield delimiter + CRLF + text.as_bytes(policy=policy.SMTP).rstrip(CRLF) + CRLF
+        for path in self.attachments:
+            yield delimiter + CRLF + self._attachment_headers(path) + CRLF
+            yield from _base64_lines(path, self.chunk_size)
+        yield delimiter + b'--' + CRLF
+
+    def as_bytes(self, include_bcc: bool = False) -> bytes:
+        """Whole message in memory; only for small messages"""
+        return b''.join(self.chunks(include_bcc))
+
+    def write_to(self, f, include_bcc: bool = False):
+        for chunk in self.chunks(include_bcc):
+            f.write(chunk)
+
+    def write_temp_file(self, include_bcc: bool = True) -> Path:
+        """Write the message to a temp .eml file (caller deletes it)"""
+        fd, name = tempfile.mkstemp(suffix='.eml', prefix='outgoing_')
+        with os.fdopen(fd, 'wb') as f:
+            self.write_to(f, include_bcc)
+        return Path(name)
+
+
+def dot_stuff(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Double every '.' that starts a line (RFC 5321 4.5.2), across chunk boundaries"""
+    at_line_start = True
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if at_line_start and chunk.startswith(b'.'):
+            chunk = b'.' + chunk
+        yield _LINE_START_DOT.sub(b'\n..', chunk)
+        at_line_start = chunk.endswith(b'\n')
+
+
+def send_smtp_streaming(connection: smtplib.SMTP, sender: str, recipients: List[str],
+                        message: StreamingMessage) -> dict:
+    """
+    MAIL/RCPT/DATA on an open connection, streaming the message body.
+    Same contract as SMTP.sendmail: returns refused recipients, raises
+    SMTPSenderRefused / SMTPRecipientsRefused / SMTPDataError.
+    """
+    connection.ehlo_or_helo_if_needed()
+    code, response = connection.mail(sender)
+    if code != 250:
+        if code == 421:
+            connection.close()
+        else:
+            connection.rset()
+        raise smtplib.SMTPSenderRefused(code, response, sender)
+
+    refused = {}
+    for recipient in recipients:
+        code, response = connection.rcpt(recipient)
+        if code not in (250, 251):
+            refused[recipient] = (code, response)
+        if code == 421:
+            connection.close()
+            raise smtplib.SMTPRecipientsRefused(refused)
+    if len(refused) == len(recipients):
+        connection.rset()
+        raise smtplib.SMTPRecipientsRefused(refused)
+
+    code, response = connection.docmd('DATA')
+    if code != 354:
+        connection.rset()
+        raise smtplib.SMTPDataError(code, response)
+    # Coalesce into CHUNK_SIZE writes: many small sends stall on Nagle/delayed ACK
+    pending = bytearray()
+    for chunk in dot_stuff(message.chunks()):  # Bcc is never part of the transmitted headers
+        pending += chunk
+        if len(pending) >= message.chunk_size:
+            connection.send(bytes(pending))
+            pending.clear()
+    pending += b'.' + CRLF  # Every chunk ends in CRLF, so this completes CRLF.CRLF
+    connection.send(bytes(pending))
+    code, response = connection.getreply()
+    if code != 250:
+        if code == 421:
+            connection.close()
+        else:
+            connection.rset()
+        raise smtplib.SMTPDataError(code, response)
+    return refused